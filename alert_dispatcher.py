@@ -0,0 +1,229 @@
+"""Non-blocking Discord webhook dispatcher.
+
+`dispatch(embed, priority)` puts an embed on a bounded in-memory queue and
+returns immediately; a single background thread delivers them. Bursts that
+arrive within `ALERT_COALESCE_WINDOW` are sent as one message with up to 10
+embeds, the most Discord accepts. The worker honors 429 `retry_after` and the
+`X-RateLimit-*` headers, and backs off on server and connection errors. When
+the queue is full, the lowest-priority, newest alert is dropped, so trade
+alerts are never pushed out by routine ones. A slow webhook can only delay
+other alerts, never the caller.
+"""
+
+import atexit
+import heapq
+import itertools
+import os
+import threading
+import time
+from datetime import datetime
+
+import requests
+
+from tracing import api_call, count
+
+HIGH, NORMAL, LOW = 0, 1, 2
+
+QUEUE_SIZE = int(os.getenv("ALERT_QUEUE_SIZE", "200"))
+COALESCE_WINDOW = float(os.getenv("ALERT_COALESCE_WINDOW", "0.25"))
+REQUEST_TIMEOUT = float(os.getenv("ALERT_TIMEOUT", "5"))
+MAX_ATTEMPTS = 4
+MAX_EMBEDS = 10
+# Discord rejects messages whose embeds total more than 6000 characters.
+MAX_EMBED_CHARS = 6000
+EXIT_FLUSH_TIMEOUT = 5.0
+
+
+def make_embed(description, title=None, color=0x3498db, fields=None):
+    embed = {"description": str(description)[:4096], "timestamp": datetime.utcnow().isoformat()}
+    if color is not None:
+        embed["color"] = color
+    if title:
+        embed["title"] = str(title)[:256]
+    if fields:
+        embed["fields"] = fields
+    return embed
+
+
+def embed_size(embed):
+    size = len(embed.get("title", "")) + len(embed.get("description", ""))
+    for field in embed.get("fields", []):
+        size += len(str(field.get("name", ""))) + len(str(field.get("value", "")))
+    return size
+
+
+def retry_delay(response, default):
+    """Seconds to wait before retrying a 429, from the body or the headers."""
+    try:
+        return float(response.json().get("retry_after"))
+    except Exception:
+        pass
+    for header in ("Retry-After", "X-RateLimit-Reset-After"):
+        try:
+            return float(response.headers[header])
+        except (KeyError, TypeError, ValueError):
+            continue
+    return default
+
+
+class AlertDispatcher:
+    def __init__(self, url=None, max_queued=QUEUE_SIZE, window=COALESCE_WINDOW, session=None):
+        self.url = url
+        self.max_queued = max_queued
+        self.window = window
+        self.session = session or requests.Session()
+        self.queue = []
+        self.seq = itertools.count()
+        self.cond = threading.Condition()
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.thread = None
+        self.dropped = 0
+        self.sent = 0
+
+    def webhook_url(self):
+        return self.url or os.getenv("DISCORD_WEBHOOK_URL")
+
+    # === Producer side ===
+
+    def dispatch(self, embed, priority=NORMAL):
+        """Queue one embed. Never blocks; returns False if it was dropped."""
+        item = (priority, next(self.seq), embed)
+        with self.cond:
+            if len(self.queue) >= self.max_queued:
+                worst = max(self.queue)
+                if item > worst:
+                    self._drop(priority)
+                    return False
+                self.queue.remove(worst)
+                heapq.heapify(self.queue)
+                self._drop(worst[0])
+            heapq.heappush(self.queue, item)
+            self.cond.notify_all()
+        self._ensure_thread()
+        return True
+
+    def _drop(self, priority):
+        self.dropped += 1
+        count("discord_alerts_dropped")
+        print(f"⚠️ Alert queue full, dropped a priority-{priority} alert.")
+
+    # === Worker ===
+
+    def _ensure_thread(self):
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._run, name="alert-dispatcher", daemon=True)
+            self.thread.start()
+
+    def _next_batch(self):
+        """Block until alerts are queued, let a burst gather, then pop up to 10 embeds."""
+        with self.cond:
+            while not self.queue:
+                self.cond.wait()
+        if self.window:
+            time.sleep(self.window)
+
+        with self.cond:
+            batch, size = [], 0
+            while self.queue and len(batch) < MAX_EMBEDS:
+                embed = self.queue[0][2]
+                if batch and size + embed_size(embed) > MAX_EMBED_CHARS:
+                    break
+                heapq.heappop(self.queue)
+                batch.append(embed)
+                size += embed_size(embed)
+            self.in_flight = len(batch)
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self._deliver(batch)
+            except Exception as e:
+                print(f"⚠️ Discord alert failed: {e}")
+            finally:
+                with self.cond:
+                    self.in_flight = 0
+                    self.cond.notify_all()
+
+    def _deliver(self, embeds):
+        url = self.webhook_url()
+        if not url:
+            print("❌ DISCORD_WEBHOOK_URL is not set.")
+            return
+
+        backoff = 1.0
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            wait = self.blocked_until - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+
+            try:
+                with api_call("discord", "webhook") as call:
+                    response = self.session.post(url, json={"embeds": embeds}, timeout=REQUEST_TIMEOUT)
+                    call.status = response.status_code
+            except requests.RequestException as e:
+                print(f"⚠️ Discord webhook error (attempt {attempt}): {e}")
+                time.sleep(backoff)
+                backoff *= 2
+                continue
+
+            self._note_rate_limit(response)
+            if response.status_code == 429:
+                delay = retry_delay(response, backoff)
+                print(f"⏳ Discord rate limited, retrying in {delay:.2f}s")
+                self.blocked_until = time.monotonic() + delay
+                continue
+            if response.status_code >= 500:
+                time.sleep(backoff)
+                backoff *= 2
+                continue
+            if response.status_code >= 400:
+                print(f"❌ Discord alert failed: {response.status_code} - {response.text}")
+                return
+
+            self.sent += len(embeds)
+            print(f"✅ Discord alert sent ({len(embeds)} embed{'s' if len(embeds) > 1 else ''}).")
+            return
+
+        count("discord_alerts_dropped", len(embeds))
+        print(f"❌ Giving up on {len(embeds)} Discord alert(s) after {MAX_ATTEMPTS} attempts.")
+
+    def _note_rate_limit(self, response):
+        """Pause before the next request when the bucket is exhausted."""
+        try:
+            if int(response.headers.get("X-RateLimit-Remaining", 1)) <= 0:
+                reset = float(response.headers.get("X-RateLimit-Reset-After", 0))
+                self.blocked_until = max(self.blocked_until, time.monotonic() + reset)
+        except (TypeError, ValueError):
+            pass
+
+    def flush(self, timeout=EXIT_FLUSH_TIMEOUT):
+        """Wait up to `timeout` seconds for queued alerts to be delivered."""
+        deadline = time.monotonic() + timeout
+        with self.cond:
+            while self.queue or self.in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self.thread is None or not self.thread.is_alive():
+                    return False
+                self.cond.wait(remaining)
+        return True
+
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher():
+    global _dispatcher
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                _dispatcher = AlertDispatcher()
+                atexit.register(_dispatcher.flush)
+    return _dispatcher
+
+
+def dispatch(embed, priority=NORMAL):
+    return get_dispatcher().dispatch(embed, priority)
@@ -1,31 +1,16 @@
-import requests
 import os
 from logger import get_daily_summary
-from datetime import datetime
+from alert_dispatcher import HIGH, LOW, NORMAL, dispatch, make_embed
 
 DISCORD_WEBHOOK_URL = os.getenv("DISCORD_WEBHOOK_URL")
 
-def send_discord_alert(message: str, color: int = 0x3498db, title="📊 MoneyPrinter Alert"):
+def send_discord_alert(message: str, color: int = 0x3498db, title="📊 MoneyPrinter Alert", priority=NORMAL):
     if not DISCORD_WEBHOOK_URL:
         print("❌ DISCORD_WEBHOOK_URL is not set.")
         return
 
-    data = {
-        "embeds": [
-            {
-                "title": title,
-                "description": message,
-                "color": color,
-                "timestamp": datetime.utcnow().isoformat()
-            }
-        ]
-    }
-
-    response = requests.post(DISCORD_WEBHOOK_URL, json=data)
-    if response.status_code != 204:
-        print(f"❌ Discord alert failed: {response.status_code} - {response.text}")
-    else:
-        print("✅ Discord alert sent.")
+    # Queued for the background dispatcher; returns immediately.
+    dispatch(make_embed(message, title, color), priority)
 
 def send_trade_alert(action: str, confidence: int, reason: str, strike_type: str):
     color = 0x2ecc71 if action in ['call', 'put'] else 0xe74c3c
@@ -36,19 +21,20 @@ def send_trade_alert(action: str, confidence: int, reason: str, strike_type: str
         f"**Expiration**: `End of Day`\n"
         f"**Reason**: {reason}"
     )
-    send_discord_alert(message, color, title="🤖 GPT Trade Decision")
+    send_discord_alert(message, color, title="🤖 GPT Trade Decision", priority=HIGH)
 
 def send_threshold_change_alert(old: float, new: float):
     color = 0xf1c40f
     message = f"🔁 Dynamic confidence threshold changed from `{old}%` → `{new}%`"
-    send_discord_alert(message, color, title="⚙️ Threshold Update")
+    send_discord_alert(message, color, title="⚙️ Threshold Update", priority=LOW)
 
-def send_daily_summary():
+def send_daily_summary(days=1):
     try:
-        summary = get_daily_summary()
+        summary = get_daily_summary(days)
         if not summary:
             print("⚠️ No daily summary available to send.")
             return
-        send_discord_alert(summary, color=0x7289DA, title="📅 Daily Performance Summary")
+        title = "📅 Daily Performance Summary" if days == 1 else f"📅 {days}-Day Performance Summary"
+        send_discord_alert(summary, color=0x7289DA, title=title)
     except Exception as e:
         print(f"❌ Error sending daily summary: {e}")
@@ -0,0 +1,310 @@
+"""Replay stored 1-minute bars through the decision pipeline.
+
+Each trading day is simulated independently in simulated time: a decision
+backend is asked for a trade at every bar after warm-up, and an open position
+is exited on stop, target or the monitoring deadline the same way
+`trade_executor.monitor_trade` does. Days are spread across a process pool.
+
+Usage:
+
+```
+python backtester.py bars/SPY.csv --backend rules --workers 8 --out results.json
+python backtester.py bars/SPY.csv --backend recorded --decisions decisions.jsonl
+python backtester.py bars/SPY --backend rules   # days collected by bar_store
+```
+"""
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import time as dtime
+
+import pandas as pd
+
+from confidence_engine import rule_based_decision
+from dynamic_threshold import BASELINE_THRESHOLD, classify_strategy
+from indicator_engine import MARKET_TZ, IndicatorEngine
+from strategy import calculate_atr, detect_market_regime
+from strike_logic import recommend_strike_type
+
+REQUIRED = ["Open", "High", "Low", "Close", "Volume"]
+
+DEFAULT_CONFIG = {
+    "threshold": BASELINE_THRESHOLD,
+    "stop_pct": 30,
+    "target_pct": 50,
+    # Option premium move per 1% underlying move; a rough stand-in for delta/gamma.
+    "leverage": 10.0,
+    "warmup": 30,
+    "max_trades_per_day": 1,
+    "exit_time": "11:00",
+    "window": 30,
+}
+
+
+# === Data ===
+
+def normalize_bars(df: pd.DataFrame) -> pd.DataFrame:
+    """Capitalize OHLCV columns and index by New York time, like `gpt_decision` expects."""
+    if isinstance(df.columns[0], tuple):
+        df.columns = [col[0] if isinstance(col, tuple) else col for col in df.columns]
+    df.columns = [str(col).strip().capitalize() for col in df.columns]
+
+    if not isinstance(df.index, pd.DatetimeIndex):
+        for col in ("Datetime", "Time", "Timestamp", "Date"):
+            if col in df.columns:
+                df = df.set_index(pd.to_datetime(df.pop(col), utc=True))
+                break
+    if df.index.tz is None:
+        df.index = df.index.tz_localize("UTC")
+    df.index = df.index.tz_convert(MARKET_TZ)
+
+    df = df.dropna(subset=REQUIRED).astype({col: "float" for col in REQUIRED})
+    return df.sort_index()
+
+
+def load_bars(path) -> pd.DataFrame:
+    if os.path.isdir(path) and any(name.endswith(".npy") for name in os.listdir(path)):
+        from bar_store import load_days
+
+        return normalize_bars(load_days(path))
+    if os.path.isdir(path):
+        frames = [pd.read_csv(os.path.join(path, name)) for name in sorted(os.listdir(path)) if name.endswith(".csv")]
+        df = pd.concat(frames, ignore_index=True)
+    elif str(path).endswith(".parquet"):
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path)
+    return normalize_bars(df)
+
+
+def split_days(df: pd.DataFrame):
+    return [(str(day), day_df) for day, day_df in df.groupby(df.index.date)]
+
+
+# === Decision backends ===
+
+class RuleBasedBackend:
+    """Scores the incremental indicators with `confidence_engine`."""
+
+    def __init__(self, options_flow_strength=50, gpt_confidence=50):
+        self.options_flow_strength = options_flow_strength
+        self.gpt_confidence = gpt_confidence
+
+    def decide(self, window, indicators, timestamp):
+        return rule_based_decision(indicators, self.options_flow_strength, self.gpt_confidence)
+
+
+class StubLLMBackend:
+    """Returns a fixed decision; useful for plumbing checks and exit-logic studies."""
+
+    def __init__(self, action="call", confidence=75, reason="stub"):
+        self.decision = {"action": action, "confidence": confidence, "reason": reason}
+
+    def decide(self, window, indicators, timestamp):
+        return dict(self.decision)
+
+
+class RecordedLLMBackend:
+    """
+    Replays decisions recorded from live runs.
+
+    `path` is a JSONL file of `{"time": ISO-8601, "action", "confidence", "reason"}`
+    rows; bars without a recording are skipped.
+    """
+
+    def __init__(self, path):
+        self.decisions = {}
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    row = json.loads(line)
+                    ts = pd.Timestamp(row["time"])
+                    if ts.tz is None:
+                        ts = ts.tz_localize(MARKET_TZ)
+                    self.decisions[ts.tz_convert(MARKET_TZ).floor("min")] = row
+
+    def decide(self, window, indicators, timestamp):
+        row = self.decisions.get(timestamp.floor("min"))
+        if row is None:
+            return {"action": "skip", "confidence": 0, "reason": "no recorded decision"}
+        return row
+
+
+def make_backend(name, **kwargs):
+    if name == "rules":
+        return RuleBasedBackend()
+    if name == "stub":
+        return StubLLMBackend()
+    if name == "recorded":
+        return RecordedLLMBackend(kwargs["decisions"])
+    raise ValueError(f"Unknown backend: {name}")
+
+
+# === Simulation ===
+
+def simulate_exit(bars, start, direction, stop_pct, target_pct, leverage, deadline):
+    """Walk forward from `start` and return (exit_index, option_return_pct, stop_hit, target_hit)."""
+    closes = bars["Close"].to_numpy()
+    times = bars.index
+    entry = closes[start]
+    sign = 1 if direction == "call" else -1
+
+    i = start
+    for i in range(start + 1, len(closes)):
+        option_return = sign * (closes[i] - entry) / entry * leverage * 100
+        if option_return >= target_pct:
+            return i, option_return, False, True
+        if option_return <= -stop_pct:
+            return i, option_return, True, False
+        if times[i].time() >= deadline:
+            return i, option_return, False, False
+
+    return i, sign * (closes[i] - entry) / entry * leverage * 100, False, False
+
+
+def run_day(day, bars, backend, config):
+    config = {**DEFAULT_CONFIG, **config}
+    deadline = dtime.fromisoformat(config["exit_time"])
+    engine = IndicatorEngine()
+    trades = []
+    skips = 0
+    i = 0
+
+    while i < len(bars):
+        ts = bars.index[i]
+        row = bars.iloc[i]
+        indicators = engine.update(row["Open"], row["High"], row["Low"], row["Close"], row["Volume"], ts)
+
+        if i + 1 < config["warmup"] or len(trades) >= config["max_trades_per_day"] or ts.time() >= deadline:
+            i += 1
+            continue
+
+        window = bars.iloc[max(0, i + 1 - config["window"]):i + 1]
+        decision = backend.decide(window, indicators, ts)
+        action = str(decision.get("action", "")).lower()
+        confidence = int(decision.get("confidence", 0))
+
+        if action not in ("call", "put") or confidence < config["threshold"]:
+            skips += 1
+            i += 1
+            continue
+
+        exit_i, pnl, stop_hit, target_hit = simulate_exit(
+            bars, i, action, config["stop_pct"], config["target_pct"], config["leverage"], deadline
+        )
+        trades.append({
+            "date": day,
+            "entry_time": ts.isoformat(),
+            "exit_time": bars.index[exit_i].isoformat(),
+            "direction": action,
+            "confidence": confidence,
+            "reason": decision.get("reason", ""),
+            "regime": detect_market_regime(window.copy()),
+            "strike_type": recommend_strike_type(window, action),
+            "atr": float(calculate_atr(bars.iloc[:i + 1].copy())),
+            "entry_underlying": float(bars["Close"].iloc[i]),
+            "exit_underlying": float(bars["Close"].iloc[exit_i]),
+            "pnl_pct": round(float(pnl), 2),
+            "stop_hit": stop_hit,
+            "target_hit": target_hit,
+        })
+
+        # Replay the held bars through the indicators before looking for the next entry.
+        for j in range(i + 1, exit_i + 1):
+            row = bars.iloc[j]
+            engine.update(row["Open"], row["High"], row["Low"], row["Close"], row["Volume"], bars.index[j])
+        i = exit_i + 1
+
+    return {"date": day, "trades": trades, "skips": skips}
+
+
+def _run_day_job(args):
+    day, bars, backend, config = args
+    return run_day(day, bars, backend, config)
+
+
+def summarize(trades):
+    if not trades:
+        return {"trades": 0, "win_rate": 0.0, "avg_pnl": 0.0, "total_pnl": 0.0}
+    pnls = [t["pnl_pct"] for t in trades]
+    wins = sum(1 for p in pnls if p > 0)
+    return {
+        "trades": len(trades),
+        "win_rate": round(wins / len(trades) * 100, 2),
+        "avg_pnl": round(sum(pnls) / len(pnls), 2),
+        "total_pnl": round(sum(pnls), 2),
+        "stops": sum(1 for t in trades if t["stop_hit"]),
+        "targets": sum(1 for t in trades if t["target_hit"]),
+    }
+
+
+def label_strategies(trades, lookback=5):
+    """Annotate each trade with the `dynamic_threshold` strategy implied by the prior trades."""
+    for i, trade in enumerate(trades):
+        recent = trades[max(0, i - lookback):i]
+        if not recent:
+            trade["strategy"] = "baseline"
+            continue
+        win_rate = sum(1 for t in recent if t["pnl_pct"] > 0) / len(recent) * 100
+        avg_atr = sum(t["atr"] or 0 for t in recent) / len(recent)
+        trade["strategy"] = classify_strategy(avg_atr, win_rate)
+    return trades
+
+
+def run_backtest(df, backend, config=None, workers=None):
+    config = config or {}
+    jobs = [(day, bars, backend, config) for day, bars in split_days(df)]
+
+    if workers == 1 or len(jobs) <= 1:
+        days = [_run_day_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            days = list(pool.map(_run_day_job, jobs, chunksize=max(1, len(jobs) // ((workers or os.cpu_count() or 1) * 4))))
+
+    trades = label_strategies([t for day in days for t in day["trades"]])
+    return {
+        "summary": {**summarize(trades), "days": len(days), "skips": sum(d["skips"] for d in days)},
+        "trades": trades,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest the decision pipeline on stored 1-minute bars.")
+    parser.add_argument("data", help="CSV/Parquet file, directory of daily CSVs or a bar_store symbol directory")
+    parser.add_argument("--backend", choices=["rules", "stub", "recorded"], default="rules")
+    parser.add_argument("--decisions", help="JSONL of recorded LLM decisions (recorded backend)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--threshold", type=int, default=DEFAULT_CONFIG["threshold"])
+    parser.add_argument("--stop", type=float, default=DEFAULT_CONFIG["stop_pct"])
+    parser.add_argument("--target", type=float, default=DEFAULT_CONFIG["target_pct"])
+    parser.add_argument("--leverage", type=float, default=DEFAULT_CONFIG["leverage"])
+    parser.add_argument("--exit-time", default=DEFAULT_CONFIG["exit_time"])
+    parser.add_argument("--out", help="Write the full result as JSON")
+    args = parser.parse_args()
+
+    df = load_bars(args.data)
+    backend = make_backend(args.backend, decisions=args.decisions)
+    config = {
+        "threshold": args.threshold,
+        "stop_pct": args.stop,
+        "target_pct": args.target,
+        "leverage": args.leverage,
+        "exit_time": args.exit_time,
+    }
+
+    print(f"📼 Replaying {len(df)} bars with `{args.backend}` backend...")
+    result = run_backtest(df, backend, config, workers=args.workers)
+    s = result["summary"]
+    print(f"📊 Days: {s['days']} | Trades: {s['trades']} | Win Rate: {s['win_rate']}% | "
+          f"Avg PnL: {s['avg_pnl']}% | Total PnL: {s['total_pnl']}%")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(result, f, indent=2, default=str)
+        print(f"💾 Results written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+"""Streaming tick-to-bar aggregation into fixed-size NumPy ring buffers.
+
+Polygon trade (`T`), second-aggregate (`A`) and minute-aggregate (`AM`) events
+are folded into 1-minute bars as they arrive. 5- and 15-minute bars are rolled
+up from the completed minutes. Completed bars are stored per symbol and
+interval in a `BarRing`, a preallocated `(2 * capacity, 6)` float64 array. Each
+row is written twice, `capacity` rows apart, so the newest `n` bars are always
+one contiguous slice. `bars()` therefore returns a read-only view instead of a
+copy. Memory stays constant however long the stream runs, and no DataFrame is
+built unless `to_frame()` is asked for one.
+
+Minutes close on event time. Each symbol keeps a watermark, the newest event
+end (`e`) or trade time (`t`) it has seen, and a minute completes once the
+watermark passes its end. A late event for a minute that is still open is
+therefore merged, however far the wall clock has moved. `close_idle()` is for
+quiet periods: it closes minutes of symbols that have sent nothing for a
+while.
+
+Row layout: `[start_ms, open, high, low, close, volume]` (see `T, O, H, L, C, V`).
+"""
+
+import os
+import threading
+import time
+
+import numpy as np
+
+T, O, H, L, C, V = range(6)
+MINUTE_MS = 60_000
+
+BAR_CAPACITY = int(os.getenv("BAR_CAPACITY", "1024"))
+BAR_INTERVALS = tuple(int(i) for i in os.getenv("BAR_INTERVALS", "1,5,15").split(","))
+
+
+class BarRing:
+    """Fixed-capacity ring of OHLCV rows with zero-copy access to the newest rows."""
+
+    def __init__(self, capacity=BAR_CAPACITY):
+        self.capacity = capacity
+        self.data = np.zeros((2 * capacity, 6), dtype=np.float64)
+        self.head = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def append(self, row):
+        self.data[self.head] = row
+        self.data[self.head + self.capacity] = row
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def last(self):
+        if not self.count:
+            return None
+        return self.data[self.head - 1 + (self.capacity if self.head == 0 else 0)]
+
+    def view(self, n=None):
+        """The newest `n` rows (all by default), oldest first, as a read-only view."""
+        n = self.count if n is None else min(n, self.count)
+        end = self.head + self.capacity
+        out = self.data[end - n:end]
+        out.flags.writeable = False
+        return out
+
+
+class BarBuilder:
+    """One in-progress bar plus the ring of completed bars for one interval."""
+
+    def __init__(self, minutes, capacity=BAR_CAPACITY):
+        self.period = minutes * MINUTE_MS
+        self.ring = BarRing(capacity)
+        self.current = None
+
+    def bucket(self, ts_ms):
+        return ts_ms - ts_ms % self.period
+
+    def last_start(self):
+        last = self.ring.last()
+        return last[T] if last is not None else -1
+
+    def merge(self, start, o, h, l, c, v):
+        """Fold a partial bar into the bucket starting at `start`; returns the bar it completed, if any."""
+        if start <= self.last_start():
+            return None
+        done = None
+        bar = self.current
+        if bar is not None and start != bar[T]:
+            done = self.finish()
+            bar = None
+        if bar is None:
+            self.current = [start, o, h, l, c, v]
+        else:
+            bar[H] = max(bar[H], h)
+            bar[L] = min(bar[L], l)
+            bar[C] = c
+            bar[V] += v
+        return done
+
+    def replace(self, start, o, h, l, c, v):
+        """Store an authoritative completed bar (e.g. a Polygon `AM`) for `start`."""
+        if start <= self.last_start():
+            return None
+        if self.current is not None and self.current[T] < start:
+            self.finish()
+        elif self.current is not None and self.current[T] == start:
+            # Supersedes the partial bar built from ticks; an older `start` slots in before it.
+            self.current = None
+        bar = [start, o, h, l, c, v]
+        self.ring.append(bar)
+        return bar
+
+    def finish(self):
+        bar, self.current = self.current, None
+        if bar is not None:
+            self.ring.append(bar)
+        return bar
+
+    def finish_before(self, ts_ms):
+        """Complete the in-progress bar if its period ended before `ts_ms`."""
+        if self.current is not None and self.current[T] + self.period <= ts_ms:
+            return self.finish()
+        return None
+
+
+class SymbolBars:
+    def __init__(self, intervals=BAR_INTERVALS, capacity=BAR_CAPACITY):
+        if 1 not in intervals:
+            intervals = (1,) + tuple(intervals)
+        self.builders = {m: BarBuilder(m, capacity) for m in intervals}
+        self.duplicates = 0
+
+    def _roll_up(self, minute_bar):
+        """Feed a completed 1-minute bar into the higher intervals."""
+        completed = [(1, minute_bar)]
+        start = minute_bar[T]
+        for minutes, builder in self.builders.items():
+            if minutes == 1:
+                continue
+            done = builder.merge(builder.bucket(start), *minute_bar[O:])
+            if done is not None:
+                completed.append((minutes, done))
+            # Close the higher bar as soon as its last minute is in.
+            if builder.current is not None and start + MINUTE_MS >= builder.current[T] + builder.period:
+                completed.append((minutes, builder.finish()))
+        return completed
+
+    def add_partial(self, ts_ms, o, h, l, c, v):
+        minute = self.builders[1]
+        start = minute.bucket(ts_ms)
+        if start <= minute.last_start():
+            self.duplicates += 1
+            return []
+        done = minute.merge(start, o, h, l, c, v)
+        return self._roll_up(done) if done is not None else []
+
+    def add_minute(self, start, o, h, l, c, v):
+        minute = self.builders[1]
+        if start <= minute.last_start():
+            self.duplicates += 1
+            return []
+        completed = []
+        if minute.current is not None and minute.current[T] < start:
+            completed += self._roll_up(minute.finish())
+        return completed + self._roll_up(minute.replace(start, o, h, l, c, v))
+
+    def close_due(self, now_ms):
+        """Complete the in-progress minute once its period is over (no next tick needed)."""
+        done = self.builders[1].finish_before(now_ms)
+        return self._roll_up(done) if done is not None else []
+
+
+class BarAggregator:
+    """
+    Build bars for every symbol seen in the stream.
+
+    `on_bar(symbol, minutes, bar)` is called for each completed bar with the row
+    as a list in `T, O, H, L, C, V` order.
+    """
+
+    def __init__(self, intervals=BAR_INTERVALS, capacity=BAR_CAPACITY, on_bar=None):
+        self.intervals = tuple(intervals)
+        self.capacity = capacity
+        self.on_bar = on_bar
+        self.symbols = {}
+        self.watermarks = {}
+        self.arrivals = {}
+        self.lock = threading.Lock()
+
+    def _symbol(self, symbol):
+        bars = self.symbols.get(symbol)
+        if bars is None:
+            bars = self.symbols[symbol] = SymbolBars(self.intervals, self.capacity)
+        return bars
+
+    def _emit(self, symbol, completed):
+        if self.on_bar is not None:
+            for minutes, bar in completed:
+                self.on_bar(symbol, minutes, bar)
+        return completed
+
+    # === Input ===
+
+    def add_event(self, event):
+        """Consume one Polygon event dict; returns the `(minutes, bar)` pairs it completed."""
+        kind = event.get("ev")
+        symbol = event.get("sym")
+        if not symbol:
+            return []
+        with self.lock:
+            bars = self._symbol(symbol)
+            if kind == "T":
+                price = float(event["p"])
+                event_ms = int(event["t"])
+                completed = bars.add_partial(event_ms, price, price, price, price, float(event.get("s", 0)))
+            elif kind == "A":
+                event_ms = int(event.get("e", event["s"]))
+                completed = bars.add_partial(int(event["s"]), float(event["o"]), float(event["h"]),
+                                             float(event["l"]), float(event["c"]), float(event.get("v", 0)))
+            elif kind == "AM":
+                event_ms = int(event.get("e", event["s"]))
+                completed = bars.add_minute(int(event["s"]), float(event["o"]), float(event["h"]),
+                                            float(event["l"]), float(event["c"]), float(event.get("v", 0)))
+            else:
+                return []
+            self.arrivals[symbol] = time.time() * 1000
+            watermark = max(self.watermarks.get(symbol, 0), event_ms)
+            self.watermarks[symbol] = watermark
+            completed += bars.close_due(watermark)
+        return self._emit(symbol, completed)
+
+    def add_minute_bar(self, symbol, start_ms, o, h, l, c, v):
+        """Insert a completed minute from another source (e.g. a REST backfill); duplicates are ignored."""
+        with self.lock:
+            completed = self._symbol(symbol).add_minute(int(start_ms), o, h, l, c, v)
+        return self._emit(symbol, completed)
+
+    def close_due(self, now_ms):
+        """Complete every in-progress minute whose period ended before `now_ms`."""
+        with self.lock:
+            completed = [(symbol, minutes, bar) for symbol, bars in self.symbols.items()
+                         for minutes, bar in bars.close_due(now_ms)]
+        return self._emit_all(completed)
+
+    def close_idle(self, idle_ms, now_ms=None):
+        """
+        Timer hook for quiet periods: on symbols with no event for `idle_ms`,
+        complete the minutes that ended at least `idle_ms` ago.
+        """
+        cutoff = (time.time() * 1000 if now_ms is None else now_ms) - idle_ms
+        with self.lock:
+            completed = [(symbol, minutes, bar) for symbol, bars in self.symbols.items()
+                         if self.arrivals.get(symbol, 0) <= cutoff
+                         for minutes, bar in bars.close_due(cutoff)]
+        return self._emit_all(completed)
+
+    def _emit_all(self, completed):
+        if self.on_bar is not None:
+            for symbol, minutes, bar in completed:
+                self.on_bar(symbol, minutes, bar)
+        return completed
+
+    # === Output ===
+
+    def bars(self, symbol, minutes=1, n=None):
+        """Read-only `(n, 6)` view of the newest completed bars, oldest first."""
+        bars = self.symbols.get(symbol)
+        if bars is None or minutes not in bars.builders:
+            return np.empty((0, 6))
+        return bars.builders[minutes].ring.view(n)
+
+    def last_start(self, symbol, minutes=1):
+        bars = self.symbols.get(symbol)
+        return bars.builders[minutes].last_start() if bars is not None else -1
+
+    def current(self, symbol, minutes=1):
+        """The in-progress bar, or None."""
+        bars = self.symbols.get(symbol)
+        if bars is None:
+            return None
+        bar = bars.builders[minutes].current
+        return list(bar) if bar is not None else None
+
+
+def to_frame(view):
+    """DataFrame in the repo's Open/High/Low/Close/Volume layout, indexed by ET bar start."""
+    import pandas as pd
+
+    index = pd.to_datetime(view[:, T].astype("int64"), unit="ms", utc=True).tz_convert("America/New_York")
+    return pd.DataFrame(np.array(view[:, O:]), index=index, columns=["Open", "High", "Low", "Close", "Volume"])
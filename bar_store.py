@@ -0,0 +1,191 @@
+"""Local store of regular-session 1-minute bars, one memory-mapped file per symbol and day.
+
+`BAR_STORE_DIR/<SYMBOL>/<YYYY-MM-DD>.npy` holds a `(390, 6)` float64 array
+with one row per minute from 09:30 ET, in the `bar_aggregator` row layout.
+Minutes not yet stored are NaN. `update()` asks Tradier `/markets/timesales`
+only for the minutes after the last stored bar. The exception is a gap inside
+the stored range, which is requested again up to `GAP_RETRIES` times. Minutes
+still missing after that (e.g. no trades) stay NaN. `window()` returns a
+read-only slice of the mapped file. Past days stay on disk and feed the
+backtester (`python backtester.py bars/SPY`).
+"""
+
+import os
+import threading
+from datetime import date, datetime, time as dtime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from bar_aggregator import O, T, V
+from indicator_engine import MARKET_TZ
+from tradier_client import get_client
+
+BAR_STORE_DIR = os.getenv("BAR_STORE_DIR", "bars")
+SESSION_OPEN = dtime(9, 30)
+SESSION_MINUTES = 390
+COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+GAP_RETRIES = 3
+
+
+def session_start(day):
+    return datetime.combine(day, SESSION_OPEN, tzinfo=MARKET_TZ)
+
+
+def to_frame(rows):
+    """DataFrame of the stored (non-NaN) rows, indexed by ET bar start."""
+    rows = rows[~np.isnan(rows[:, T])]
+    index = pd.to_datetime(rows[:, T].astype("int64"), unit="ms", utc=True).tz_convert(MARKET_TZ)
+    return pd.DataFrame(rows[:, O:V + 1], index=index, columns=COLUMNS)
+
+
+class BarStore:
+    def __init__(self, directory=BAR_STORE_DIR, client=None):
+        self.directory = directory
+        self.client = client
+        self.maps = {}
+        self.gap_tries = {}
+        self.lock = threading.Lock()
+
+    def path(self, symbol, day):
+        return os.path.join(self.directory, symbol.upper(), f"{day.isoformat()}.npy")
+
+    def _map(self, symbol, day, create=False):
+        """The memory-mapped array for one symbol/day, created (all NaN) on first write."""
+        key = (symbol.upper(), day)
+        arr = self.maps.get(key)
+        if arr is not None:
+            return arr
+        path = self.path(symbol, day)
+        if not os.path.exists(path):
+            if not create:
+                return None
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float64, shape=(SESSION_MINUTES, 6))[:] = np.nan
+            os.replace(tmp, path)
+        arr = np.load(path, mmap_mode="r+")
+        # Keep today's maps only; older days are reopened on demand.
+        for old in [k for k in self.maps if k[1] != day]:
+            del self.maps[old]
+        for old in [k for k in self.gap_tries if k[1] != day]:
+            del self.gap_tries[old]
+        self.maps[key] = arr
+        return arr
+
+    @staticmethod
+    def stored(arr):
+        """Row indices that hold a bar."""
+        return np.flatnonzero(~np.isnan(arr[:, T]))
+
+    # === Writing ===
+
+    def write(self, symbol, day, bars):
+        """Store `(open, high, low, close, volume, utc datetime)` bars of `day`; returns how many were new."""
+        start = session_start(day)
+        with self.lock:
+            arr = self._map(symbol, day, create=True)
+            written = 0
+            for o, h, l, c, v, ts in bars:
+                i = int((ts - start).total_seconds() // 60)
+                if 0 <= i < SESSION_MINUTES and np.isnan(arr[i, T]):
+                    arr[i] = (ts.timestamp() * 1000, o, h, l, c, v)
+                    written += 1
+            if written:
+                arr.flush()
+        return written
+
+    def update(self, symbol, now=None):
+        """Fetch the completed minutes after the last stored bar for today's session."""
+        from scanner import parse_bar
+
+        now = now or datetime.now(MARKET_TZ)
+        day = now.date()
+        start = session_start(day)
+        current = now.replace(second=0, microsecond=0)
+        if now.weekday() >= 5 or current <= start:
+            return 0
+
+        arr = self._map(symbol, day)
+        have = self.stored(arr) if arr is not None else []
+        first = start + timedelta(minutes=int(have[-1]) + 1) if len(have) else start
+        if len(have):
+            # Re-request gaps inside the stored range, a few times each.
+            key = (symbol.upper(), day)
+            gaps = [int(i) for i in np.flatnonzero(np.isnan(arr[:have[-1], T]))
+                    if self.gap_tries.get(key + (int(i),), 0) < GAP_RETRIES]
+            if gaps:
+                for i in gaps:
+                    self.gap_tries[key + (i,)] = self.gap_tries.get(key + (i,), 0) + 1
+                first = start + timedelta(minutes=gaps[0])
+        last = min(current, start + timedelta(minutes=SESSION_MINUTES)) - timedelta(minutes=1)
+        if first > last:
+            return 0
+
+        rows = (self.client or get_client()).get_timesales(
+            symbol, start=first.strftime("%Y-%m-%d %H:%M"), end=last.strftime("%Y-%m-%d %H:%M")
+        )
+        # The bar for the still-forming minute is skipped until it closes.
+        bars = [bar for bar in map(parse_bar, rows) if bar[5] < current]
+        return self.write(symbol, day, bars)
+
+    # === Reading ===
+
+    def window(self, symbol, day=None, minutes=None):
+        """Read-only view of the stored rows of `day` (today by default), the last `minutes` only if given."""
+        day = day or datetime.now(MARKET_TZ).date()
+        with self.lock:
+            arr = self._map(symbol, day)
+        if arr is None:
+            return np.empty((0, 6))
+        have = self.stored(arr)
+        if not len(have):
+            return np.empty((0, 6))
+        end = int(have[-1]) + 1
+        start = int(have[0]) if minutes is None else max(int(have[0]), end - minutes)
+        view = arr[start:end]
+        view.flags.writeable = False
+        return view
+
+    def frame(self, symbol, minutes=None, update=True, now=None):
+        """Today's bars as a DataFrame, topped up from Tradier first unless `update=False`."""
+        if update:
+            self.update(symbol, now)
+        day = (now or datetime.now(MARKET_TZ)).date()
+        return to_frame(self.window(symbol, day, minutes))
+
+    def days(self, symbol):
+        try:
+            names = os.listdir(os.path.join(self.directory, symbol.upper()))
+        except OSError:
+            return []
+        return sorted(date.fromisoformat(n[:-4]) for n in names if n.endswith(".npy"))
+
+
+def load_days(path):
+    """Every stored day under one symbol directory (e.g. `bars/SPY`) as a single DataFrame."""
+    frames = []
+    for name in sorted(os.listdir(path)):
+        if name.endswith(".npy"):
+            frames.append(to_frame(np.load(os.path.join(path, name), mmap_mode="r")))
+    return pd.concat(frames) if frames else pd.DataFrame(columns=COLUMNS)
+
+
+_store = None
+
+
+def get_bar_store():
+    global _store
+    if _store is None:
+        _store = BarStore()
+    return _store
+
+
+def fetch_bars(symbol="SPY", minutes=None):
+    """Today's bars from the store, or None if it could not be updated (callers then fall back)."""
+    try:
+        df = get_bar_store().frame(symbol, minutes)
+    except Exception as e:
+        print(f"⚠️ Bar store unavailable: {e}")
+        return None
+    return df if not df.empty else None
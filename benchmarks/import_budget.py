@@ -0,0 +1,99 @@
+"""Cold-start import budget for the entry points.
+
+Each module is imported in a fresh interpreter with `-X importtime`, best of
+`--runs`. The check fails (exit code 1) when a module's cumulative import time
+exceeds its budget, or when importing it loads one of the heavy dependencies
+that must stay lazy:
+
+    python benchmarks/import_budget.py
+    python benchmarks/import_budget.py --scale 2      # slower CI runners
+
+Budgets are in milliseconds on a typical developer machine; `--scale`
+multiplies them.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Only loaded on the code paths that use them (see lazy_imports.py).
+LAZY = ("openai", "yfinance", "gspread", "oauth2client", "gspread_formatting", "aiohttp")
+
+BUDGETS_MS = {
+    "bot": 500,
+    "gpt_decider": 500,
+    "monolith": 500,
+    "trade_executor": 500,
+    "trailing_manager": 250,
+    "scheduler_daemon": 500,
+    "scanner": 500,
+    "backtester": 500,
+    "polygon_stream": 200,
+}
+
+PROBE = (
+    "import json, sys; import {module}; "
+    "print(json.dumps(sorted(n for n in {lazy!r} if n in sys.modules)))"
+)
+
+
+def measure(module):
+    """(cumulative import ms, heavy modules loaded) for one fresh import of `module`."""
+    env = {
+        **os.environ,
+        # config.py refuses to import without credentials; placeholders are enough here.
+        "TRADIER_TOKEN": os.getenv("TRADIER_TOKEN", "budget"),
+        "TRADIER_ACCOUNT_ID": os.getenv("TRADIER_ACCOUNT_ID", "budget"),
+        "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY", "budget"),
+        "TRACING_DIR": os.devnull + ".metrics",
+    }
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(module=module, lazy=LAZY)],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    total_us = None
+    for line in proc.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module and not parts[2].startswith("  "):
+            total_us = int(parts[1])
+    loaded = json.loads(proc.stdout.strip().splitlines()[-1])
+    return (total_us or 0) / 1000, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail if entry-point cold imports exceed their budget.")
+    parser.add_argument("modules", nargs="*", help="Modules to check (default: all budgeted)")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--scale", type=float, default=float(os.getenv("IMPORT_BUDGET_SCALE", "1")))
+    args = parser.parse_args()
+
+    failures = []
+    for module in args.modules or BUDGETS_MS:
+        samples = [measure(module) for _ in range(args.runs)]
+        best = min(ms for ms, _ in samples)
+        loaded = sorted(set(n for _, mods in samples for n in mods))
+        budget = BUDGETS_MS.get(module, 500) * args.scale
+
+        ok = best <= budget and not loaded
+        flag = "✅" if ok else "❌"
+        extra = f" | loads {', '.join(loaded)}" if loaded else ""
+        print(f"{flag} {module:<18} {best:7.1f} ms (budget {budget:.0f} ms){extra}")
+        if not ok:
+            failures.append(module)
+
+    if failures:
+        print(f"\n❌ Import budget exceeded: {', '.join(failures)}")
+        sys.exit(1)
+    print("\n✅ All entry points within budget.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""End-to-end benchmarks against local service stand-ins.
+
+Starts `stub_services`, points every client at it through environment
+variables, runs each scenario in an isolated working directory and writes
+throughput, p50/p99 latency, error and degraded-run counts, per-stage tracing
+histograms and stub request counts to a JSON file:
+
+    python benchmarks/run_benchmarks.py --iterations 20 --latency openai=400 --latency tradier=30 \
+        --failure-rate tradier=0.02 --out bench_results.json
+
+No network access is needed; responses for the LLM are canned, so the numbers
+measure the pipeline's own overhead plus the injected service latency.
+
+Each iteration is classified from what the scenario returned. It is an
+error if it raised, returned `status == "error"` or produced no decision.
+It is degraded if the decision came from the rule-based fallback instead of
+the LLM. Latency stats cover the ok iterations only. Degraded iterations are
+reported separately, since a fast fallback is not a fast pipeline.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+from stub_services import SERVICES, StubConfig, StubServices, StubSpreadsheet  # noqa: E402
+
+SCENARIOS = ("run_bot", "execute_trade", "monolith", "trailing_manager")
+OK, DEGRADED, ERROR = "ok", "degraded", "error"
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def summarize(durations, degraded, errors, wall):
+    return {
+        "iterations": len(durations) + len(degraded) + errors,
+        "errors": errors,
+        "degraded": len(degraded),
+        "degraded_mean_ms": round(statistics.mean(degraded) * 1000, 2) if degraded else None,
+        "throughput_per_s": round(len(durations) / wall, 3) if wall else None,
+        "mean_ms": round(statistics.mean(durations) * 1000, 2) if durations else None,
+        "p50_ms": round(percentile(durations, 50) * 1000, 2) if durations else None,
+        "p99_ms": round(percentile(durations, 99) * 1000, 2) if durations else None,
+        "max_ms": round(max(durations) * 1000, 2) if durations else None,
+    }
+
+
+# === Scenarios ===
+# Each factory returns (setup, call): `setup` runs untimed before every iteration,
+# `call` returns OK, DEGRADED or ERROR (None counts as OK).
+
+def bars_df():
+    import pandas as pd
+
+    from tradier_client import get_client
+
+    end = datetime.now()
+    bars = get_client().get_timesales("SPY", start=(end.replace(second=0) - pd.Timedelta(minutes=60)).strftime("%Y-%m-%d %H:%M"),
+                                      end=end.strftime("%Y-%m-%d %H:%M"))
+    df = pd.DataFrame(bars)
+    df.index = pd.to_datetime(df["time"])
+    return df.rename(columns=str.capitalize)[["Open", "High", "Low", "Close", "Volume"]]
+
+
+def status_outcome(result):
+    return ERROR if isinstance(result, dict) and result.get("status") == "error" else OK
+
+
+def scenario_run_bot():
+    import bot
+
+    return None, lambda: status_outcome(bot.run_bot(bars_df()))
+
+
+def scenario_execute_trade():
+    import trade_executor
+
+    def setup():
+        if os.path.exists(trade_executor.TRADE_STATE_FILE):
+            os.remove(trade_executor.TRADE_STATE_FILE)
+
+    return setup, trade_executor.execute_trade
+
+
+def scenario_monolith():
+    import monolith
+
+    def call():
+        decision = monolith.run(bars_df(), summary=False)
+        if decision is None:
+            return ERROR
+        return DEGRADED if decision.get("source") == "rules" else OK
+
+    return None, call
+
+
+def scenario_trailing_manager(positions=50):
+    from position_journal import get_journal
+    import trailing_manager
+
+    journal = get_journal()
+
+    def setup():
+        # Keep `positions` open; wide stops/targets so they stay open while being marked.
+        missing = positions - len(journal.open_positions)
+        for i in range(max(missing, 0)):
+            journal.open_position("call", f"BENCH{i}", 500.0, 95, 500, reason="benchmark", underlying="SPY")
+
+    return setup, lambda: status_outcome(trailing_manager.check_trailing_and_update())
+
+
+FACTORIES = {
+    "run_bot": scenario_run_bot,
+    "execute_trade": scenario_execute_trade,
+    "monolith": scenario_monolith,
+    "trailing_manager": scenario_trailing_manager,
+}
+
+
+def fallbacks():
+    import tracing
+
+    return tracing.get_metrics().snapshot()["counters"].get("llm_fallbacks", 0)
+
+
+def run_scenario(name, iterations, warmup):
+    setup, call = FACTORIES[name]()
+    durations, degraded, errors = [], [], 0
+    wall_start = None
+    for i in range(warmup + iterations):
+        if setup:
+            setup()
+        if i == warmup:
+            wall_start = time.perf_counter()
+        before = fallbacks()
+        start = time.perf_counter()
+        try:
+            outcome = call() or OK
+        except Exception as e:
+            print(f"❌ {name} iteration {i} failed: {e}")
+            outcome = ERROR
+        elapsed = time.perf_counter() - start
+        # run_bot and execute_trade don't return their decision; the fallback counter shows it.
+        if outcome == OK and fallbacks() > before:
+            outcome = DEGRADED
+        if i < warmup:
+            continue
+        if outcome == OK:
+            durations.append(elapsed)
+        elif outcome == DEGRADED:
+            degraded.append(elapsed)
+        else:
+            errors += 1
+    wall = time.perf_counter() - wall_start if wall_start is not None else 0
+    return summarize(durations, degraded, errors, wall)
+
+
+# === CLI ===
+
+def parse_service_values(items, cast=float):
+    values = {}
+    for item in items or []:
+        if "=" in item:
+            service, value = item.split("=", 1)
+            services = [service]
+        else:
+            services, value = SERVICES, item
+        for service in services:
+            if service not in SERVICES:
+                raise SystemExit(f"Unknown service '{service}' (choose from {', '.join(SERVICES)})")
+            values[service] = cast(value)
+    return values
+
+
+def configure_environment(stubs, workdir):
+    os.environ.update(stubs.env())
+    os.environ.update({
+        "LLM_CACHE_MODE": "off",
+        "POSITION_POLL_INTERVAL": "0.01",
+        "ORDER_FILL_WAIT": "0",
+        "SHEETS_FLUSH_INTERVAL": "0.2",
+        "TRACING_DIR": os.path.join(workdir, ".metrics"),
+        "TRACING_FLUSH_INTERVAL": "3600",
+    })
+    os.chdir(workdir)
+
+
+def wire_adapters(stubs, respect_rate_limits):
+    """Route Sheets through the stub adapter and optionally lift Tradier rate limits."""
+    import logger
+    from sheets_spool import get_spool
+    from tradier_client import TokenBucket, get_client
+
+    spreadsheet = StubSpreadsheet(stubs.url)
+    logger._spreadsheet = spreadsheet
+    get_spool().sheet_factory = lambda: spreadsheet
+
+    if not respect_rate_limits:
+        client = get_client()
+        for group in client.buckets:
+            client.buckets[group] = TokenBucket(1_000_000, capacity=1_000_000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the trading pipeline against local service stand-ins.")
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS,
+                        help="Scenario to run (repeatable; default: all)")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--latency", action="append", metavar="[SERVICE=]MS",
+                        help="Base latency per request in ms, for one service or all")
+    parser.add_argument("--jitter", action="append", metavar="[SERVICE=]MS",
+                        help="Extra uniform random latency in ms")
+    parser.add_argument("--failure-rate", action="append", metavar="[SERVICE=]P",
+                        help="Probability (0-1) that a request fails")
+    parser.add_argument("--failure-status", type=int, default=503)
+    parser.add_argument("--prefilter", choices=["gate", "shadow", "off"], default="shadow",
+                        help="PREFILTER_MODE; the default still runs the LLM path on every bar")
+    parser.add_argument("--respect-rate-limits", action="store_true",
+                        help="Keep the Tradier client's production token buckets")
+    parser.add_argument("--out", default="bench_results.json")
+    args = parser.parse_args()
+
+    out_path = os.path.abspath(args.out)
+    config = StubConfig(
+        latency_ms=parse_service_values(args.latency),
+        jitter_ms=parse_service_values(args.jitter),
+        failure_rate=parse_service_values(args.failure_rate),
+        failure_status=args.failure_status,
+    )
+    stubs = StubServices(config).start()
+    workdir = tempfile.mkdtemp(prefix="moneyprinter-bench-")
+    configure_environment(stubs, workdir)
+    os.environ["PREFILTER_MODE"] = args.prefilter
+    print(f"🧪 Stub services at {stubs.url}, working directory {workdir}")
+
+    import tracing
+
+    wire_adapters(stubs, args.respect_rate_limits)
+
+    results = {}
+    for name in args.scenario or SCENARIOS:
+        print(f"\n⏱️ {name}: {args.warmup} warm-up + {args.iterations} iterations")
+        results[name] = run_scenario(name, args.iterations, args.warmup)
+        print(f"📊 {name}: {json.dumps(results[name])}")
+
+    from alert_dispatcher import get_dispatcher
+    from sheets_spool import get_spool
+
+    # Deliver queued rows and alerts while the stubs are still up, so they are counted.
+    get_spool().drain()
+    get_dispatcher().flush()
+    report = {
+        "created": datetime.utcnow().isoformat() + "Z",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "stub_config": config.as_dict(),
+        "iterations": args.iterations,
+        "warmup": args.warmup,
+        "scenarios": results,
+        "stages": tracing.get_metrics().snapshot(),
+        "stub_requests": stubs.request_counts(),
+    }
+    with open(out_path, "w") as f:
+        json.dump(report, f, indent=2)
+    stubs.stop()
+    print(f"\n💾 Results written to {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,382 @@
+"""Local HTTP stand-ins for Tradier, OpenAI, Discord and Google Sheets.
+
+One threaded HTTP server answers every service under its own prefix:
+
+```
+/tradier/v1/...        quotes, expirations, chains, lookup, timesales, orders, balances
+/openai/v1/chat/completions
+/discord/webhook
+/sheets/<tab>/...      used through StubSpreadsheet (gspread-compatible subset)
+```
+
+Each service has its own latency (base + uniform jitter, in ms) and failure
+rate. Failed requests return `failure_status` (503 by default, so the Tradier
+client's retry path is exercised). Request counts are kept per service and
+route.
+"""
+
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from zoneinfo import ZoneInfo
+
+import requests
+
+SERVICES = ("tradier", "openai", "discord", "sheets")
+MARKET_TZ = ZoneInfo("America/New_York")
+OCC_RE = re.compile(r"^([A-Z]{1,6})(\d{6})([CP])(\d{8})$")
+
+
+class StubConfig:
+    def __init__(self, latency_ms=None, jitter_ms=None, failure_rate=None, failure_status=503,
+                 option_step=0.1, seed=7):
+        self.latency_ms = {s: 0.0 for s in SERVICES}
+        self.jitter_ms = {s: 0.0 for s in SERVICES}
+        self.failure_rate = {s: 0.0 for s in SERVICES}
+        self.latency_ms.update(latency_ms or {})
+        self.jitter_ms.update(jitter_ms or {})
+        self.failure_rate.update(failure_rate or {})
+        self.failure_status = failure_status
+        # Fractional move of an option quote per poll, so monitors reach their target quickly.
+        self.option_step = option_step
+        self.seed = seed
+
+    def as_dict(self):
+        return {
+            "latency_ms": self.latency_ms,
+            "jitter_ms": self.jitter_ms,
+            "failure_rate": self.failure_rate,
+            "failure_status": self.failure_status,
+            "option_step": self.option_step,
+        }
+
+
+class MarketState:
+    """Deterministic prices: a sine-plus-drift underlying and option marks that climb per poll."""
+
+    def __init__(self, config):
+        self.config = config
+        self.lock = threading.Lock()
+        self.option_polls = Counter()
+        self.order_ids = 0
+        self.base = {"SPY": 500.0}
+
+    def underlying(self, symbol, ts=None):
+        ts = ts or time.time()
+        base = self.base.setdefault(symbol, 50.0 + (sum(map(ord, symbol)) % 400))
+        minute = ts / 60
+        return round(base * (1 + 0.002 * math.sin(minute / 7) + 0.00005 * (minute % 390)), 2)
+
+    def option_quote(self, symbol):
+        match = OCC_RE.match(symbol)
+        root, _, right, strike = match.groups()
+        strike = int(strike) / 1000
+        spot = self.underlying(root)
+        intrinsic = max(spot - strike, 0) if right == "C" else max(strike - spot, 0)
+        with self.lock:
+            self.option_polls[symbol] += 1
+            polls = self.option_polls[symbol]
+        last = round((intrinsic + 1.5) * (1 + self.config.option_step) ** (polls - 1), 2)
+        return {"symbol": symbol, "last": last, "bid": round(last - 0.02, 2), "ask": round(last + 0.02, 2),
+                "volume": 1000, "type": "option", "underlying": root}
+
+    def quote(self, symbol):
+        if OCC_RE.match(symbol):
+            return self.option_quote(symbol)
+        last = self.underlying(symbol)
+        return {"symbol": symbol, "last": last, "bid": last - 0.01, "ask": last + 0.01,
+                "volume": int(time.time()) % 10_000_000, "type": "etf"}
+
+    def expirations(self):
+        today = date.today()
+        friday = today + timedelta(days=(4 - today.weekday()) % 7)
+        return [(friday + timedelta(weeks=i)).isoformat() for i in range(4)]
+
+    def chain(self, symbol, expiration):
+        spot = round(self.underlying(symbol))
+        exp = expiration.replace("-", "")[2:]
+        options = []
+        for strike in range(spot - 20, spot + 21):
+            for right, option_type in (("C", "call"), ("P", "put")):
+                occ = f"{symbol}{exp}{right}{strike * 1000:08d}"
+                options.append({
+                    "symbol": occ, "strike": float(strike), "option_type": option_type,
+                    "expiration_date": expiration, "last": 1.5, "bid": 1.48, "ask": 1.52,
+                })
+        return options
+
+    def timesales(self, symbol, start, end):
+        start = _parse_time(start)
+        end = _parse_time(end)
+        if start is None or end is None:
+            end = datetime.now().replace(second=0, microsecond=0)
+            start = end - timedelta(minutes=30)
+        bars = []
+        t = start
+        while t <= end and len(bars) < 400:
+            # Like Tradier: `time` is New York wall-clock time, `timestamp` the matching epoch.
+            ts = t.replace(tzinfo=MARKET_TZ).timestamp()
+            close = self.underlying(symbol, ts)
+            open_ = self.underlying(symbol, ts - 60)
+            bars.append({
+                "time": t.strftime("%Y-%m-%dT%H:%M:%S"), "timestamp": int(ts),
+                "open": open_, "high": max(open_, close) + 0.05, "low": min(open_, close) - 0.05,
+                "close": close, "price": close, "volume": 10_000 + int(ts) % 5000,
+            })
+            t += timedelta(minutes=1)
+        return bars
+
+    def next_order_id(self):
+        with self.lock:
+            self.order_ids += 1
+            return self.order_ids
+
+
+def _parse_time(value):
+    for fmt in ("%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S"):
+        try:
+            return datetime.strptime(value, fmt)
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "StubServices/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    # === Plumbing ===
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _send(self, status, payload=None):
+        body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        if payload is not None:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def _dispatch(self, method):
+        url = urlparse(self.path)
+        parts = url.path.strip("/").split("/", 1)
+        service, route = parts[0], "/" + (parts[1] if len(parts) > 1 else "")
+        body = self._body()
+        stub = self.server.stub
+        if service not in SERVICES:
+            return self._send(404, {"error": "unknown service"})
+
+        config = stub.config
+        stub.count(service, f"{method} {_route_label(route)}")
+        delay = config.latency_ms[service] + random.uniform(0, config.jitter_ms[service])
+        if delay:
+            time.sleep(delay / 1000)
+        if random.random() < config.failure_rate[service]:
+            return self._send(config.failure_status, {"error": "injected failure"})
+
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        if body and self.headers.get("Content-Type", "").startswith("application/x-www-form-urlencoded"):
+            params.update({k: v[-1] for k, v in parse_qs(body.decode("utf-8")).items()})
+        payload = json.loads(body) if body and self.headers.get("Content-Type", "").startswith("application/json") else None
+
+        handler = getattr(self, f"_{service}")
+        status, response = handler(method, route, params, payload)
+        self._send(status, response)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    # === Services ===
+
+    def _tradier(self, method, route, params, payload):
+        market = self.server.stub.market
+        if route == "/v1/markets/quotes":
+            quotes = [market.quote(s) for s in params.get("symbols", "").split(",") if s]
+            return 200, {"quotes": {"quote": quotes[0] if len(quotes) == 1 else quotes}}
+        if route == "/v1/markets/options/expirations":
+            return 200, {"expirations": {"date": market.expirations()}}
+        if route == "/v1/markets/options/chains":
+            return 200, {"options": {"option": market.chain(params.get("symbol", "SPY"), params.get("expiration"))}}
+        if route == "/v1/markets/options/lookup":
+            underlying = params.get("underlying") or params.get("symbol", "")
+            options = [o["symbol"] for exp in market.expirations() for o in market.chain(underlying, exp)]
+            return 200, {"symbols": [{"rootSymbol": underlying, "options": options}]}
+        if route == "/v1/markets/timesales":
+            bars = market.timesales(params.get("symbol", "SPY"), params.get("start"), params.get("end"))
+            return 200, {"series": {"data": bars}}
+        if route.endswith("/orders") and method == "POST":
+            return 200, {"order": {"id": market.next_order_id(), "status": "ok"}}
+        if route.endswith("/balances"):
+            return 200, {"balances": {"total_cash": 100000.0, "total_equity": 100000.0}}
+        return 404, {"fault": {"faultstring": f"no stub for {route}"}}
+
+    def _openai(self, method, route, params, payload):
+        if route != "/v1/chat/completions" or not payload:
+            return 404, {"error": {"message": f"no stub for {route}"}}
+        messages = payload.get("messages", [])
+        system = next((m["content"] for m in messages if m.get("role") == "system"), "")
+        prompt_chars = sum(len(m.get("content", "")) for m in messages)
+        response_format = (payload.get("response_format") or {}).get("type")
+        if response_format == "json_object" or "JSON" in system:
+            content = json.dumps({"action": "call", "confidence": 80, "reason": "Stub: trend and VWAP aligned"})
+        else:
+            content = "CALL - stub momentum setup. CONFIDENCE 80. ATM strike."
+        return 200, {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model", "stub"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_chars // 4, "completion_tokens": len(content) // 4,
+                      "total_tokens": (prompt_chars + len(content)) // 4},
+        }
+
+    def _discord(self, method, route, params, payload):
+        return 204, None
+
+    def _sheets(self, method, route, params, payload):
+        sheets = self.server.stub.sheets
+        parts = route.strip("/").split("/")
+        tab, action = parts[0], parts[1] if len(parts) > 1 else ""
+        with self.server.stub.lock:
+            rows = sheets.setdefault(tab, [])
+            if action == "header" and method == "GET":
+                return 200, {"values": rows[0] if rows else []}
+            if action == "header":
+                if rows:
+                    rows[0] = payload["values"]
+                else:
+                    rows.append(payload["values"])
+                return 200, {}
+            if action == "rows" and method == "GET":
+                return 200, {"values": rows}
+            if action == "rows":
+                start = len(rows) + 1
+                rows.extend(payload["values"])
+                end = len(rows)
+                return 200, {"updates": {"updatedRange": f"{tab}!A{start}:Z{end}", "updatedRows": end - start + 1}}
+            if action == "format":
+                return 200, {}
+        return 404, {"error": f"no stub for {route}"}
+
+
+def _route_label(route):
+    # Collapse account IDs so counts group by endpoint.
+    return re.sub(r"/accounts/[^/]+", "/accounts/{account}", route)
+
+
+class StubServices:
+    """Start/stop the stub server and expose the base URLs the app should use."""
+
+    def __init__(self, config=None, host="127.0.0.1", port=0):
+        self.config = config or StubConfig()
+        random.seed(self.config.seed)
+        self.market = MarketState(self.config)
+        self.sheets = {}
+        self.lock = threading.Lock()
+        self.requests = Counter()
+        self.server = ThreadingHTTPServer((host, port), StubHandler)
+        self.server.daemon_threads = True
+        self.server.stub = self
+        self.thread = None
+
+    def count(self, service, route):
+        with self.lock:
+            self.requests[f"{service} {route}"] += 1
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self):
+        """Environment variables pointing the app's clients at the stubs."""
+        return {
+            "TRADIER_BASE_URL": f"{self.url}/tradier/v1",
+            "TRADIER_TOKEN": "stub-token",
+            "TRADIER_ACCOUNT_ID": "STUB0001",
+            "OPENAI_BASE_URL": f"{self.url}/openai/v1",
+            "OPENAI_API_KEY": "stub-key",
+            "DISCORD_WEBHOOK_URL": f"{self.url}/discord/webhook",
+        }
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name="stub-services", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def request_counts(self):
+        with self.lock:
+            return dict(sorted(self.requests.items()))
+
+
+# === Sheets adapter ===
+
+class StubWorksheet:
+    """The subset of `gspread.Worksheet` used by `sheets_spool` and the trade store seed, backed by the stub server."""
+
+    def __init__(self, session, base_url, title):
+        self.session = session
+        self.url = f"{base_url}/sheets/{title}"
+        self.title = title
+
+    def _call(self, method, action, values=None):
+        response = self.session.request(method, f"{self.url}/{action}", json=None if values is None else {"values": values},
+                                        timeout=10)
+        response.raise_for_status()
+        return response.json()
+
+    def row_values(self, row):
+        return self._call("GET", "header")["values"] if row == 1 else []
+
+    def get_all_records(self):
+        values = self._call("GET", "rows")["values"]
+        return [dict(zip(values[0], row)) for row in values[1:]] if values else []
+
+    def update(self, range_name, values):
+        return self._call("PUT", "header", values[0])
+
+    def append_rows(self, rows, value_input_option="RAW"):
+        return self._call("POST", "rows", rows)
+
+    def append_row(self, row, value_input_option="RAW"):
+        return self.append_rows([row], value_input_option)
+
+    def batch_format(self, formats):
+        return self._call("POST", "format", formats)
+
+
+class StubSpreadsheet:
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.session = requests.Session()
+
+    def worksheet(self, title):
+        return StubWorksheet(self.session, self.base_url, title)
+
+    def add_worksheet(self, title, rows="1000", cols="20"):
+        return StubWorksheet(self.session, self.base_url, title)
@@ -1,14 +1,17 @@
 import os
 import time
-import yfinance as yf
-import requests
 import datetime
 from dotenv import load_dotenv
-from config import TRADIER_TOKEN, ACCOUNT_ID, OPENAI_API_KEY
-import openai
-
-# Initialize OpenAI client using the newer 1.x interface
-client = openai.OpenAI(api_key=OPENAI_API_KEY)
+import config  # noqa: F401 - fails fast when credentials are missing
+from tradier_client import get_client
+from bar_store import fetch_bars
+from strike_validator import get_strike_validator, occ_symbol
+from llm_cache import LLMCacheMiss
+from hedged_decider import LLM_DEADLINE, cached_completion, fallback_decision
+from lazy_imports import get_openai_client, preload
+from prefilter import gate
+from prompt_builder import build_prompt, ohlcv, parse_decision, report_usage, request_params
+from tracing import api_call, span, traced
 import pandas as pd
 
 # Load environment variables
@@ -16,13 +19,9 @@ load_dotenv()
 
 TICKER = "SPY"
 MODE = os.getenv("MODE", "paper")
-TRADIER_BASE_URL = "https://sandbox.tradier.com/v1"  # Change to live for real trades
-
-HEADERS = {
-    "Authorization": f"Bearer {TRADIER_TOKEN}",
-    "Accept": "application/json",
-    "Content-Type": "application/x-www-form-urlencoded"
-}
+MODEL = os.getenv("OPENAI_MODEL", "gpt-4")
+# The bot scalps off the most recent minutes only.
+PROMPT_BARS = int(os.getenv("BOT_PROMPT_BARS", "5"))
 
 # === Helpers ===
 
@@ -33,39 +32,19 @@ def get_next_friday():
         days_ahead += 7
     return (today + datetime.timedelta(days=days_ahead)).strftime("%Y-%m-%d")
 
-def get_spy_price():
-    url = f"{TRADIER_BASE_URL}/markets/quotes"
-    params = {"symbols": "SPY"}
-    response = requests.get(url, headers=HEADERS, params=params)
-    data = response.json()
-    return float(data["quotes"]["quote"]["last"])
+def get_spy_price(symbol=TICKER):
+    return get_client().get_last_price(symbol)
 
-def get_option_symbol(direction, strike):
-    expiry = get_next_friday().replace("-", "")
-    strike_formatted = f"{int(strike * 1000):08d}"
-    right = "C" if direction.lower() == "call" else "P"
-    return f"SPY{expiry}{right}{strike_formatted}"
+def get_option_symbol(direction, strike, symbol=TICKER):
+    return occ_symbol(symbol, direction, strike, get_next_friday())
 
 def validate_option_symbol(symbol):
-    """Check if the given option symbol exists in Tradier's sandbox environment."""
-    url = f"{TRADIER_BASE_URL}/markets/options/lookup"
-    params = {"symbol": symbol}
-    response = requests.get(url, headers=HEADERS, params=params)
-    if response.status_code != 200:
-        print("⚠️ Lookup failed with status:", response.status_code)
-        return False
+    """Check the symbol against today's cached set of listed contracts (one chain call per expiration per day)."""
+    return get_strike_validator().is_valid(symbol)
 
+def place_option_trade(direction, strike_type="ATM", symbol=TICKER):
     try:
-        data = response.json()
-        if "options" in data and data["options"]:
-            return True
-    except ValueError:
-        print("⚠️ Invalid JSON from symbol validation.")
-    return False
-
-def place_option_trade(direction, strike_type="ATM"):
-    try:
-        spy_price = get_spy_price()
+        spy_price = get_spy_price(symbol)
 
         if strike_type == "ATM":
             strike = round(spy_price)
@@ -76,10 +55,12 @@ def place_option_trade(direction, strike_type="ATM"):
         else:
             strike = round(spy_price)
 
-        option_symbol = get_option_symbol(direction, strike)
+        option_symbol = get_option_symbol(direction, strike, symbol)
 
         print(f"🧾 Checking option symbol: {option_symbol}")
-        if not validate_option_symbol(option_symbol):
+        with span("bot.validate_symbol"):
+            valid = validate_option_symbol(option_symbol)
+        if not valid:
             return {
                 "status": "error",
                 "error": f"Invalid or unavailable option symbol: {option_symbol} (not found in sandbox)"
@@ -95,12 +76,10 @@ def place_option_trade(direction, strike_type="ATM"):
             "duration": "day"
         }
 
-        url = f"{TRADIER_BASE_URL}/accounts/{ACCOUNT_ID}/orders"
         print("📤 Payload:", payload)
-        print("📡 Request URL:", url)
-        print("📡 Headers:", HEADERS)
 
-        response = requests.post(url, headers=HEADERS, data=payload)
+        with span("bot.order_post"):
+            response = get_client().place_order(payload)
         print("📡 Tradier response text:", response.text)
 
         try:
@@ -137,62 +116,44 @@ def place_option_trade(direction, strike_type="ATM"):
 
 # === GPT Decision Logic ===
 
-def gpt_trade_decision(df: pd.DataFrame):
+def gpt_trade_decision(df: pd.DataFrame, symbol=TICKER):
     try:
-        last_5 = df.tail(5)
-        if last_5.empty:
+        if df.empty:
             return {"decision": "NOTHING", "confidence": 0, "strike_type": "ATM", "reason": "Not enough data"}
 
-        prompt = "You're a disciplined SPY options trader. Based on the last 5 minutes of 1-minute candles, should we buy a CALL, PUT, or NOTHING?\n"
-
-        for i, row in last_5.iterrows():
-            try:
-                t = i.strftime('%H:%M')
-                o = float(row['Open'].iloc[0]) if isinstance(row['Open'], pd.Series) else float(row['Open'])
-                h = float(row['High'].iloc[0]) if isinstance(row['High'], pd.Series) else float(row['High'])
-                l = float(row['Low'].iloc[0]) if isinstance(row['Low'], pd.Series) else float(row['Low'])
-                c = float(row['Close'].iloc[0]) if isinstance(row['Close'], pd.Series) else float(row['Close'])
-                v = int(row['Volume'].iloc[0]) if isinstance(row['Volume'], pd.Series) else int(row['Volume'])
-
-                prompt += f"{t} - O={o:.2f}, H={h:.2f}, L={l:.2f}, C={c:.2f}, V={v}\n"
-            except:
-                continue
-
-        prompt += "\nRespond with: CALL, PUT, or NOTHING. Then give a 1-line reason and confidence (0–100). Also suggest: ATM, ITM, or OTM strike."
-
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "You're a disciplined SPY options scalper."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,
-            max_tokens=150
-        )
-
-        text = response.choices[0].message.content.strip().upper()
-        print("🧠 GPT Output:\n", text)
-
-        decision = "NOTHING"
-        confidence = 0
-        strike_type = "ATM"
-
-        if "CALL" in text: decision = "CALL"
-        elif "PUT" in text: decision = "PUT"
-
-        if "CONFIDENCE" in text:
-            digits = "".join(c for c in text.split("CONFIDENCE")[1] if c.isdigit())
-            confidence = int(digits[:3]) if digits else 0
-
-        if "ITM" in text or "IN-THE-MONEY" in text:
-            strike_type = "ITM"
-        elif "OTM" in text or "OUT-OF-THE-MONEY" in text:
-            strike_type = "OTM"
+        with span("bot.prompt"):
+            prompt = build_prompt(df, symbol, bars=PROMPT_BARS)
+        params = request_params(MODEL)
+
+        def ask_gpt(model):
+            with api_call("openai", "chat.completions"):
+                response = get_openai_client().chat.completions.create(
+                    model=model,
+                    messages=prompt["messages"],
+                    timeout=LLM_DEADLINE,
+                    **request_params(model)
+                )
+            report_usage(response, prompt["estimated_tokens"])
+            return response.choices[0].message.content.strip()
 
+        try:
+            with span("bot.llm"):
+                text = cached_completion(
+                    ask_gpt, MODEL, prompt["template"], prompt["candles"], {**params, **prompt["context"]}
+                )
+            print("🧠 GPT Output:\n", text)
+            data = parse_decision(text)
+        except LLMCacheMiss:
+            raise
+        except Exception as e:
+            print(f"⚠️ No usable GPT reply ({e}), deciding from local indicators")
+            data = fallback_decision(ohlcv(df), type(e).__name__)
+            text = ""
         return {
-            "decision": decision,
-            "confidence": confidence,
-            "strike_type": strike_type,
+            "decision": {"call": "CALL", "put": "PUT"}.get(data["action"], "NOTHING"),
+            "confidence": data["confidence"],
+            "strike_type": data["strike_type"],
+            "reason": data["reason"],
             "raw": text
         }
 
@@ -202,29 +163,46 @@ def gpt_trade_decision(df: pd.DataFrame):
 
 # === Main Bot Logic ===
 
-def run_bot():
-    print("📈 Downloading SPY data...")
-    df = yf.download("SPY", interval="1m", period="1d", progress=False, auto_adjust=True)
+@traced("bot.run_bot")
+def run_bot(df=None):
+    """One decision/order cycle. `df` lets a long-running caller pass warm bars."""
+    if df is None:
+        # openai loads in the background while the bars are fetched.
+        preload("openai")
+        print("📈 Loading SPY bars...")
+        with span("bot.fetch_bars"):
+            df = fetch_bars(TICKER)
+            if df is None:
+                import yfinance as yf
+
+                df = yf.download("SPY", interval="1m", period="1d", progress=False, auto_adjust=True)
 
     if df.empty:
         print("❌ No SPY data retrieved.")
-        return
+        return None
+
+    if not gate(df, TICKER, "bot")["escalate"]:
+        return None
 
     print("🧠 Running GPT decision logic...")
-    result = gpt_trade_decision(df)
+    with span("bot.gpt_decision"):
+        result = gpt_trade_decision(df)
 
     if result["decision"] == "NOTHING" or result["confidence"] < 50:
         print(f"⚠️ SKIP: Confidence {result.get('confidence', 0)}% | Reason: {result.get('reason', 'Low confidence')}")
-        return
+        return None
 
     print(f"✅ Decision: {result['decision']} | Strike: {result['strike_type']} | Confidence: {result['confidence']}%")
 
-    trade = place_option_trade(result["decision"], result["strike_type"])
+    with span("bot.place_option_trade"):
+        trade = place_option_trade(result["decision"], result["strike_type"])
 
     if trade["status"] == "success":
         print(f"📤 ORDER PLACED: {trade['symbol']} ({trade['strike_type']}) at ${trade['underlying_price']:.2f}")
     else:
         print(f"❌ ORDER FAILED: {trade.get('error', 'Unknown error')}")
 
+    return trade
+
 if __name__ == "__main__":
     run_bot()
@@ -47,3 +47,36 @@ def calculate_confidence(indicators: dict, options_flow_strength: float, gpt_con
 
     final_score = round(score / weight_total * 100)
     return min(final_score, 100)
+
+def bearish_view(indicators: dict) -> dict:
+    """
+    Mirror bullish indicator readings so `calculate_confidence` scores a PUT setup.
+    """
+    mirrored = dict(indicators)
+    mirrored["ema9"], mirrored["ema20"] = indicators.get("ema20"), indicators.get("ema9")
+    mirrored["macd"] = -indicators.get("macd", 0)
+    mirrored["price"], mirrored["vwap"] = indicators.get("vwap"), indicators.get("price")
+    return mirrored
+
+def rule_based_decision(indicators: dict, options_flow_strength: float = 50, gpt_confidence: int = 50) -> dict:
+    """
+    Pick CALL/PUT/SKIP from trend and VWAP alignment and score it with `calculate_confidence`.
+    """
+    ema9, ema20 = indicators.get("ema9"), indicators.get("ema20")
+    price, vwap = indicators.get("price"), indicators.get("vwap")
+
+    if ema9 > ema20 and price > vwap:
+        action = "call"
+        confidence = calculate_confidence(indicators, options_flow_strength, gpt_confidence)
+    elif ema9 < ema20 and price < vwap:
+        action = "put"
+        confidence = calculate_confidence(bearish_view(indicators), options_flow_strength, gpt_confidence)
+    else:
+        return {"action": "skip", "confidence": 0, "reason": "EMA trend and VWAP disagree"}
+
+    trend = "above" if action == "call" else "below"
+    return {
+        "action": action,
+        "confidence": confidence,
+        "reason": f"EMA9/20 trend with price {trend} VWAP, RSI {indicators.get('rsi', 50):.0f}",
+    }
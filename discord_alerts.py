@@ -1,13 +1,12 @@
 import os
-import requests
+from alert_dispatcher import LOW, NORMAL, dispatch, make_embed
 
 WEBHOOK_URL = os.getenv("DISCORD_WEBHOOK_URL")
 
-def send_discord_alert(message):
+def send_discord_alert(message, priority=NORMAL):
     if not WEBHOOK_URL:
         raise EnvironmentError("DISCORD_WEBHOOK_URL is not set.")
-    payload = {"content": message}
-    requests.post(WEBHOOK_URL, json=payload)
+    dispatch(make_embed(message, color=None), priority)
 
 def format_discord_message(decision, status):
     emoji = "✅" if status == "EXECUTED" else "⚠️"
@@ -24,5 +23,6 @@ def alert_threshold_change(new, old):
     send_discord_alert(
         f"{emoji} **Threshold Change Alert**\n"
         f"Old: `{old * 100:.2f}%` → New: `{new * 100:.2f}%`\n"
-        f"Change: `{diff:+.2f}%`"
+        f"Change: `{diff:+.2f}%`",
+        priority=LOW
     )
@@ -1,11 +1,8 @@
-import pandas as pd
 import os
-from datetime import datetime, timedelta
-from logger import get_sheet
+from trade_store import get_store
+from rolling_metrics import get_rolling_metrics, METRICS_WINDOW
 from alerts import send_threshold_change_alert
 
-# Sheet and tab configuration
-SHEET_NAME = "Results"
 BASELINE_THRESHOLD = 65
 
 # --- Threshold Modes ---
@@ -24,24 +21,17 @@ def classify_strategy(avg_atr, win_rate):
     return "baseline"
 
 def get_recent_metrics(days=5):
-    sheet = get_sheet()
     try:
-        worksheet = sheet.worksheet(SHEET_NAME)
-        data = worksheet.get_all_records()
-
-        df = pd.DataFrame(data)
-        df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-        df = df.dropna(subset=["Date"])
-        df = df.sort_values("Date", ascending=False).head(days)
-
-        df['Win'] = df['Win'].astype(str).str.lower().isin(['true', '1', 'yes'])
-        df['Confidence'] = pd.to_numeric(df['Confidence'], errors='coerce')
-        df['ATR'] = pd.to_numeric(df['ATR'], errors='coerce')
-
-        win_rate = df['Win'].mean() * 100 if not df.empty else 0
-        avg_conf = df['Confidence'].mean() if not df.empty else BASELINE_THRESHOLD
-        avg_atr = df['ATR'].mean() if not df.empty else 1.0
+        if days == METRICS_WINDOW:
+            metrics = get_rolling_metrics().metrics()
+        else:
+            metrics = get_store().recent_metrics(days)
+        if metrics is None:
+            return 0, BASELINE_THRESHOLD, 1.0
 
+        win_rate, avg_conf, avg_atr = metrics
+        avg_conf = BASELINE_THRESHOLD if avg_conf is None else avg_conf
+        avg_atr = 1.0 if avg_atr is None else avg_atr
         return round(win_rate, 2), round(avg_conf, 2), round(avg_atr, 2)
     except Exception as e:
         print(f"❌ Error reading recent metrics: {e}")
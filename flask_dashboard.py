@@ -1,44 +1,121 @@
-from flask import Flask, render_template_string
+from flask import Flask, Response
+import json
+import os
+import threading
+import time
 import pandas as pd
-import requests
-from config import TRADIER_TOKEN, ACCOUNT_ID
+import config  # noqa: F401 - fails fast when credentials are missing
+from tradier_client import get_client
+from trade_store import get_store
+from tracing import render_prometheus
 
 app = Flask(__name__)
 
+# The refresher watches the local store every REFRESH_INTERVAL seconds and only
+# calls Tradier for the balance when it is older than BALANCE_TTL or a trade changed.
+REFRESH_INTERVAL = float(os.getenv("DASHBOARD_REFRESH_INTERVAL", "0.5"))
+BALANCE_TTL = float(os.getenv("DASHBOARD_BALANCE_TTL", "30"))
+BALANCE_MIN_INTERVAL = 1.0
+SSE_HEARTBEAT = 15
+
 def get_tradier_balance():
-    url = f"https://sandbox.tradier.com/v1/accounts/{ACCOUNT_ID}/balances"
-    headers = {
-        "Authorization": f"Bearer {TRADIER_TOKEN}",
-        "Accept": "application/json"
-    }
     try:
-        response = requests.get(url, headers=headers)
-        data = response.json()
-        return float(data["balances"]["total_cash"])
+        return float(get_client().get_balances()["total_cash"])
     except Exception as e:
         print("Tradier API error:", e)
         return None
 
-def calculate_stats(df):
-    total_pnl = df["PnL"].sum()
-    win_rate = (df["PnL"] > 0).mean() * 100 if len(df) > 0 else 0
-    avg_gain = df["PnL"].mean() if len(df) > 0 else 0
-    open_trades = df[df["Status"] == "OPEN"]
-    open_pnl = open_trades["PnL"].sum() if not open_trades.empty else 0
-    return total_pnl, win_rate, avg_gain, open_pnl
+TRADE_COLUMNS = {
+    "opened_at": "Time",
+    "direction": "Direction",
+    "symbol": "Symbol",
+    "entry_price": "EntryPrice",
+    "stop_pct": "StopLoss%",
+    "target_pct": "Target%",
+    "reason": "Reason",
+    "pnl": "PnL",
+    "status": "Status",
+}
+
+def recent_trades_table(limit=10):
+    df = pd.DataFrame(get_store().recent_trades(limit), columns=list(TRADE_COLUMNS))
+    return df.rename(columns=TRADE_COLUMNS).to_html(classes="data", border=1, index=False)
+
+class DashboardState:
+    """Background-refreshed snapshot of every value the dashboard displays."""
+
+    def __init__(self):
+        self.values = {}
+        self.version = 0
+        self.cond = threading.Condition()
+        self.thread = None
+        self.balance = None
+        self.balance_at = 0.0
+        self.data_version = None
+
+    def start(self):
+        with self.cond:
+            if self.thread is None:
+                self.refresh(force_balance=True)
+                self.thread = threading.Thread(target=self._run, name="dashboard-refresher", daemon=True)
+                self.thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(REFRESH_INTERVAL)
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"⚠️ Dashboard refresh failed: {e}")
+
+    def refresh(self, force_balance=False):
+        store = get_store()
+        data_version = store.data_version()
+        trades_changed = data_version != self.data_version
+        balance_age = time.monotonic() - self.balance_at
+
+        # A fill changes both the store and the account cash, so refresh them together.
+        if force_balance or balance_age > BALANCE_TTL or (trades_changed and balance_age > BALANCE_MIN_INTERVAL):
+            self.balance = get_tradier_balance()
+            self.balance_at = time.monotonic()
+
+        values = dict(self.values)
+        values["balance"] = f"${self.balance:.2f}" if self.balance is not None else "Unavailable"
+
+        if trades_changed:
+            try:
+                total_pnl, win_rate, avg_gain, open_pnl = store.stats()
+                values["trades"] = recent_trades_table()
+            except Exception as e:
+                total_pnl = win_rate = avg_gain = open_pnl = 0
+                values["trades"] = f"<p>No trades found or error reading trade store: {e}</p>"
+            values["total_pnl"] = f"${total_pnl:.2f}"
+            values["open_pnl"] = f"${open_pnl:.2f}"
+            values["win_rate"] = f"{win_rate:.2f}%"
+            values["avg_gain"] = f"{avg_gain:.4f}"
+            self.data_version = data_version
+
+        self.publish(values)
+
+    def publish(self, values):
+        with self.cond:
+            if values != self.values:
+                self.values = values
+                self.version += 1
+                self.cond.notify_all()
+
+    def wait(self, version, timeout):
+        """Block until a newer snapshot exists; returns (version, values)."""
+        with self.cond:
+            self.cond.wait_for(lambda: self.version != version, timeout=timeout)
+            return self.version, dict(self.values)
+
+state = DashboardState()
 
 @app.route("/")
 def dashboard():
-    try:
-        df = pd.read_csv("trade_log.csv")
-        last_trades = df.tail(10).to_html(classes="data", border=1, index=False)
-        total_pnl, win_rate, avg_gain, open_pnl = calculate_stats(df)
-    except Exception as e:
-        last_trades = f"<p>No trades found or error reading file: {e}</p>"
-        total_pnl = win_rate = avg_gain = open_pnl = 0
-
-    balance = get_tradier_balance()
-    balance_display = f"${balance:.2f}" if balance is not None else "Unavailable"
+    state.start()
+    v = state.values
 
     html = f"""
     <html>
@@ -56,20 +133,55 @@ def dashboard():
     <body>
         <div class="header">
             <h1>💰 Money Printer Dashboard</h1>
-            <p><strong>Tradier Account Balance:</strong> {balance_display}</p>
-            <p><strong>Total Realized PnL:</strong> ${total_pnl:.2f}</p>
-            <p><strong>Live Open PnL:</strong> ${open_pnl:.2f}</p>
+            <p><strong>Tradier Account Balance:</strong> <span id="balance">{v.get("balance", "")}</span></p>
+            <p><strong>Total Realized PnL:</strong> <span id="total_pnl">{v.get("total_pnl", "")}</span></p>
+            <p><strong>Live Open PnL:</strong> <span id="open_pnl">{v.get("open_pnl", "")}</span></p>
         </div>
         <div class="stats">
-            <p><strong>Win Rate:</strong> {win_rate:.2f}%</p>
-            <p><strong>Average Gain/Loss per Trade:</strong> {avg_gain:.4f}</p>
+            <p><strong>Win Rate:</strong> <span id="win_rate">{v.get("win_rate", "")}</span></p>
+            <p><strong>Average Gain/Loss per Trade:</strong> <span id="avg_gain">{v.get("avg_gain", "")}</span></p>
         </div>
         <h3>Recent Trades:</h3>
-        {last_trades}
+        <div id="trades">{v.get("trades", "")}</div>
+        <script>
+            const source = new EventSource("/stream");
+            source.onmessage = (event) => {{
+                const changed = JSON.parse(event.data);
+                for (const [key, value] of Object.entries(changed)) {{
+                    const el = document.getElementById(key);
+                    if (el) el.innerHTML = value;
+                }}
+            }};
+        </script>
     </body>
     </html>
     """
     return html
 
+@app.route("/stream")
+def stream():
+    """Server-sent events carrying only the values that changed since the last push."""
+    state.start()
+
+    def events():
+        version, sent = state.version, dict(state.values)
+        while True:
+            new_version, values = state.wait(version, timeout=SSE_HEARTBEAT)
+            if new_version == version:
+                yield ": keep-alive\n\n"
+                continue
+            changed = {k: val for k, val in values.items() if sent.get(k) != val}
+            version, sent = new_version, values
+            if changed:
+                yield f"data: {json.dumps(changed)}\n\n"
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return Response(events(), mimetype="text/event-stream", headers=headers)
+
+@app.route("/metrics")
+def metrics():
+    """Prometheus text exposition of stage latencies, errors and API call counts from every process."""
+    return Response(render_prometheus(), mimetype="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
-    app.run(debug=False)
+    app.run(debug=False, threaded=True)
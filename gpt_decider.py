@@ -1,14 +1,19 @@
-import openai
 import os
-import json
 import pandas as pd
 from alerts import send_trade_alert
-from logger import get_sheet, get_recent_logs, log_trade_decision
+from logger import get_recent_logs, log_trade_decision
 from strike_logic import recommend_strike_type
+from llm_cache import LLMCacheMiss
+from hedged_decider import LLM_DEADLINE, cached_completion, fallback_decision
+from lazy_imports import get_openai_client
+from prefilter import gate
+from prompt_builder import build_prompt, parse_decision, report_usage, request_params
+from tracing import api_call, span, traced
 
-openai.api_key = os.getenv("OPENAI_API_KEY")
+MODEL = os.getenv("OPENAI_MODEL", "gpt-4")
 
-def gpt_decision(df: pd.DataFrame) -> dict:
+@traced("gpt_decider.clean")
+def clean_bars(df: pd.DataFrame) -> pd.DataFrame:
     if isinstance(df.columns[0], tuple):
         df.columns = [col[0] if isinstance(col, tuple) else col for col in df.columns]
     df.columns = [col.strip().capitalize() for col in df.columns]
@@ -22,66 +27,70 @@ def gpt_decision(df: pd.DataFrame) -> dict:
     df = df.astype({col: 'float' for col in required})
     if df.empty:
         raise ValueError("SPY data is empty after cleaning.")
+    return df
 
-    recent_df = df.tail(30)
+@traced("gpt_decider.gpt_decision")
+def gpt_decision(df: pd.DataFrame, prefilter=True) -> dict:
+    df = clean_bars(df)
 
-    candles = [
-        {
-            "time": idx.strftime("%H:%M"),
-            "open": round(row["Open"], 2),
-            "high": round(row["High"], 2),
-            "low": round(row["Low"], 2),
-            "close": round(row["Close"], 2),
-            "volume": int(row["Volume"]),
-        }
-        for idx, row in recent_df.iterrows()
-    ]
+    if prefilter:
+        report = gate(df, "SPY", "gpt_decider")
+        if not report["escalate"]:
+            return {"action": "skip", "confidence": report["score"],
+                    "reason": f"Prefilter: {report['summary']}", "source": "prefilter"}
 
     try:
-        sheet = get_sheet()
-        logs = get_recent_logs(sheet=sheet)
+        with span("gpt_decider.recent_logs"):
+            logs = get_recent_logs()
     except Exception as e:
         print(f"Error fetching logs: {e}")
         logs = []
 
-    system_prompt = (
-        "You're a trading assistant analyzing SPY 1-minute candles. "
-        "Decide to BUY CALL, BUY PUT, or SKIP. Respond with JSON: "
-        "{\"action\": \"call\", \"confidence\": 76, \"reason\": \"...\"}"
-    )
-    user_prompt = (
-        f"Last 30m candles:\n{json.dumps(candles)}\n\n"
-        f"Recent logs:\n{json.dumps(logs)}\n\nWhat’s the decision?"
-    )
+    with span("gpt_decider.prompt"):
+        prompt = build_prompt(df, "SPY", logs)
+    params = request_params(MODEL)
+
+    def ask_gpt(model):
+        with api_call("openai", "chat.completions"):
+            response = get_openai_client().chat.completions.create(
+                model=model,
+                messages=prompt["messages"],
+                timeout=LLM_DEADLINE,
+                **request_params(model)
+            )
+        report_usage(response, prompt["estimated_tokens"])
+        return response.choices[0].message.content.strip()
 
     try:
-        response = openai.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.5,
-            max_tokens=500
-        )
-        reply = response.choices[0].message.content.strip()
+        with span("gpt_decider.llm"):
+            reply = cached_completion(
+                ask_gpt, MODEL, prompt["template"], prompt["candles"], {**params, **prompt["context"]}
+            )
         print(f"🤖 GPT Reply:\n{reply}")
+        data = parse_decision(reply)
+    except LLMCacheMiss:
+        raise
+    except Exception as e:
+        print(f"⚠️ No usable GPT reply ({e}), deciding from local indicators")
+        data = fallback_decision(df, type(e).__name__)
+        reply = ""
 
-        data = json.loads(reply)
-        action = data.get("action", "").lower()
-        confidence = int(data.get("confidence", 0))
-        reason = data.get("reason", "No reason provided.")
+    try:
+        action = data["action"]
+        confidence = data["confidence"]
+        reason = data["reason"]
 
         strike_type = recommend_strike_type(df, action)
 
-        send_trade_alert(action, confidence, reason, strike_type)
-        log_trade_decision({
-            "action": action,
-            "confidence": confidence,
-            "reason": reason,
-            "strike_type": strike_type,
-            "raw": reply
-        })
+        with span("gpt_decider.notify"):
+            send_trade_alert(action, confidence, reason, strike_type)
+            log_trade_decision({
+                "action": action,
+                "confidence": confidence,
+                "reason": reason,
+                "strike_type": strike_type,
+                "raw": reply
+            })
 
         return data
 
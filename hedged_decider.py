@@ -0,0 +1,166 @@
+"""Deadline-bounded, hedged LLM completions with a rule-based fallback.
+
+`hedged_completion(ask, model)` runs `ask(model)` on a worker thread. If no
+reply arrives within the hedge delay, a second request goes out, to
+`OPENAI_HEDGE_MODEL` if set. The first successful reply wins. The delay is the
+`LLM_HEDGE_PERCENTILE` of the model's recent latencies once enough calls have
+been seen, and `LLM_HEDGE_AFTER` until then. Nothing waits past
+`LLM_DEADLINE`. When the deadline passes or both requests fail, the caller
+decides with `fallback_decision()`, which scores the bars locally with
+`confidence_engine`. Requests still in flight finish on daemon threads and
+their replies are discarded, so they never delay interpreter exit.
+`cached_completion()` goes through the LLM cache but does not store replies
+from the hedge model under the primary model's key.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+
+from confidence_engine import rule_based_decision
+from indicator_engine import engine_from_df
+from llm_cache import get_llm_cache
+from tracing import count
+
+LLM_DEADLINE = float(os.getenv("LLM_DEADLINE", "12"))
+LLM_HEDGE_AFTER = float(os.getenv("LLM_HEDGE_AFTER", "4"))
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "90"))
+HEDGE_MODEL = os.getenv("OPENAI_HEDGE_MODEL")
+# Latencies needed before the percentile replaces LLM_HEDGE_AFTER.
+MIN_SAMPLES = 5
+
+
+def _submit(fn, *args):
+    """Run `fn(*args)` on a daemon thread; abandoned requests must not keep the process alive."""
+    future = Future()
+
+    def run():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(fn(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name="llm", daemon=True).start()
+    return future
+
+
+class LLMDeadlineExceeded(TimeoutError):
+    pass
+
+
+class LatencyTracker:
+    """Recent successful completion latencies of one model."""
+
+    def __init__(self, size=200):
+        self.samples = deque(maxlen=size)
+        self.lock = threading.Lock()
+
+    def record(self, seconds):
+        with self.lock:
+            self.samples.append(seconds)
+
+    def percentile(self, pct):
+        with self.lock:
+            ordered = sorted(self.samples)
+        if not ordered:
+            return None
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+    def hedge_delay(self, default=LLM_HEDGE_AFTER, pct=LLM_HEDGE_PERCENTILE):
+        if len(self.samples) < MIN_SAMPLES:
+            return default
+        return self.percentile(pct)
+
+
+_trackers = {}
+_trackers_lock = threading.Lock()
+
+
+def get_latency_tracker(model):
+    with _trackers_lock:
+        tracker = _trackers.get(model)
+        if tracker is None:
+            tracker = _trackers[model] = LatencyTracker()
+        return tracker
+
+
+def _timed(ask, model):
+    start = time.monotonic()
+    reply = ask(model)
+    get_latency_tracker(model).record(time.monotonic() - start)
+    return reply
+
+
+def hedged_completion(ask, model, hedge_model=None, deadline=LLM_DEADLINE, hedge_after=None):
+    """
+    Return `(reply, model)` for the first successful `ask(model)` / `ask(hedge_model)`.
+
+    Raises `LLMDeadlineExceeded` when nothing succeeded within `deadline`
+    seconds, or the last error if every request failed before it.
+    """
+    hedge_model = hedge_model or HEDGE_MODEL or model
+    if hedge_after is None:
+        hedge_after = get_latency_tracker(model).hedge_delay()
+    start = time.monotonic()
+    end = start + deadline
+
+    futures = {_submit(_timed, ask, model): "primary"}
+    hedged = False
+    error = None
+    while futures:
+        now = time.monotonic()
+        if now >= end:
+            break
+        until = end if hedged else min(end, start + hedge_after)
+        done, _ = wait(futures, timeout=max(0.0, until - now), return_when=FIRST_COMPLETED)
+
+        for future in done:
+            source = futures.pop(future)
+            try:
+                reply = future.result()
+            except Exception as e:
+                print(f"⚠️ LLM {source} request failed: {e}")
+                error = e
+                continue
+            if source == "hedge":
+                count("llm_hedge_wins")
+                return reply, hedge_model
+            return reply, model
+
+        # Hedge once: when the delay has passed, or right away if the primary already failed.
+        if not hedged and (not futures or time.monotonic() >= start + hedge_after):
+            hedged = True
+            count("llm_hedges")
+            print(f"🪁 No LLM reply after {time.monotonic() - start:.1f}s, hedging with {hedge_model}")
+            futures[_submit(_timed, ask, hedge_model)] = "hedge"
+
+    if futures or error is None:
+        raise LLMDeadlineExceeded(f"no LLM reply within {deadline:g}s")
+    raise error
+
+
+def cached_completion(ask, model, template, candles, params=None):
+    """`hedged_completion` through the LLM cache; only replies from `model` itself are stored."""
+    winners = []
+
+    def call():
+        reply, winner = hedged_completion(ask, model)
+        winners.append(winner)
+        return reply
+
+    return get_llm_cache().completion(call, model, template, candles, params,
+                                      store=lambda: winners[-1] == model)
+
+
+def fallback_decision(df, why):
+    """CALL/PUT/SKIP from the local indicators when the LLM could not answer in time."""
+    count("llm_fallbacks")
+    decision = rule_based_decision(engine_from_df(df).indicators())
+    decision["reason"] = f"Rule-based fallback ({why}): {decision['reason']}"
+    decision["strike_type"] = "ATM"
+    decision["source"] = "rules"
+    return decision
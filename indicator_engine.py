@@ -0,0 +1,259 @@
+import inspect
+from collections import deque
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+from confidence_engine import calculate_confidence
+
+MARKET_TZ = ZoneInfo("America/New_York")
+
+
+class EMA:
+    """Exponential moving average matching pandas `ewm(span=..., adjust=False)`."""
+
+    def __init__(self, span):
+        self.alpha = 2 / (span + 1)
+        self.value = None
+
+    def update(self, x):
+        if self.value is None:
+            self.value = x
+        else:
+            self.value += self.alpha * (x - self.value)
+        return self.value
+
+
+class RSI:
+    """Wilder RSI, seeded with a simple average of the first `period` changes."""
+
+    def __init__(self, period=14):
+        self.period = period
+        self.prev_close = None
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.count = 0
+        self.value = 50.0
+
+    def update(self, close):
+        if self.prev_close is None:
+            self.prev_close = close
+            return self.value
+
+        change = close - self.prev_close
+        self.prev_close = close
+        gain = max(change, 0.0)
+        loss = max(-change, 0.0)
+
+        if self.count < self.period:
+            self.count += 1
+            self.avg_gain += (gain - self.avg_gain) / self.count
+            self.avg_loss += (loss - self.avg_loss) / self.count
+            if self.count < self.period:
+                return self.value
+        else:
+            self.avg_gain = (self.avg_gain * (self.period - 1) + gain) / self.period
+            self.avg_loss = (self.avg_loss * (self.period - 1) + loss) / self.period
+
+        if self.avg_loss == 0:
+            self.value = 100.0 if self.avg_gain > 0 else 50.0
+        else:
+            rs = self.avg_gain / self.avg_loss
+            self.value = 100 - 100 / (1 + rs)
+        return self.value
+
+
+class MACD:
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+        self.signal = EMA(signal)
+        self.value = 0.0
+        self.histogram = 0.0
+
+    def update(self, close):
+        self.value = self.fast.update(close) - self.slow.update(close)
+        self.histogram = self.value - self.signal.update(self.value)
+        return self.value
+
+
+class SessionVWAP:
+    """VWAP that resets at the start of each New York trading date."""
+
+    def __init__(self):
+        self.session = None
+        self.pv = 0.0
+        self.volume = 0.0
+        self.value = None
+
+    def update(self, high, low, close, volume, session):
+        if session != self.session:
+            self.session = session
+            self.pv = 0.0
+            self.volume = 0.0
+
+        self.pv += (high + low + close) / 3 * volume
+        self.volume += volume
+        self.value = self.pv / self.volume if self.volume else close
+        return self.value
+
+
+class RollingMean:
+    """Simple moving average over a fixed window using a running sum."""
+
+    def __init__(self, window):
+        self.window = deque(maxlen=window)
+        self.total = 0.0
+
+    def update(self, x):
+        if len(self.window) == self.window.maxlen:
+            self.total -= self.window[0]
+        self.window.append(x)
+        self.total += x
+        return self.mean
+
+    @property
+    def full(self):
+        return len(self.window) == self.window.maxlen
+
+    @property
+    def mean(self):
+        return self.total / len(self.window) if self.window else 0.0
+
+
+class ATR:
+    """Rolling-mean ATR, same definition as `strategy.calculate_atr`."""
+
+    def __init__(self, period=14):
+        self.tr = RollingMean(period)
+        self.prev_close = None
+        self.value = None
+
+    def update(self, high, low, close):
+        if self.prev_close is None:
+            tr = high - low
+        else:
+            tr = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = close
+        self.tr.update(tr)
+        self.value = round(self.tr.mean, 2) if self.tr.full else None
+        return self.value
+
+
+class VolumeSpike:
+    """Flags a bar whose volume exceeds `multiplier` times the trailing average."""
+
+    def __init__(self, window=20, multiplier=1.5):
+        self.avg = RollingMean(window)
+        self.multiplier = multiplier
+        self.value = False
+
+    def update(self, volume):
+        self.value = self.avg.full and volume > self.avg.mean * self.multiplier
+        self.avg.update(volume)
+        return self.value
+
+
+def session_date(timestamp):
+    """Return the New York trading date for a bar timestamp (epoch ms or datetime)."""
+    if timestamp is None:
+        return datetime.now(MARKET_TZ).date()
+    if isinstance(timestamp, (int, float)):
+        timestamp = datetime.fromtimestamp(timestamp / 1000, tz=timezone.utc)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.astimezone(MARKET_TZ).date()
+
+
+class IndicatorEngine:
+    """
+    Incremental indicator state for a single symbol.
+
+    Each `update` is O(1) and returns the dict `calculate_confidence` expects.
+    """
+
+    def __init__(self, symbol="SPY"):
+        self.symbol = symbol
+        self.ema9 = EMA(9)
+        self.ema20 = EMA(20)
+        self.rsi = RSI(14)
+        self.macd = MACD()
+        self.vwap = SessionVWAP()
+        self.atr = ATR(14)
+        self.volume_spike = VolumeSpike()
+        self.price = None
+        self.bars = 0
+
+    def update(self, open_, high, low, close, volume, timestamp=None):
+        self.price = close
+        self.ema9.update(close)
+        self.ema20.update(close)
+        self.rsi.update(close)
+        self.macd.update(close)
+        self.vwap.update(high, low, close, volume, session_date(timestamp))
+        self.atr.update(high, low, close)
+        self.volume_spike.update(volume)
+        self.bars += 1
+        return self.indicators()
+
+    def update_from_event(self, event):
+        """Update from a Polygon aggregate (`AM`/`A`) event."""
+        return self.update(
+            float(event["o"]),
+            float(event["h"]),
+            float(event["l"]),
+            float(event["c"]),
+            float(event.get("v", 0)),
+            event.get("s"),
+        )
+
+    def indicators(self):
+        return {
+            "ema9": self.ema9.value,
+            "ema20": self.ema20.value,
+            "rsi": self.rsi.value,
+            "macd": self.macd.value,
+            "vwap": self.vwap.value,
+            "volume_spike": self.volume_spike.value,
+            "price": self.price,
+        }
+
+
+def engine_from_df(df, symbol="SPY"):
+    """Warm an engine from a 1-minute OHLCV DataFrame (e.g. a yfinance download)."""
+    engine = IndicatorEngine(symbol)
+    for ts, o, h, l, c, v in zip(df.index, df["Open"], df["High"], df["Low"], df["Close"], df["Volume"]):
+        ts = ts.to_pydatetime() if hasattr(ts, "to_pydatetime") else None
+        engine.update(float(o), float(h), float(l), float(c), float(v), ts)
+    return engine
+
+
+def make_stream_callback(on_update=None, options_flow_strength=0, gpt_confidence=0):
+    """
+    Build a callback for `polygon_stream.stream_spy_data`.
+
+    Aggregate events update the per-symbol engine and are scored with
+    `calculate_confidence`; `on_update(symbol, indicators, score)` is then
+    called (and awaited if it is a coroutine function).
+    """
+    engines = {}
+
+    async def callback(event):
+        if event.get("ev") not in ("AM", "A"):
+            return
+        symbol = event.get("sym", "SPY")
+        engine = engines.get(symbol)
+        if engine is None:
+            engine = engines[symbol] = IndicatorEngine(symbol)
+
+        indicators = engine.update_from_event(event)
+        score = calculate_confidence(indicators, options_flow_strength, gpt_confidence)
+
+        if on_update is None:
+            print(f"📊 {symbol} {indicators['price']:.2f} | RSI {indicators['rsi']:.1f} | Score {score}")
+        elif inspect.iscoroutinefunction(on_update):
+            await on_update(symbol, indicators, score)
+        else:
+            on_update(symbol, indicators, score)
+
+    callback.engines = engines
+    return callback
@@ -0,0 +1,43 @@
+"""Deferred loading of heavy dependencies for cheap cold starts.
+
+Scheduled runs start a fresh interpreter each time, so module-level imports of
+openai, yfinance or gspread are paid before any work begins. Entry points
+import those where they are used. `preload()` starts an import in the
+background while the process waits on the network. For example, `openai`
+loads during the bar fetch, and the LLM call later finds it in `sys.modules`.
+`benchmarks/import_budget.py` guards the result.
+"""
+
+import importlib
+import os
+import threading
+
+_openai_client = None
+_openai_lock = threading.Lock()
+
+
+def preload(*names):
+    """Import `names` on a daemon thread; returns the thread (join it to wait)."""
+    def load():
+        for name in names:
+            try:
+                importlib.import_module(name)
+            except Exception as e:
+                print(f"⚠️ Preload of {name} failed: {e}")
+
+    thread = threading.Thread(target=load, name="preload", daemon=True)
+    thread.start()
+    return thread
+
+
+def get_openai_client():
+    """Shared OpenAI client, created (and `openai` imported) on first use."""
+    global _openai_client
+    if _openai_client is None:
+        with _openai_lock:
+            if _openai_client is None:
+                import openai
+
+                # No client retries: hedged_decider hedges and enforces the deadline instead.
+                _openai_client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+    return _openai_client
@@ -0,0 +1,202 @@
+"""Content-addressed on-disk cache for LLM trade decisions.
+
+Entries are keyed by a SHA-256 of the model, the prompt template, the
+normalized candle window and the sampling parameters, and stored one JSON file
+per key. Recency is tracked with file mtimes so eviction is LRU by age and by
+total size.
+
+Modes (`LLM_CACHE_MODE`):
+
+```
+readwrite  - serve hits, call the model and store on a miss (default)
+record     - always call the model and overwrite the stored response
+replay     - only serve stored responses; a miss raises LLMCacheMiss
+off        - bypass the cache entirely
+```
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", ".llm_cache")
+LLM_CACHE_MODE = os.getenv("LLM_CACHE_MODE", "readwrite").lower()
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+LLM_CACHE_MAX_AGE = float(os.getenv("LLM_CACHE_MAX_AGE", str(7 * 24 * 3600)))
+EVICT_EVERY = 100
+
+MODES = ("readwrite", "record", "replay", "off")
+
+
+class LLMCacheMiss(KeyError):
+    """Raised in replay mode when no recorded response exists for a request."""
+
+
+def _normalize_value(key, value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return value
+    if str(key).lower() in ("volume", "v"):
+        return int(value)
+    return round(float(value), 2)
+
+
+def normalize_candles(candles):
+    """Round prices to cents and volumes to ints so equivalent windows hash identically."""
+    normalized = []
+    for candle in candles:
+        if isinstance(candle, dict):
+            normalized.append({k: _normalize_value(k, v) for k, v in sorted(candle.items())})
+        else:
+            normalized.append([round(v, 2) if isinstance(v, float) else v for v in candle])
+    return normalized
+
+
+def cache_key(model, template, candles, params=None):
+    payload = json.dumps(
+        {
+            "model": model,
+            "template": template,
+            "candles": normalize_candles(candles),
+            "params": params or {},
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    def __init__(self, directory=LLM_CACHE_DIR, mode=LLM_CACHE_MODE, max_entries=LLM_CACHE_MAX_ENTRIES,
+                 max_bytes=LLM_CACHE_MAX_BYTES, max_age=LLM_CACHE_MAX_AGE):
+        if mode not in MODES:
+            raise ValueError(f"Unknown LLM_CACHE_MODE: {mode}")
+        self.directory = directory
+        self.mode = mode
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if self.mode != "replay" and time.time() - entry.get("created", 0) > self.max_age:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry["response"]
+
+    def put(self, key, response, model=None):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"model": model, "created": time.time(), "response": response}, f)
+        os.replace(tmp, path)
+
+        with self.lock:
+            self.stores += 1
+            due = self.stores % EVICT_EVERY == 0
+        if due:
+            self.evict()
+
+    def evict(self):
+        """Drop entries older than `max_age`, then least recently used until under the size limits."""
+        entries = []
+        now = time.time()
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for mtime, size, path in entries:
+            over_limit = len(entries) - removed > self.max_entries or total > self.max_bytes
+            if not over_limit and now - mtime <= self.max_age:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            removed += 1
+            total -= size
+
+        with self.lock:
+            self.evictions += removed
+        return removed
+
+    def completion(self, call, model, template, candles, params=None, store=None):
+        """
+        Return the model response for this request, calling `call()` only when needed.
+
+        `call` must return a JSON-serializable value (normally the reply text).
+        If `store()` returns False the response is not cached (e.g. another model answered).
+        """
+        if self.mode == "off":
+            return call()
+
+        key = cache_key(model, template, candles, params)
+        if self.mode != "record":
+            cached = self.get(key)
+            if cached is not None:
+                with self.lock:
+                    self.hits += 1
+                return cached
+
+        with self.lock:
+            self.misses += 1
+        if self.mode == "replay":
+            raise LLMCacheMiss(key)
+
+        response = call()
+        if store is None or store():
+            self.put(key, response, model=model)
+        return response
+
+    def stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "mode": self.mode,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total * 100, 2) if total else 0.0,
+            }
+
+
+_cache = None
+
+
+def get_llm_cache():
+    global _cache
+    if _cache is None:
+        _cache = LLMCache()
+    return _cache
@@ -1,14 +1,26 @@
 import os
 import json
-import gspread
-from datetime import datetime
-from oauth2client.service_account import ServiceAccountCredentials
-from gspread_formatting import CellFormat, Color, format_cell_range
+from datetime import datetime, timedelta
+from sheets_spool import get_spool
+from trade_store import get_store
+from tracing import api_call
 
 GOOGLE_SHEETS_KEY_B64 = os.getenv("GOOGLE_SHEETS_KEY_B64")
 SHEET_ID = "10iX_0DoMMmgMdWPWH8EUOs19wphOIfqybloG_KRvo9U"
+RESULTS_HEADERS = ["date", "strategy", "action", "confidence", "reason", "result", "pnl"]
+
+_spreadsheet = None
 
 def get_sheet():
+    # Authorize once per process; gspread refreshes the token as needed
+    global _spreadsheet
+    if _spreadsheet is not None:
+        return _spreadsheet
+
+    # Imported here: the auth stack is only needed once the spool flushes
+    import gspread
+    from oauth2client.service_account import ServiceAccountCredentials
+
     # Decode service account key safely
     if not os.path.exists("google_sheets.json"):
         if not GOOGLE_SHEETS_KEY_B64:
@@ -20,8 +32,10 @@ def get_sheet():
         "https://spreadsheets.google.com/feeds",
         "https://www.googleapis.com/auth/drive"
     ])
-    client = gspread.authorize(creds)
-    return client.open_by_key(SHEET_ID)
+    with api_call("sheets", "open"):
+        client = gspread.authorize(creds)
+        _spreadsheet = client.open_by_key(SHEET_ID)
+    return _spreadsheet
 
 def base64_decode(b64_str):
     import base64
@@ -34,22 +48,10 @@ def get_results_tab(sheet):
         return sheet.add_worksheet(title="Results", rows="1000", cols="20")
 
 def log_trade_decision(data):
-    sheet = get_sheet()
-    ws = get_results_tab(sheet)
-
-    now = datetime.utcnow()
-    month = now.strftime("%Y-%m")
+    """Spool a decision row for the Results tab; the write-behind flusher sends it to Sheets."""
+    # Local time, like every other date in the trade store
+    now = datetime.now()
     strategy = "GPT"
-    row_id = f"{month}-{strategy}"
-
-    headers = ["date", "strategy", "action", "confidence", "reason", "result", "pnl"]
-    try:
-        existing = ws.row_values(1)
-        if existing != headers:
-            ws.resize(rows=1)
-            ws.update("A1:G1", [headers])
-    except:
-        ws.update("A1:G1", [headers])
 
     row = [
         now.strftime("%Y-%m-%d"),
@@ -60,14 +62,22 @@ def log_trade_decision(data):
         data.get("result", ""),
         data.get("pnl", "")
     ]
-    ws.append_row(row, value_input_option="USER_ENTERED")
-
-    # Apply color to the result column
-    format_result_colors(ws)
+    get_store().record_decision(
+        data.get("action", ""), data.get("confidence", 0), data.get("reason", ""),
+        strike_type=data.get("strike_type", ""), strategy=strategy,
+        result=data.get("result", ""), pnl=data.get("pnl"),
+    )
+    get_spool().enqueue("Results", row, headers=RESULTS_HEADERS, result_column=RESULTS_HEADERS.index("result"))
+
+def log_trade_to_sheets(trade):
+    """Spool a completed trade (dict of column -> value) for the Trades tab."""
+    headers = list(trade.keys())
+    get_spool().enqueue("Trades", [trade[h] for h in headers], headers=headers)
 
 def format_result_colors(ws):
+    """Recolor every win/loss row; a full repair pass, not used on the logging path."""
     try:
-        import gspread_formatting as gsf
+        from gspread_formatting import CellFormat, Color, format_cell_range
         records = ws.get_all_records()
         for i, row in enumerate(records, start=2):
             result = row.get("result", "").lower()
@@ -81,30 +91,30 @@ def format_result_colors(ws):
     except Exception as e:
         print(f"⚠️ Formatting failed: {e}")
 
-def get_recent_logs(sheet, limit=5):
-    ws = get_results_tab(sheet)
-    records = ws.get_all_records()
-    recent = records[-limit:] if records else []
-    return recent
+def get_recent_logs(sheet=None, limit=5):
+    """Most recent decisions in Results-tab layout, read from the local trade store."""
+    return [
+        {h: ("" if r.get(h) is None else r.get(h)) for h in RESULTS_HEADERS}
+        for r in get_store().recent_decisions(limit)
+    ]
 
-def get_daily_summary():
+def get_daily_summary(days=1):
     try:
-        sheet = get_sheet()
-        ws = get_results_tab(sheet)
-        records = ws.get_all_records()
-        today = datetime.utcnow().strftime("%Y-%m-%d")
-        today_logs = [r for r in records if r["date"] == today]
+        # Logged decisions, as on the Results tab; the scheduled runs decide but don't close trades
+        now = datetime.now()
+        today = now.strftime("%Y-%m-%d")
+        since = (now - timedelta(days=days - 1)).strftime("%Y-%m-%d")
+        summary = get_store().decision_summary(since, today)
 
-        if not today_logs:
+        if not summary:
             return None
 
-        total = len(today_logs)
-        wins = sum(1 for r in today_logs if "win" in str(r.get("result", "")).lower())
+        total, wins, avg_pnl = summary
         losses = total - wins
-        avg_pnl = sum(float(r.get("pnl", 0) or 0) for r in today_logs) / total
+        period = today if days == 1 else f"{since} → {today}"
 
         summary = (
-            f"📅 Date: `{today}`\n"
+            f"📅 Date: `{period}`\n"
             f"📊 Trades: `{total}` | ✅ Wins: `{wins}` | ❌ Losses: `{losses}`\n"
             f"💰 Avg PnL: `{avg_pnl:.2f}%`\n"
         )
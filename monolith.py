@@ -1,11 +1,19 @@
-import yfinance as yf
+import sys
+from bar_store import fetch_bars
 from gpt_decider import gpt_decision
+from lazy_imports import preload
 from alerts import send_daily_summary
 from datetime import datetime
 
-def run():
-    print("📈 Fetching SPY...")
-    df = yf.download("SPY", interval="1m", period="1d", progress=False)
+def run(df=None, summary=True):
+    if df is None:
+        preload("openai")
+        print("📈 Fetching SPY...")
+        df = fetch_bars("SPY")
+        if df is None:
+            import yfinance as yf
+
+            df = yf.download("SPY", interval="1m", period="1d", progress=False)
 
     print("🧠 GPT making decision...")
     try:
@@ -17,12 +25,20 @@ def run():
 
     # Send EOD performance summary if after market close
     now = datetime.utcnow()
-    if now.hour >= 20:  # 4 PM EST or later
+    if summary and now.hour >= 20:  # 4 PM EST or later
         print("📤 Sending EOD summary...")
         try:
             send_daily_summary()
         except Exception as e:
             print(f"❌ Error sending summary: {e}")
 
+    return decision_data
+
 if __name__ == "__main__":
-    run()
+    if len(sys.argv) > 1 and sys.argv[1] == "daemon":
+        from scheduler_daemon import main, monolith_pipeline
+        main(monolith_pipeline)
+    elif len(sys.argv) > 1 and sys.argv[1] == "summary":
+        send_daily_summary(days=7)
+    else:
+        run()
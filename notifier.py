@@ -1,5 +1,5 @@
 import os
-import requests
+from alert_dispatcher import HIGH, NORMAL, dispatch
 
 def send_discord_alert(decision, confidence, reason, action):
     webhook_url = os.getenv("DISCORD_WEBHOOK_URL")
@@ -25,10 +25,4 @@ def send_discord_alert(decision, confidence, reason, action):
         ]
     }
 
-    payload = {"embeds": [embed]}
-    try:
-        response = requests.post(webhook_url, json=payload)
-        response.raise_for_status()
-        print("✅ Discord alert sent.")
-    except Exception as e:
-        print("⚠️ Failed to send Discord alert:", e)
+    dispatch(embed, HIGH if action == "TRADE" else NORMAL)
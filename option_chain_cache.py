@@ -0,0 +1,172 @@
+"""TTL cache of option chains indexed by strike.
+
+Chains are keyed by (underlying, expiration) and stored as NumPy arrays sorted
+by strike, so ATM/ITM/OTM selection is a `searchsorted` instead of a scan. The
+nearest expirations are fetched concurrently over the shared Tradier client.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from tradier_client import get_client
+
+CHAIN_TTL = float(os.getenv("CHAIN_CACHE_TTL", "30"))
+EXPIRATIONS_TTL = 3600
+NEAREST_EXPIRATIONS = int(os.getenv("CHAIN_CACHE_EXPIRATIONS", "3"))
+# Dollar distance from the underlying used for ITM/OTM strikes (matches bot.py).
+STRIKE_OFFSET = 5
+
+
+class OptionSide:
+    """Tradeable contracts of one type for one expiration, sorted by strike."""
+
+    def __init__(self, options):
+        options = sorted(options, key=lambda o: o["strike"])
+        self.strikes = np.array([float(o["strike"]) for o in options], dtype=np.float64)
+        self.symbols = np.array([o["symbol"] for o in options], dtype=object)
+        self.last = np.array([float(o.get("last") or 0) for o in options], dtype=np.float64)
+        self.bid = np.array([float(o.get("bid") or 0) for o in options], dtype=np.float64)
+        self.ask = np.array([float(o.get("ask") or 0) for o in options], dtype=np.float64)
+
+    def __len__(self):
+        return len(self.strikes)
+
+    def nearest(self, target):
+        """Index of the strike closest to `target` (ties go to the lower strike)."""
+        if not len(self.strikes):
+            return None
+        i = int(np.searchsorted(self.strikes, target))
+        if i == 0:
+            return 0
+        if i == len(self.strikes):
+            return i - 1
+        return i - 1 if target - self.strikes[i - 1] <= self.strikes[i] - target else i
+
+    def contract(self, i):
+        return {
+            "symbol": self.symbols[i],
+            "strike": float(self.strikes[i]),
+            "last": float(self.last[i]),
+            "bid": float(self.bid[i]),
+            "ask": float(self.ask[i]),
+        }
+
+
+class OptionChain:
+    def __init__(self, underlying, expiration, options):
+        self.underlying = underlying
+        self.expiration = expiration
+        self.fetched_at = time.monotonic()
+
+        tradeable = [
+            o for o in options
+            if o.get("strike") is not None and ((o.get("last") or 0) > 0 or (o.get("bid") or 0) > 0)
+        ]
+        self.sides = {
+            "CALL": OptionSide([o for o in tradeable if o.get("option_type", "").upper() == "CALL"]),
+            "PUT": OptionSide([o for o in tradeable if o.get("option_type", "").upper() == "PUT"]),
+        }
+
+    def age(self):
+        return time.monotonic() - self.fetched_at
+
+    def select(self, direction, price, strike_type="ATM", offset=STRIKE_OFFSET):
+        """Pick the contract for `direction` nearest to the ATM/ITM/OTM target strike."""
+        direction = direction.upper()
+        side = self.sides[direction]
+        strike_type = (strike_type or "ATM").upper()
+
+        target = price
+        if strike_type == "ITM":
+            target = price - offset if direction == "CALL" else price + offset
+        elif strike_type == "OTM":
+            target = price + offset if direction == "CALL" else price - offset
+
+        i = side.nearest(target)
+        if i is None:
+            return None
+        contract = side.contract(i)
+        contract["expiration"] = self.expiration
+        contract["option_type"] = direction.lower()
+        return contract
+
+
+class ChainCache:
+    def __init__(self, client=None, ttl=CHAIN_TTL, max_workers=4):
+        self.client = client
+        self.ttl = ttl
+        self.max_workers = max_workers
+        self.chains = {}
+        self.expirations = {}
+        self.lock = threading.Lock()
+
+    def _client(self):
+        return self.client or get_client()
+
+    def nearest_expirations(self, underlying, n=NEAREST_EXPIRATIONS):
+        with self.lock:
+            cached = self.expirations.get(underlying)
+        if cached is None or time.monotonic() - cached[0] > EXPIRATIONS_TTL:
+            dates = sorted(self._client().get_expirations(underlying))
+            cached = (time.monotonic(), dates)
+            with self.lock:
+                self.expirations[underlying] = cached
+        return cached[1][:n]
+
+    def _fresh(self, key):
+        with self.lock:
+            chain = self.chains.get(key)
+        if chain is not None and chain.age() < self.ttl:
+            return chain
+        return None
+
+    def _fetch(self, underlying, expiration):
+        chain = OptionChain(underlying, expiration, self._client().get_chain(underlying, expiration))
+        with self.lock:
+            self.chains[(underlying, expiration)] = chain
+        return chain
+
+    def get(self, underlying, expiration):
+        return self._fresh((underlying, expiration)) or self._fetch(underlying, expiration)
+
+    def get_many(self, underlying, expirations):
+        """Return chains for `expirations` in order, fetching stale ones concurrently."""
+        chains = {exp: self._fresh((underlying, exp)) for exp in expirations}
+        stale = [exp for exp, chain in chains.items() if chain is None]
+
+        if stale:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(stale))) as pool:
+                futures = {exp: pool.submit(self._fetch, underlying, exp) for exp in stale}
+                for exp, future in futures.items():
+                    try:
+                        chains[exp] = future.result()
+                    except Exception as e:
+                        print(f"Skipping expiration {exp} due to error: {e}")
+        return [chains[exp] for exp in expirations if chains.get(exp) is not None]
+
+    def prefetch(self, underlying, n=NEAREST_EXPIRATIONS):
+        return self.get_many(underlying, self.nearest_expirations(underlying, n))
+
+    def select_option(self, underlying, direction, price, strike_type="ATM", n=NEAREST_EXPIRATIONS):
+        """Return the first expiration's contract matching `direction`/`strike_type`, or None."""
+        for chain in self.prefetch(underlying, n):
+            contract = chain.select(direction, price, strike_type)
+            if contract is not None:
+                return contract
+        return None
+
+    def clear(self):
+        with self.lock:
+            self.chains.clear()
+            self.expirations.clear()
+
+
+_cache = ChainCache()
+
+
+def get_chain_cache():
+    return _cache
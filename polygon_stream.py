@@ -1,29 +1,226 @@
 # polygon_stream.py
+"""Self-healing Polygon websocket consumer.
+
+The socket reader never waits on consumers. Events go into a bounded
+`EventQueue` and a separate task hands them to the callback. When the queue is
+full, `drop_oldest` discards the oldest event and `conflate` keeps only the
+newest queued event per (channel, symbol). Minute bars (`AM`) are never
+conflated. Disconnects and idle sockets trigger a reconnect with jittered
+exponential backoff. Whenever consecutive minute bars for a symbol are more
+than a minute apart (after a disconnect, or bars dropped under pressure), the
+missing minutes are fetched from Tradier `/markets/timesales` and delivered as
+`AM` events flagged `"backfill": True` before the newer bar. Bars for a minute
+that was already delivered are ignored, so nothing is counted twice.
+"""
+
 import asyncio
 import json
-import websockets
 import os
+import random
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+import websockets
+
+from indicator_engine import MARKET_TZ
+from tracing import count
 
 POLYGON_API_KEY = os.getenv("POLYGON_API_KEY")
+POLYGON_WS_URL = os.getenv("POLYGON_WS_URL", "wss://delayed.polygon.io/stocks")
 TICKER = "SPY"
 
-async def stream_spy_data(callback):
-    uri = "wss://delayed.polygon.io/stocks"
+STREAM_QUEUE_SIZE = int(os.getenv("STREAM_QUEUE_SIZE", "5000"))
+STREAM_QUEUE_POLICY = os.getenv("STREAM_QUEUE_POLICY", "drop_oldest")
+# No message (not even a status) for this long means the socket is dead.
+STREAM_IDLE_TIMEOUT = float(os.getenv("STREAM_IDLE_TIMEOUT", "90"))
+BACKOFF_INITIAL = 1.0
+BACKOFF_MAX = 60.0
+MINUTE_MS = 60_000
+# Backfill at most a full session of minutes per gap.
+MAX_BACKFILL_MINUTES = 390
+
+
+class EventQueue:
+    """Bounded FIFO between the socket reader and the consumer; `put` never blocks."""
+
+    def __init__(self, maxsize=STREAM_QUEUE_SIZE, policy=STREAM_QUEUE_POLICY):
+        if policy not in ("drop_oldest", "conflate"):
+            raise ValueError(f"Unknown queue policy '{policy}' (use drop_oldest or conflate)")
+        self.maxsize = maxsize
+        self.policy = policy
+        self.events = OrderedDict()
+        self.seq = 0
+        self.ready = asyncio.Event()
+        self.dropped = 0
+        self.conflated = 0
+
+    def __len__(self):
+        return len(self.events)
+
+    def _key(self, event):
+        if self.policy == "conflate" and event.get("ev") != "AM":
+            return (event.get("ev"), event.get("sym"))
+        self.seq += 1
+        return self.seq
+
+    def put(self, event):
+        key = self._key(event)
+        if key in self.events:
+            # Conflate: the newest value replaces the queued one but keeps its place in line.
+            self.events[key] = event
+            self.conflated += 1
+            return
+        if len(self.events) >= self.maxsize:
+            self.events.popitem(last=False)
+            self.dropped += 1
+            count("stream_events_dropped")
+        self.events[key] = event
+        self.ready.set()
+
+    async def get(self):
+        while not self.events:
+            self.ready.clear()
+            await self.ready.wait()
+        return self.events.popitem(last=False)[1]
+
+
+def backfill_bars(symbol, start_ms, end_ms):
+    """Minute bars in [start_ms, end_ms] from Tradier, as Polygon-style `AM` events."""
+    from scanner import parse_bar
+    from tradier_client import get_client
+
+    start = datetime.fromtimestamp(start_ms / 1000, tz=MARKET_TZ)
+    end = datetime.fromtimestamp(end_ms / 1000, tz=MARKET_TZ)
+    rows = get_client().get_timesales(symbol, start=start.strftime("%Y-%m-%d %H:%M"), end=end.strftime("%Y-%m-%d %H:%M"))
+    events = []
+    for o, h, l, c, v, ts in map(parse_bar, rows):
+        s = int(ts.timestamp() * 1000)
+        if start_ms <= s <= end_ms:
+            events.append({"ev": "AM", "sym": symbol, "o": o, "h": h, "l": l, "c": c, "v": v,
+                           "s": s, "e": s + MINUTE_MS, "backfill": True})
+    return sorted(events, key=lambda e: e["s"])
+
 
-    async with websockets.connect(uri) as websocket:
-        await websocket.send(json.dumps({
-            "action": "auth",
-            "params": POLYGON_API_KEY
-        }))
-        await websocket.send(json.dumps({
-            "action": "subscribe",
-            "params": f"AM.{TICKER}"
-        }))
+class PolygonStream:
+    def __init__(self, callback, symbols=(TICKER,), channels=("AM",), policy=STREAM_QUEUE_POLICY,
+                 maxsize=STREAM_QUEUE_SIZE, url=POLYGON_WS_URL, api_key=POLYGON_API_KEY, backfill=True):
+        self.callback = callback
+        self.symbols = [s.upper() for s in symbols]
+        self.channels = channels
+        self.policy = policy
+        self.maxsize = maxsize
+        self.url = url
+        self.api_key = api_key
+        self.backfill = backfill
+        self.queue = None
+        self.last_bar = {}
+        self.reconnects = 0
+        self.duplicates = 0
+        self.backfilled = 0
 
-        print("📡 Listening for SPY live ticks...")
+    def subscription(self):
+        return ",".join(f"{ch}.{sym}" for ch in self.channels for sym in self.symbols)
+
+    # === Socket reader ===
+
+    async def _read(self, websocket):
+        while True:
+            message = await asyncio.wait_for(websocket.recv(), timeout=STREAM_IDLE_TIMEOUT)
+            data = json.loads(message)
+            for event in data if isinstance(data, list) else [data]:
+                if event.get("ev") == "status":
+                    self._on_status(event)
+                else:
+                    self.queue.put(event)
+
+    def _on_status(self, event):
+        status = event.get("status")
+        print(f"📡 Polygon: {event.get('message') or status}")
+        if status == "auth_failed":
+            raise PermissionError("Polygon authentication failed")
+
+    async def _connect_forever(self):
+        backoff = BACKOFF_INITIAL
+        while True:
+            connected_at = None
+            try:
+                async with websockets.connect(self.url, ping_interval=20, ping_timeout=20) as websocket:
+                    connected_at = time.monotonic()
+                    await websocket.send(json.dumps({"action": "auth", "params": self.api_key}))
+                    await websocket.send(json.dumps({"action": "subscribe", "params": self.subscription()}))
+                    print(f"📡 Listening for {', '.join(self.symbols)} ({self.subscription()})...")
+                    await self._read(websocket)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ Polygon stream lost: {type(e).__name__}: {e}")
+
+            self.reconnects += 1
+            count("stream_reconnects")
+            # A connection that stayed up a while resets the backoff.
+            if connected_at is not None and time.monotonic() - connected_at > BACKOFF_MAX:
+                backoff = BACKOFF_INITIAL
+            delay = backoff * random.uniform(0.5, 1.0)
+            print(f"🔁 Reconnecting in {delay:.1f}s...")
+            await asyncio.sleep(delay)
+            backoff = min(backoff * 2, BACKOFF_MAX)
+
+    # === Consumer ===
+
+    async def _deliver(self, event):
+        try:
+            await self.callback(event)
+        except Exception as e:
+            print(f"❌ Stream callback error: {e}")
+
+    async def _fill_gap(self, symbol, start_ms, end_ms):
+        if end_ms - start_ms > MAX_BACKFILL_MINUTES * MINUTE_MS:
+            start_ms = end_ms - MAX_BACKFILL_MINUTES * MINUTE_MS
+        try:
+            events = await asyncio.to_thread(backfill_bars, symbol, start_ms, end_ms)
+        except Exception as e:
+            print(f"⚠️ Backfill failed for {symbol}: {e}")
+            return
+        for event in events:
+            if event["s"] > self.last_bar.get(symbol, -1):
+                self.last_bar[symbol] = event["s"]
+                self.backfilled += 1
+                count("stream_bars_backfilled")
+                await self._deliver(event)
+        if events:
+            print(f"🧩 Backfilled {len(events)} {symbol} bar(s) from Tradier.")
+
+    async def _consume(self):
         while True:
-            response = await websocket.recv()
-            data = json.loads(response)
-            if isinstance(data, list):
-                for event in data:
-                    await callback(event)
+            event = await self.queue.get()
+            if event.get("ev") == "AM":
+                symbol, start = event.get("sym"), int(event.get("s", 0))
+                last = self.last_bar.get(symbol)
+                if last is not None and start <= last:
+                    self.duplicates += 1
+                    continue
+                if self.backfill and last is not None and start - last > MINUTE_MS:
+                    await self._fill_gap(symbol, last + MINUTE_MS, start - MINUTE_MS)
+                self.last_bar[symbol] = start
+            await self._deliver(event)
+
+    async def run(self):
+        self.queue = EventQueue(self.maxsize, self.policy)
+        reader = asyncio.create_task(self._connect_forever())
+        consumer = asyncio.create_task(self._consume())
+        try:
+            await asyncio.gather(reader, consumer)
+        finally:
+            reader.cancel()
+            consumer.cancel()
+
+
+async def stream_spy_data(callback, symbols=(TICKER,), channels=("AM",), policy=STREAM_QUEUE_POLICY):
+    """Run the stream forever, awaiting `callback(event)` for each event (see `PolygonStream`)."""
+    await PolygonStream(callback, symbols, channels, policy).run()
+
+if __name__ == "__main__":
+    from indicator_engine import make_stream_callback
+
+    asyncio.run(stream_spy_data(make_stream_callback()))
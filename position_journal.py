@@ -0,0 +1,193 @@
+"""Append-only, fsync'd journal of option positions.
+
+Each open/close is one JSON line appended with a single `O_APPEND` write, so
+concurrent writers never interleave partial rows. Open-position state is
+rebuilt in memory by replaying the journal on startup; the first run seeds the
+journal from the existing rows of `trade_log.csv`. When a `TradeStore` is
+attached, opens and closes are mirrored into the trade history.
+"""
+
+import csv
+import json
+import os
+import threading
+import uuid
+from datetime import datetime
+
+import numpy as np
+
+from trade_store import get_store
+
+JOURNAL_FILE = os.getenv("POSITION_JOURNAL", "positions.jsonl")
+TRADE_LOG = "trade_log.csv"
+
+
+class PositionJournal:
+    def __init__(self, path=JOURNAL_FILE, seed_csv=TRADE_LOG, store=None):
+        self.path = path
+        self.store = store
+        self.lock = threading.Lock()
+        self.open_positions = {}
+        self._arrays = None
+
+        if not os.path.exists(self.path) and seed_csv and os.path.exists(seed_csv):
+            self._seed_from_csv(seed_csv)
+        self._replay()
+
+    # === Persistence ===
+
+    def _append(self, record):
+        line = (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _records(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # A torn trailing line from a crash mid-write is ignored.
+                    continue
+
+    def _replay(self):
+        for record in self._records():
+            self._apply(record)
+
+    def _apply(self, record):
+        if record.get("event") == "open":
+            position = {k: v for k, v in record.items() if k != "event"}
+            position.setdefault("pnl", 0.0)
+            self.open_positions[record["id"]] = position
+        elif record.get("event") == "close":
+            self.open_positions.pop(record["id"], None)
+        self._arrays = None
+
+    def _seed_from_csv(self, path):
+        with open(path, newline="") as f:
+            for i, row in enumerate(csv.DictReader(f)):
+                self._append({
+                    "event": "open",
+                    "id": f"csv-{i}",
+                    "time": row.get("Time", ""),
+                    "direction": row.get("Direction", "").lower(),
+                    "symbol": row.get("Symbol", ""),
+                    "underlying": "SPY",
+                    "entry_price": float(row.get("EntryPrice") or 0),
+                    "stop_pct": float(row.get("StopLoss%") or 0),
+                    "target_pct": float(row.get("Target%") or 0),
+                    "reason": row.get("Reason", ""),
+                    "tplus1": row.get("Tplus1", ""),
+                })
+                if row.get("Status") != "OPEN":
+                    self._append({
+                        "event": "close",
+                        "id": f"csv-{i}",
+                        "time": row.get("Time", ""),
+                        "pnl": float(row.get("PnL") or 0),
+                        "outcome": "",
+                    })
+
+    # === Mutations ===
+
+    def open_position(self, direction, symbol, entry_price, stop_pct, target_pct, reason="", underlying="SPY"):
+        record = {
+            "event": "open",
+            "id": uuid.uuid4().hex[:12],
+            "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "direction": direction.lower(),
+            "symbol": symbol,
+            "underlying": underlying,
+            "entry_price": float(entry_price),
+            "stop_pct": float(stop_pct),
+            "target_pct": float(target_pct),
+            "reason": reason,
+            "tplus1": "Pending",
+        }
+        with self.lock:
+            self._append(record)
+            self._apply(record)
+        if self.store is not None:
+            self.store.record_open(
+                record["id"], direction, symbol, entry_price, stop_pct, target_pct,
+                reason=reason, underlying=underlying, opened_at=record["time"],
+            )
+        return record["id"]
+
+    def close_position(self, position_id, pnl, outcome="", exit_price=None):
+        record = {
+            "event": "close",
+            "id": position_id,
+            "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "pnl": float(pnl),
+            "outcome": outcome,
+        }
+        with self.lock:
+            self._append(record)
+            self._apply(record)
+        if self.store is not None:
+            self.store.record_close(position_id, pnl, exit_price, closed_at=record["time"])
+
+    # === Evaluation ===
+
+    def underlyings(self):
+        return sorted({p.get("underlying", "SPY") for p in self.open_positions.values()})
+
+    def _position_arrays(self):
+        if self._arrays is None:
+            positions = list(self.open_positions.values())
+            self._arrays = {
+                "ids": [p["id"] for p in positions],
+                "underlying": [p.get("underlying", "SPY") for p in positions],
+                "entry": np.array([p["entry_price"] for p in positions], dtype=np.float64),
+                "stop": np.array([p["stop_pct"] for p in positions], dtype=np.float64) / 100,
+                "target": np.array([p["target_pct"] for p in positions], dtype=np.float64) / 100,
+                "sign": np.array([1.0 if p["direction"] == "call" else -1.0 for p in positions]),
+            }
+        return self._arrays
+
+    def evaluate(self, prices):
+        """
+        Mark every open position against `prices` (underlying -> last) in one pass.
+
+        Positions that hit their stop or target are closed in the journal.
+        Returns a list of `(position, pnl_percent, outcome)` for closed positions.
+        """
+        with self.lock:
+            if not self.open_positions:
+                return []
+            arrays = self._position_arrays()
+            px = np.array([prices.get(u, np.nan) for u in arrays["underlying"]], dtype=np.float64)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                gain = arrays["sign"] * (px - arrays["entry"]) / arrays["entry"]
+            pnl = np.round(gain * 100, 2)
+            stop_hit = gain <= -arrays["stop"]
+            target_hit = (gain >= arrays["target"]) & ~stop_hit
+
+            for position_id, value in zip(arrays["ids"], pnl):
+                if not np.isnan(value):
+                    self.open_positions[position_id]["pnl"] = float(value)
+            positions = [self.open_positions[i] for i in arrays["ids"]]
+
+        closed = []
+        for i in np.flatnonzero(stop_hit | target_hit):
+            outcome = "stop" if stop_hit[i] else "target"
+            self.close_position(arrays["ids"][i], pnl[i], outcome, exit_price=float(px[i]))
+            closed.append((positions[i], float(pnl[i]), outcome))
+        return closed
+
+
+_journal = None
+
+
+def get_journal():
+    global _journal
+    if _journal is None:
+        _journal = PositionJournal(store=get_store())
+    return _journal
@@ -0,0 +1,164 @@
+"""Asyncio monitor for any number of open option positions.
+
+Every tick fetches quotes for all tracked symbols in one batched
+`/markets/quotes` call and checks stop/target levels for each position.
+"""
+
+import asyncio
+import inspect
+import itertools
+import os
+import time
+from datetime import datetime, timedelta
+
+from tradier_client import AsyncTradierClient
+
+POLL_INTERVAL = float(os.getenv("POSITION_POLL_INTERVAL", "1.0"))
+
+
+def default_deadline():
+    """11:00 local time like the original monitor, or 15 minutes out if already past."""
+    end_time = datetime.now().replace(hour=11, minute=0, second=0, microsecond=0)
+    if datetime.now() > end_time:
+        end_time = datetime.now() + timedelta(minutes=15)
+    return end_time
+
+
+class Position:
+    _ids = itertools.count(1)
+
+    def __init__(self, symbol, entry_price, stop_pct, target_pct, deadline=None):
+        self.id = next(self._ids)
+        self.symbol = symbol
+        self.entry_price = float(entry_price)
+        self.stop_pct = float(stop_pct)
+        self.target_pct = float(target_pct)
+        self.target = self.entry_price * (1 + self.target_pct / 100)
+        self.stop = self.entry_price * (1 - self.stop_pct / 100)
+        self.deadline = deadline or default_deadline()
+        self.last_price = None
+        self.result = None
+
+    def check(self, price, now):
+        """Return (price, stop_hit, target_hit) if the position should exit, else None."""
+        self.last_price = price
+        if price >= self.target:
+            return price, False, True
+        if price <= self.stop:
+            return price, True, False
+        if now >= self.deadline:
+            return price, False, False
+        return None
+
+
+class PositionMonitor:
+    def __init__(self, interval=POLL_INTERVAL, client=None, on_exit=None):
+        self.interval = interval
+        self.client = client
+        self.on_exit = on_exit
+        self.positions = {}
+        self.futures = {}
+        self._wakeup = None
+
+    def add(self, symbol, entry_price, stop_pct, target_pct, deadline=None):
+        """Track a position; returns a future resolving to (price, stop_hit, target_hit)."""
+        position = Position(symbol, entry_price, stop_pct, target_pct, deadline)
+        self.positions[position.id] = position
+        self.futures[position.id] = asyncio.get_running_loop().create_future()
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return self.futures[position.id]
+
+    def remove(self, position_id):
+        self.positions.pop(position_id, None)
+        future = self.futures.pop(position_id, None)
+        if future is not None and not future.done():
+            future.cancel()
+
+    async def _close(self, position, result):
+        price, stop_hit, target_hit = result
+        position.result = result
+        if target_hit:
+            print(f"🎯 Target hit for {position.symbol} at {price:.2f}. Exiting.")
+        elif stop_hit:
+            print(f"🛑 Stop loss hit for {position.symbol} at {price:.2f}. Exiting.")
+        else:
+            print(f"⏰ Monitoring window ended for {position.symbol} at {price:.2f}.")
+
+        self.positions.pop(position.id, None)
+        future = self.futures.pop(position.id, None)
+        if future is not None and not future.done():
+            future.set_result(result)
+
+        if self.on_exit is not None:
+            outcome = self.on_exit(position, *result)
+            if inspect.isawaitable(outcome):
+                await outcome
+
+    async def tick(self):
+        if not self.positions:
+            return
+        symbols = sorted({p.symbol for p in self.positions.values()})
+        quotes = await self.client.get_quotes(symbols)
+        prices = {q["symbol"]: q.get("last") for q in quotes if q.get("last") is not None}
+
+        now = datetime.now()
+        for position in list(self.positions.values()):
+            price = prices.get(position.symbol, position.last_price)
+            if price is None:
+                continue
+            result = position.check(float(price), now)
+            if result is not None:
+                await self._close(position, result)
+        await self.expire(now)
+
+    async def expire(self, now):
+        """End positions past their deadline even when no quote arrived for them."""
+        for position in list(self.positions.values()):
+            if now < position.deadline:
+                continue
+            if position.last_price is not None:
+                await self._close(position, (position.last_price, False, False))
+                continue
+            print(f"⏰ Monitoring window ended for {position.symbol} without a price.")
+            self.positions.pop(position.id, None)
+            future = self.futures.pop(position.id, None)
+            if future is not None and not future.done():
+                future.set_exception(TimeoutError(f"no quote for {position.symbol} before the monitoring deadline"))
+
+    async def run(self, stop_when_empty=True):
+        """Poll until all positions close (or forever when `stop_when_empty` is False)."""
+        own_client = self.client is None
+        if own_client:
+            self.client = AsyncTradierClient()
+        self._wakeup = asyncio.Event()
+
+        try:
+            while self.positions or not stop_when_empty:
+                started = time.monotonic()
+                try:
+                    await self.tick()
+                except Exception as e:
+                    print(f"Error during monitoring: {e}")
+                    await self.expire(datetime.now())
+
+                self._wakeup.clear()
+                delay = max(0.0, self.interval - (time.monotonic() - started))
+                if not self.positions and not stop_when_empty:
+                    delay = None
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            if own_client:
+                await self.client.close()
+                self.client = None
+
+
+async def monitor_positions(positions, interval=POLL_INTERVAL):
+    """Monitor `(symbol, entry_price, stop_pct, target_pct)` tuples until every one exits."""
+    monitor = PositionMonitor(interval=interval)
+    futures = [monitor.add(*p) for p in positions]
+    await monitor.run()
+    return [f.result() for f in futures]
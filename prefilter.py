@@ -0,0 +1,107 @@
+"""Local pre-filter that keeps obvious no-trade bars away from the LLM.
+
+Each bar is scored with the cheap local signals the repo already has:
+`detect_market_regime`, `calculate_atr`, the session range behind
+`recommend_strike_type`, and `rule_based_decision` (EMA/VWAP alignment scored
+by `calculate_confidence`). A bar is escalated to the LLM only if every check
+passes. Skips go to the trade store's `skips` table with their reason codes,
+so `get_store().skip_reasons(date)` shows why bars were dropped.
+
+Modes (`PREFILTER_MODE`):
+
+```
+gate    - skip the LLM when a check fails (default)
+shadow  - record what would have been skipped, but always escalate
+off     - no pre-filter
+```
+"""
+
+import math
+import os
+
+from confidence_engine import rule_based_decision
+from indicator_engine import engine_from_df
+from prompt_builder import ohlcv
+from strategy import calculate_atr, detect_market_regime
+from strike_logic import recommend_strike_type
+from tracing import count, span
+from trade_store import get_store
+
+PREFILTER_MODE = os.getenv("PREFILTER_MODE", "gate")
+PREFILTER_MIN_SCORE = int(os.getenv("PREFILTER_MIN_SCORE", "55"))
+# Minimum high-low range of the last PREFILTER_WINDOW bars, in % of price.
+PREFILTER_MIN_RANGE_PCT = float(os.getenv("PREFILTER_MIN_RANGE_PCT", "0.10"))
+# Minimum 14-bar ATR, in % of price.
+PREFILTER_MIN_ATR_PCT = float(os.getenv("PREFILTER_MIN_ATR_PCT", "0.02"))
+PREFILTER_WINDOW = 30
+PREFILTER_MIN_BARS = 20
+
+
+def evaluate(df):
+    """Score the latest bar; `reasons` lists the failed checks as `(code, detail)` pairs."""
+    df = ohlcv(df)
+    report = {"bars": len(df), "reasons": [], "action": "skip", "score": 0,
+              "regime": None, "atr": None, "range_pct": None, "strike_type": "ATM"}
+    if len(df) < PREFILTER_MIN_BARS:
+        report["reasons"].append(("warmup", f"only {len(df)} bars"))
+        return report
+
+    price = float(df["Close"].iloc[-1])
+    recent = df.tail(PREFILTER_WINDOW)
+    range_pct = float((recent["High"].max() - recent["Low"].min()) / price * 100)
+    atr = float(calculate_atr(df.tail(PREFILTER_WINDOW).copy()))
+    regime = detect_market_regime(recent.copy())
+    rule = rule_based_decision(engine_from_df(df).indicators())
+    report.update(action=rule["action"], score=rule["confidence"], regime=regime,
+                  atr=None if math.isnan(atr) else atr, range_pct=round(range_pct, 3),
+                  strike_type=recommend_strike_type(recent, rule["action"]))
+
+    reasons = report["reasons"]
+    if regime == "choppy":
+        reasons.append(("choppy", "EMA9/EMA21 crossing"))
+    if range_pct < PREFILTER_MIN_RANGE_PCT:
+        reasons.append(("low_range", f"{PREFILTER_WINDOW}m range {range_pct:.2f}% < {PREFILTER_MIN_RANGE_PCT}%"))
+    if report["atr"] is not None and report["atr"] / price * 100 < PREFILTER_MIN_ATR_PCT:
+        reasons.append(("low_atr", f"ATR {report['atr']:.2f} < {PREFILTER_MIN_ATR_PCT}% of price"))
+    if rule["action"] == "skip":
+        reasons.append(("no_trend", rule["reason"]))
+    elif rule["confidence"] < PREFILTER_MIN_SCORE:
+        reasons.append(("low_score", f"local score {rule['confidence']} < {PREFILTER_MIN_SCORE}"))
+    return report
+
+
+def gate(df, symbol="SPY", stage="bot", mode=None):
+    """
+    Decide whether this bar is worth an LLM call. Returns the `evaluate` report
+    with `escalate` set; skips are counted and recorded in the trade store.
+    """
+    mode = mode or PREFILTER_MODE
+    if mode == "off":
+        return {"escalate": True, "reasons": []}
+
+    with span("prefilter.evaluate"):
+        report = evaluate(df)
+    if not report["reasons"]:
+        count("prefilter_escalations")
+        report["escalate"] = True
+        return report
+
+    codes = ",".join(code for code, _ in report["reasons"])
+    details = "; ".join(detail for _, detail in report["reasons"])
+    try:
+        get_store().record_skip(symbol, stage, codes, report["action"], report["score"],
+                                report["regime"], report["atr"], report["range_pct"])
+    except Exception as e:
+        print(f"⚠️ Could not record prefilter skip: {e}")
+
+    if mode == "shadow":
+        count("prefilter_shadow_skips")
+        print(f"👀 Prefilter would skip {symbol} ({details}); escalating anyway (shadow mode)")
+        report["escalate"] = True
+        return report
+
+    count("prefilter_skips")
+    print(f"🚦 Prefilter skip {symbol}: {details}")
+    report["escalate"] = False
+    report["summary"] = details
+    return report
@@ -0,0 +1,203 @@
+"""Compact LLM prompts for trade decisions.
+
+Raw candles are the bulk of a decision prompt. Here they are encoded column by
+column as integer cent offsets from the first open, with volume in thousands.
+A one-line indicator summary (EMA, RSI, MACD, VWAP, ATR, regime, range) comes
+first, so the model reads precomputed features instead of re-deriving them.
+Replies are requested as a small JSON object, using the API's JSON mode where
+the model supports it, and every request reports its token usage.
+
+Example user message (30 bars of SPY in about 200 tokens):
+
+```
+SPY 1m 09:31-10:00 base=510.25
+ind: px=511.02 ema9=510.91 ema20=510.62 rsi=61 macd=0.14 vwap=510.70 atr=0.31 volspike=0 regime=uptrend range=0.34%
+o:0,3,5,...
+h:4,7,9,...
+l:-2,1,3,...
+c:3,5,8,...
+vk:812,640,702,...
+recent: call/72/win,put/65/loss
+```
+"""
+
+import json
+import os
+import re
+
+import numpy as np
+
+from indicator_engine import engine_from_df
+from strategy import detect_market_regime
+from tracing import count
+
+PROMPT_VERSION = "compact-v1"
+PROMPT_BARS = int(os.getenv("PROMPT_BARS", "30"))
+MAX_TOKENS = int(os.getenv("PROMPT_MAX_TOKENS", "80"))
+TEMPERATURE = 0.3
+
+# Model families that accept `response_format={"type": "json_object"}`.
+JSON_MODE_PREFIXES = ("gpt-4o", "gpt-4.1", "gpt-4-turbo", "gpt-4-1106", "gpt-4-0125", "gpt-3.5-turbo", "o1", "o3", "o4")
+
+SYSTEM_PROMPT = (
+    "You are a disciplined {symbol} 0-1 DTE options scalper. Input: an indicator line, then 1-minute bars "
+    "as columns of integer cent offsets from base (o,h,l,c) and volume in thousands (vk), oldest first. "
+    "Reply with JSON only: {{\"action\":\"call|put|skip\",\"confidence\":0-100,"
+    "\"strike_type\":\"ATM|ITM|OTM\",\"reason\":\"<=12 words\"}}"
+)
+
+
+def supports_json_mode(model):
+    return model.startswith(JSON_MODE_PREFIXES)
+
+
+def request_params(model, max_tokens=MAX_TOKENS, temperature=TEMPERATURE):
+    params = {"temperature": temperature, "max_tokens": max_tokens}
+    if supports_json_mode(model):
+        params["response_format"] = {"type": "json_object"}
+    return params
+
+
+def estimate_tokens(text):
+    """Rough pre-send estimate (~4 characters per token); the API's usage is authoritative."""
+    return max(1, len(text) // 4)
+
+
+# === Encoding ===
+
+def ohlcv(df):
+    """Normalize a yfinance/Tradier frame to float columns Open/High/Low/Close/Volume."""
+    if getattr(df.columns, "nlevels", 1) > 1:
+        df = df.copy()
+        df.columns = df.columns.get_level_values(0)
+    df = df.rename(columns=lambda c: str(c).strip().capitalize())
+    df = df[["Open", "High", "Low", "Close", "Volume"]].dropna().astype(float)
+    return df.loc[:, ~df.columns.duplicated()]
+
+
+def encode_candles(df, bars=PROMPT_BARS):
+    """
+    Columnar delta encoding of the last `bars` candles.
+
+    Returns `(span, text, rows)`: the `HH:MM-HH:MM` time span, the encoded text
+    and the rounded `[time, o, h, l, c, v]` rows used for the cache key.
+    """
+    recent = df.tail(bars)
+    values = recent.to_numpy()
+    base = round(float(values[0, 0]), 2)
+    cents = np.rint((values[:, :4] - base) * 100).astype(int)
+    volume_k = np.rint(values[:, 4] / 1000).astype(int)
+
+    times = [ts.strftime("%H:%M") if hasattr(ts, "strftime") else str(ts) for ts in recent.index]
+    lines = [f"base={base:.2f}"]
+    for name, column in zip("ohlc", cents.T):
+        lines.append(f"{name}:" + ",".join(map(str, column)))
+    lines.append("vk:" + ",".join(map(str, volume_k)))
+
+    rows = [[t, *np.round(row[:4], 2).tolist(), int(row[4])] for t, row in zip(times, values)]
+    span = f"{times[0]}-{times[-1]}" if times else ""
+    return span, "\n".join(lines), rows
+
+
+def indicator_summary(df):
+    """One line of precomputed features for the whole session so far."""
+    engine = engine_from_df(df)
+    ind = engine.indicators()
+    close = df["Close"].to_numpy()
+    session_range = (df["High"].max() - df["Low"].min()) / close[-1] * 100 if len(close) else 0.0
+    regime = detect_market_regime(df.copy()) if len(df) >= 3 else "unknown"
+    atr = engine.atr.value
+    return (
+        f"ind: px={ind['price']:.2f} ema9={ind['ema9']:.2f} ema20={ind['ema20']:.2f} rsi={ind['rsi']:.0f} "
+        f"macd={ind['macd']:.2f} vwap={ind['vwap']:.2f} atr={atr if atr is not None else 'na'} "
+        f"volspike={int(bool(ind['volume_spike']))} regime={regime} range={session_range:.2f}%"
+    )
+
+
+def compact_logs(logs, limit=5):
+    """Recent decisions as `action/confidence/result` triples."""
+    items = []
+    for log in (logs or [])[-limit:]:
+        action = str(log.get("action", "")).lower() or "?"
+        confidence = log.get("confidence", "")
+        try:
+            confidence = int(float(confidence))
+        except (TypeError, ValueError):
+            pass
+        result = str(log.get("result", "")).lower() or "open"
+        items.append(f"{action}/{confidence}/{result}")
+    return ",".join(items)
+
+
+def build_prompt(df, symbol="SPY", logs=None, bars=PROMPT_BARS):
+    """
+    Build the decision request.
+
+    Returns a dict with `messages`, `template` and `candles` (for the LLM cache
+    key), `context` (anything else in the prompt that should key the cache) and
+    `estimated_tokens`.
+    """
+    df = ohlcv(df)
+    if df.empty:
+        raise ValueError(f"{symbol} data is empty after cleaning.")
+
+    span, bars_text, rows = encode_candles(df, bars)
+    recent = compact_logs(logs)
+    user = f"{symbol} 1m {span}\n{indicator_summary(df)}\n{bars_text}"
+    if recent:
+        user += f"\nrecent: {recent}"
+
+    system = SYSTEM_PROMPT.format(symbol=symbol)
+    messages = [{"role": "system", "content": system}, {"role": "user", "content": user}]
+    return {
+        "messages": messages,
+        "template": f"{PROMPT_VERSION}:{system}",
+        "candles": rows,
+        "context": {"indicators": user.splitlines()[1], "recent": recent},
+        "estimated_tokens": estimate_tokens(system) + estimate_tokens(user),
+    }
+
+
+# === Replies ===
+
+def parse_decision(text):
+    """Parse the JSON reply, tolerating code fences or surrounding prose."""
+    text = (text or "").strip()
+    try:
+        data = json.loads(text)
+    except ValueError:
+        match = re.search(r"\{.*\}", text, re.S)
+        data = json.loads(match.group(0)) if match else {}
+
+    action = str(data.get("action", "skip")).lower()
+    if action not in ("call", "put"):
+        action = "skip"
+    strike_type = str(data.get("strike_type", "ATM")).upper()
+    if strike_type not in ("ATM", "ITM", "OTM"):
+        strike_type = "ATM"
+    try:
+        confidence = max(0, min(100, int(float(data.get("confidence", 0)))))
+    except (TypeError, ValueError):
+        confidence = 0
+    return {
+        "action": action,
+        "confidence": confidence,
+        "strike_type": strike_type,
+        "reason": str(data.get("reason", "No reason provided.")),
+    }
+
+
+def report_usage(response, estimated=None):
+    """Print and count the token usage of one completion; returns (prompt_tokens, completion_tokens)."""
+    usage = getattr(response, "usage", None)
+    prompt_tokens = getattr(usage, "prompt_tokens", None)
+    completion_tokens = getattr(usage, "completion_tokens", None)
+    if prompt_tokens is None:
+        print(f"🔢 Tokens: ~{estimated} prompt (estimated, no usage returned)")
+        return None, None
+
+    count("llm_requests")
+    count("llm_prompt_tokens", prompt_tokens)
+    count("llm_completion_tokens", completion_tokens or 0)
+    print(f"🔢 Tokens: {prompt_tokens} prompt + {completion_tokens} completion")
+    return prompt_tokens, completion_tokens
@@ -1,33 +1,86 @@
 import websocket
 import json
 import os
+import threading
+import time
+from bar_aggregator import BarAggregator, to_frame
+from indicator_engine import IndicatorEngine
 
 API_KEY = os.getenv("POLYGON_API_KEY")
+SYMBOL = os.getenv("REALTIME_SYMBOL", "SPY")
+# Close a quiet symbol's minute once nothing has arrived for this long past its end.
+IDLE_CLOSE_MS = int(os.getenv("BAR_IDLE_CLOSE_MS", "5000"))
+
+engines = {}
+
+
+def on_bar(symbol, minutes, bar):
+    if minutes != 1:
+        print(f"🕯️ {symbol} {minutes}m bar closed at {bar[4]:.2f} (vol {bar[5]:,.0f})")
+        return
+    engine = engines.get(symbol)
+    if engine is None:
+        engine = engines[symbol] = IndicatorEngine(symbol)
+    ind = engine.update(bar[1], bar[2], bar[3], bar[4], bar[5], int(bar[0]))
+    print(f"📈 {symbol} {ind['price']:.2f} | EMA9 {ind['ema9']:.2f} | RSI {ind['rsi']:.1f} | VWAP {ind['vwap']:.2f}")
+
+
+aggregator = BarAggregator(on_bar=on_bar)
+
+
+def latest_bars(symbol=SYMBOL, minutes=1, n=30):
+    """Zero-copy view of the newest bars (see `bar_aggregator` for the row layout)."""
+    return aggregator.bars(symbol, minutes, n)
+
+
+def latest_frame(symbol=SYMBOL, minutes=1, n=30):
+    return to_frame(latest_bars(symbol, minutes, n))
+
 
 def on_message(ws, message):
-    print(f"📈 Real-time message: {message}")
+    data = json.loads(message)
+    for event in data if isinstance(data, list) else [data]:
+        if event.get("ev") == "status":
+            print(f"📡 {event.get('message')}")
+        else:
+            aggregator.add_event(event)
+
+
+def close_idle_bars():
+    # Minutes close on event time as events arrive; this covers quiet minutes
+    # where no later event comes to move the watermark.
+    while True:
+        time.sleep(1)
+        aggregator.close_idle(IDLE_CLOSE_MS)
 
 def on_open(ws):
     auth_data = {"action": "auth", "params": API_KEY}
     ws.send(json.dumps(auth_data))
 
-    # Subscribe to SPY 1-minute bars (aggregates)
-    sub_data = {"action": "subscribe", "params": "A.SPY"}
+    # Subscribe to per-second aggregates; they are rolled up into 1/5/15-minute bars
+    sub_data = {"action": "subscribe", "params": f"A.{SYMBOL}"}
     ws.send(json.dumps(sub_data))
 
 def on_error(ws, error):
     print(f"❌ Error: {error}")
 
-def on_close(ws):
+def on_close(ws, *args):
     print("🚪 Connection closed.")
 
-socket = f"wss://socket.polygon.io/stocks"
 
-ws = websocket.WebSocketApp(socket,
-                            on_open=on_open,
-                            on_message=on_message,
-                            on_error=on_error,
-                            on_close=on_close)
+def main():
+    socket = f"wss://socket.polygon.io/stocks"
+
+    ws = websocket.WebSocketApp(socket,
+                                on_open=on_open,
+                                on_message=on_message,
+                                on_error=on_error,
+                                on_close=on_close)
+
+    threading.Thread(target=close_idle_bars, name="bar-idle-close", daemon=True).start()
+    print("🔌 Connecting to Polygon real-time feed...")
+    ws.run_forever()
+
 
-print("🔌 Connecting to Polygon real-time feed...")
-ws.run_forever()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""Incremental performance metrics for thresholds and daily summaries.
+
+Win rate, average confidence and average ATR over the last `window` closed
+trades are kept as running sums, alongside per-day trade/win/PnL totals. Every
+close updates them in O(1) and writes a compact JSON snapshot, so other
+processes and restarts read warm values instead of scanning history. Each close
+is a read-modify-write of the snapshot under a file lock, so processes closing
+trades concurrently do not overwrite each other. Without a snapshot the
+aggregator is rebuilt once from the trade store. Days use local time, like the
+trade store's `closed_at`.
+"""
+
+import json
+import os
+import threading
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process lock applies
+    fcntl = None
+
+METRICS_FILE = os.getenv("ROLLING_METRICS_FILE", "rolling_metrics.json")
+METRICS_WINDOW = int(os.getenv("ROLLING_METRICS_WINDOW", "5"))
+DAYS_KEPT = 30
+
+
+@contextmanager
+def file_lock(path):
+    """Exclusive lock on `<path>.lock`, held across processes."""
+    if fcntl is None:
+        yield
+        return
+    with open(f"{path}.lock", "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class RollingMetrics:
+    def __init__(self, window=METRICS_WINDOW, path=METRICS_FILE):
+        self.window = window
+        self.path = path
+        self.lock = threading.Lock()
+        self.trades = deque()
+        self.wins = 0
+        self.conf_sum = 0.0
+        self.conf_count = 0
+        self.atr_sum = 0.0
+        self.atr_count = 0
+        self.days = {}
+        self.loaded_mtime = None
+
+    # === Updates ===
+
+    def _push(self, win, confidence, atr):
+        self.trades.append((win, confidence, atr))
+        self.wins += win
+        if confidence is not None:
+            self.conf_sum += confidence
+            self.conf_count += 1
+        if atr is not None:
+            self.atr_sum += atr
+            self.atr_count += 1
+
+        if len(self.trades) > self.window:
+            old_win, old_conf, old_atr = self.trades.popleft()
+            self.wins -= old_win
+            if old_conf is not None:
+                self.conf_sum -= old_conf
+                self.conf_count -= 1
+            if old_atr is not None:
+                self.atr_sum -= old_atr
+                self.atr_count -= 1
+
+    def _add_day(self, date, win, pnl):
+        day = self.days.setdefault(date, {"trades": 0, "wins": 0, "pnl": 0.0})
+        day["trades"] += 1
+        day["wins"] += win
+        day["pnl"] += pnl
+        if len(self.days) > DAYS_KEPT:
+            del self.days[min(self.days)]
+
+    def record_close(self, pnl, confidence=None, atr=None, date=None, persist=True):
+        pnl = float(pnl or 0)
+        win = 1 if pnl > 0 else 0
+        date = date or datetime.now().strftime("%Y-%m-%d")
+        if not persist:
+            with self.lock:
+                self._push(win, confidence, atr)
+                self._add_day(date, win, pnl)
+            return
+        with file_lock(self.path), self.lock:
+            # Start from the latest snapshot so closes from other processes are kept.
+            if os.path.exists(self.path):
+                self._apply(*self._read())
+            self._push(win, confidence, atr)
+            self._add_day(date, win, pnl)
+            self.save()
+
+    # === Reads (O(1)) ===
+
+    def metrics(self):
+        """(win_rate, avg_confidence, avg_atr) over the window; None when no trades are known."""
+        self.reload_if_changed()
+        with self.lock:
+            n = len(self.trades)
+            if not n:
+                return None
+            win_rate = self.wins / n * 100
+            avg_conf = self.conf_sum / self.conf_count if self.conf_count else None
+            avg_atr = self.atr_sum / self.atr_count if self.atr_count else None
+            return win_rate, avg_conf, avg_atr
+
+    def day_summary(self, date):
+        """(total, wins, avg_pnl) for `date`, or None if nothing closed that day."""
+        return self.range_summary(date, date)
+
+    def range_summary(self, start, end):
+        """(total, wins, avg_pnl) over the days `start`..`end` (inclusive), or None if nothing closed."""
+        self.reload_if_changed()
+        with self.lock:
+            days = [day for date, day in self.days.items() if start <= date <= end]
+        total = sum(day["trades"] for day in days)
+        if not total:
+            return None
+        return total, sum(day["wins"] for day in days), sum(day["pnl"] for day in days) / total
+
+    # === Snapshot ===
+
+    def save(self):
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"window": self.window, "trades": list(self.trades), "days": self.days}, f)
+        os.replace(tmp, self.path)
+        self.loaded_mtime = os.path.getmtime(self.path)
+
+    def _read(self):
+        with open(self.path, "r") as f:
+            snapshot = json.load(f)
+        return snapshot, os.path.getmtime(self.path)
+
+    def _apply(self, snapshot, mtime):
+        self._reset()
+        for win, confidence, atr in snapshot.get("trades", [])[-self.window:]:
+            self._push(win, confidence, atr)
+        self.days = snapshot.get("days", {})
+        self.loaded_mtime = mtime
+
+    def load(self):
+        snapshot, mtime = self._read()
+        with self.lock:
+            self._apply(snapshot, mtime)
+
+    def reload_if_changed(self):
+        """Pick up a snapshot written by another process (one `stat` call)."""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime != self.loaded_mtime:
+            try:
+                self.load()
+            except (OSError, ValueError):
+                pass
+
+    def _reset(self):
+        self.trades.clear()
+        self.wins = 0
+        self.conf_sum = self.atr_sum = 0.0
+        self.conf_count = self.atr_count = 0
+        self.days = {}
+
+    def rebuild(self, store):
+        """Cold start: replay recent closed trades from the trade store once."""
+        with file_lock(self.path):
+            with self.lock:
+                self._reset()
+            for row in store.closed_trades(days=DAYS_KEPT, min_trades=self.window):
+                self.record_close(row["pnl"], row["confidence"], row["atr"], row["date"], persist=False)
+            with self.lock:
+                self.save()
+
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+
+def get_rolling_metrics():
+    global _metrics
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                metrics = RollingMetrics()
+                if os.path.exists(metrics.path):
+                    metrics.load()
+                else:
+                    from trade_store import get_store
+
+                    metrics.rebuild(get_store())
+                _metrics = metrics
+    return _metrics
@@ -0,0 +1,277 @@
+"""Concurrent multi-symbol scanner.
+
+Runs the indicator and rule-based decision pipeline over a whole watchlist and
+ranks candidates by confidence before anything expensive (LLM, chains, orders)
+happens. Each symbol keeps its own `IndicatorEngine`:
+
+```
+warm-up   - 1-minute timesales per symbol, fetched on a bounded thread pool
+per scan  - one batched quote call per QUOTE_BATCH symbols; each snapshot is
+            folded into the engine as a 1-minute bar (open = previous last)
+finalists - fresh timesales for the top candidates only, for the LLM prompt
+```
+
+A scan therefore costs a handful of requests no matter how long the watchlist
+is, which keeps hundreds of symbols inside one bar and the Tradier limits.
+"""
+
+import argparse
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+from confidence_engine import rule_based_decision
+from indicator_engine import MARKET_TZ, IndicatorEngine
+from tradier_client import get_client
+
+DEFAULT_WATCHLIST = (
+    "SPY,QQQ,IWM,DIA,XLF,XLE,XLK,XLV,XLI,XLY,XLP,XLU,XLB,XLC,XLRE,SMH,XBI,KRE,"
+    "GDX,SLV,GLD,TLT,HYG,LQD,EEM,EFA,FXI,ARKK,USO,UNG,TQQQ,SQQQ,SOXL,SOXS"
+)
+WATCHLIST = [s.strip().upper() for s in os.getenv("SCANNER_WATCHLIST", DEFAULT_WATCHLIST).split(",") if s.strip()]
+SCANNER_WORKERS = int(os.getenv("SCANNER_WORKERS", "8"))
+SCANNER_MIN_CONFIDENCE = int(os.getenv("SCANNER_MIN_CONFIDENCE", "60"))
+QUOTE_BATCH = 100
+WARMUP_MINUTES = 60
+CANDLE_HISTORY = 30
+
+
+class SymbolState:
+    """Per-symbol indicator engine plus the last quote snapshot folded into it."""
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+        self.engine = IndicatorEngine(symbol)
+        self.last_bar = None
+        self.last_price = None
+        self.last_volume = None
+        self.candles = []
+
+    def add_bar(self, o, h, l, c, v, ts):
+        self.engine.update(o, h, l, c, v, ts)
+        self.last_bar = ts
+        self.last_price = c
+        self.candles.append((ts, o, h, l, c, v))
+        del self.candles[:-CANDLE_HISTORY]
+
+    def add_quote(self, quote, ts):
+        """Fold a quote snapshot in as one bar; volume is the change in day volume."""
+        last = float(quote.get("last") or 0)
+        if not last:
+            return False
+        volume = float(quote.get("volume") or 0)
+        bar_volume = max(volume - self.last_volume, 0.0) if self.last_volume is not None else 0.0
+        self.last_volume = volume
+        if self.last_bar is not None and ts <= self.last_bar:
+            self.last_price = last
+            return False
+
+        open_ = self.last_price or last
+        self.add_bar(open_, max(open_, last), min(open_, last), last, bar_volume, ts)
+        return True
+
+    def dataframe(self):
+        """Recent bars in the yfinance layout `gpt_trade_decision` expects."""
+        df = pd.DataFrame([c[1:] for c in self.candles], columns=["Open", "High", "Low", "Close", "Volume"],
+                          index=[c[0].astimezone(MARKET_TZ) for c in self.candles])
+        return df
+
+
+def _minute(now=None):
+    now = now or datetime.now(timezone.utc)
+    return now.replace(second=0, microsecond=0)
+
+
+def parse_bar(bar):
+    """Tradier timesales row -> (open, high, low, close, volume, utc datetime)."""
+    ts = bar.get("timestamp")
+    if ts is not None:
+        ts = datetime.fromtimestamp(int(ts), tz=timezone.utc)
+    else:
+        ts = datetime.fromisoformat(bar["time"]).replace(tzinfo=MARKET_TZ).astimezone(timezone.utc)
+    return (
+        float(bar.get("open") or bar.get("price")),
+        float(bar.get("high") or bar.get("price")),
+        float(bar.get("low") or bar.get("price")),
+        float(bar.get("close") or bar.get("price")),
+        float(bar.get("volume") or 0),
+        ts,
+    )
+
+
+class Scanner:
+    def __init__(self, symbols=None, client=None, workers=SCANNER_WORKERS, min_confidence=SCANNER_MIN_CONFIDENCE):
+        self.symbols = [s.upper() for s in (symbols or WATCHLIST)]
+        self.client = client or get_client()
+        self.min_confidence = min_confidence
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scanner")
+        self.states = {s: SymbolState(s) for s in self.symbols}
+        self.lock = threading.Lock()
+        self.warmed = False
+
+    # === Data ===
+
+    def fetch_bars(self, symbol, minutes=WARMUP_MINUTES):
+        """Completed 1-minute bars for `symbol` over the last `minutes`."""
+        end = datetime.now(MARKET_TZ)
+        start = end - timedelta(minutes=minutes)
+        bars = self.client.get_timesales(
+            symbol,
+            start=start.strftime("%Y-%m-%d %H:%M"),
+            end=end.strftime("%Y-%m-%d %H:%M"),
+        )
+        current = _minute()
+        return [b for b in map(parse_bar, bars) if b[5] < current]
+
+    def _warm_symbol(self, symbol, minutes):
+        state = self.states[symbol]
+        try:
+            bars = self.fetch_bars(symbol, minutes)
+        except Exception as e:
+            print(f"⚠️ Warm-up failed for {symbol}: {e}")
+            return 0
+        added = 0
+        for bar in bars:
+            if state.last_bar is None or bar[5] > state.last_bar:
+                state.add_bar(*bar)
+                added += 1
+        return added
+
+    def warm(self, minutes=WARMUP_MINUTES):
+        """Seed every engine from timesales on the bounded worker pool."""
+        start = time.perf_counter()
+        counts = list(self.pool.map(lambda s: self._warm_symbol(s, minutes), self.symbols))
+        self.warmed = True
+        print(f"🔥 Warmed {sum(1 for c in counts if c)}/{len(self.symbols)} symbols "
+              f"in {time.perf_counter() - start:.1f}s")
+
+    def quotes(self):
+        """Latest quotes for the whole watchlist, one request per QUOTE_BATCH symbols."""
+        batches = [self.symbols[i:i + QUOTE_BATCH] for i in range(0, len(self.symbols), QUOTE_BATCH)]
+        quotes = {}
+        for result in self.pool.map(self._quote_batch, batches):
+            for quote in result:
+                quotes[quote.get("symbol")] = quote
+        return quotes
+
+    def _quote_batch(self, symbols):
+        try:
+            return self.client.get_quotes(symbols)
+        except Exception as e:
+            print(f"⚠️ Quote batch failed ({len(symbols)} symbols): {e}")
+            return []
+
+    # === Scan ===
+
+    def scan(self, top=None):
+        """
+        Update every symbol from one quote snapshot and return ranked candidates.
+
+        Each candidate is `{symbol, action, confidence, reason, price, indicators}`,
+        highest confidence first; symbols that skip or score below
+        `min_confidence` are dropped.
+        """
+        if not self.warmed:
+            self.warm()
+
+        now = _minute()
+        quotes = self.quotes()
+        candidates = []
+        with self.lock:
+            for symbol, state in self.states.items():
+                quote = quotes.get(symbol)
+                if quote is not None:
+                    state.add_quote(quote, now)
+                if state.engine.bars < 2 or state.last_price is None:
+                    continue
+
+                indicators = state.engine.indicators()
+                indicators["price"] = state.last_price
+                decision = rule_based_decision(indicators)
+                if decision["action"] == "skip" or decision["confidence"] < self.min_confidence:
+                    continue
+                candidates.append({
+                    "symbol": symbol,
+                    "action": decision["action"],
+                    "confidence": decision["confidence"],
+                    "reason": decision["reason"],
+                    "price": state.last_price,
+                    "atr": state.engine.atr.value,
+                    "indicators": indicators,
+                })
+
+        candidates.sort(key=lambda c: c["confidence"], reverse=True)
+        return candidates[:top] if top else candidates
+
+    def candles(self, symbol, minutes=CANDLE_HISTORY):
+        """Exact recent bars for a finalist (timesales), falling back to scanner bars."""
+        try:
+            bars = self.fetch_bars(symbol, minutes)
+        except Exception as e:
+            print(f"⚠️ Timesales failed for {symbol}: {e}")
+            bars = []
+        if not bars:
+            return self.states[symbol].dataframe()
+        return pd.DataFrame([b[:5] for b in bars], columns=["Open", "High", "Low", "Close", "Volume"],
+                            index=[b[5].astimezone(MARKET_TZ) for b in bars])
+
+    def close(self):
+        self.pool.shutdown(wait=False)
+
+
+def review_candidates(scanner, candidates, llm_top=3):
+    """Send only the best-ranked candidates to the LLM, in rank order."""
+    from bot import gpt_trade_decision
+
+    reviewed = []
+    for candidate in candidates[:llm_top]:
+        df = scanner.candles(candidate["symbol"])
+        result = gpt_trade_decision(df, symbol=candidate["symbol"])
+        reviewed.append({**candidate, "gpt": result})
+    return reviewed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank a watchlist by rule-based confidence.")
+    parser.add_argument("--symbols", help="Comma-separated watchlist (default: SCANNER_WATCHLIST)")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--llm-top", type=int, default=0, help="Ask the LLM about the best N candidates")
+    parser.add_argument("--trade", action="store_true", help="Place an order for the best LLM-confirmed candidate")
+    parser.add_argument("--loop", action="store_true", help="Rescan at the start of every minute")
+    args = parser.parse_args()
+
+    symbols = args.symbols.split(",") if args.symbols else None
+    scanner = Scanner(symbols)
+    print(f"🔭 Scanning {len(scanner.symbols)} symbols with {SCANNER_WORKERS} workers")
+
+    while True:
+        start = time.perf_counter()
+        candidates = scanner.scan(top=args.top)
+        print(f"📋 {len(candidates)} candidates in {time.perf_counter() - start:.2f}s")
+        for c in candidates:
+            print(f"  {c['symbol']:<6} {c['action'].upper():<4} {c['confidence']:>3}% @ {c['price']:.2f} | {c['reason']}")
+
+        if args.llm_top and candidates:
+            for c in review_candidates(scanner, candidates, args.llm_top):
+                gpt = c["gpt"]
+                print(f"🧠 {c['symbol']}: {gpt['decision']} {gpt['confidence']}% ({gpt['strike_type']})")
+                if args.trade and gpt["decision"] == c["action"].upper() and gpt["confidence"] >= scanner.min_confidence:
+                    from bot import place_option_trade
+
+                    trade = place_option_trade(gpt["decision"], gpt["strike_type"], symbol=c["symbol"])
+                    print(f"📤 {c['symbol']} order: {trade.get('status')} {trade.get('symbol', trade.get('error', ''))}")
+                    args.trade = False
+
+        if not args.loop:
+            break
+        time.sleep(60 - time.time() % 60)
+
+    scanner.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""Long-running, bar-aligned scheduler for the decision pipeline.
+
+Replaces the one-shot cron runs: the process starts once, warms the Tradier
+client, caches, trade store and Sheets auth, then fires the pipeline a few
+seconds after every 1-minute bar close during market hours. Bars live in the
+local `bar_store` and only the newest minutes are fetched each cycle. A cycle that would
+overlap a still-running one is skipped, and a cycle whose data arrives after
+the latency budget is dropped as stale. Latency is logged from the bar close.
+
+    python scheduler_daemon.py --pipeline bot
+    python monolith.py daemon
+"""
+
+import argparse
+import importlib
+import os
+import threading
+import time
+from datetime import datetime, time as dtime
+
+import schedule
+
+from bar_store import get_bar_store
+from indicator_engine import MARKET_TZ
+from tracing import observe, span
+from tradier_client import get_client
+
+MARKET_OPEN = dtime(9, 30)
+MARKET_CLOSE = dtime(16, 0)
+EOD_SUMMARY_TIME = dtime(16, 5)
+# Seconds after the bar close to fire, so the closed bar is available upstream.
+BAR_OFFSET = int(os.getenv("DAEMON_BAR_OFFSET", "2"))
+CYCLE_BUDGET = float(os.getenv("DAEMON_CYCLE_BUDGET", "20"))
+MAX_DAILY_TRADES = int(os.getenv("DAEMON_MAX_DAILY_TRADES", "1"))
+WARM_MODULES = ("bot", "gpt_decider", "monolith", "alerts")
+
+
+def is_market_open(now=None):
+    now = now or datetime.now(MARKET_TZ)
+    return now.weekday() < 5 and MARKET_OPEN <= now.time() < MARKET_CLOSE
+
+
+def last_bar_close(now=None):
+    now = now or datetime.now(MARKET_TZ)
+    return now.replace(second=0, microsecond=0)
+
+
+class BarFeed:
+    """Today's completed 1-minute bars for one symbol, extended incrementally through the bar store."""
+
+    def __init__(self, symbol="SPY", store=None):
+        self.symbol = symbol
+        self.store = store or get_bar_store()
+
+    def update(self, now=None):
+        return self.store.frame(self.symbol, now=now or datetime.now(MARKET_TZ))
+
+
+def bot_pipeline(df):
+    from bot import run_bot
+
+    return run_bot(df)
+
+
+def monolith_pipeline(df):
+    from monolith import run
+
+    return run(df, summary=False)
+
+
+PIPELINES = {"bot": bot_pipeline, "monolith": monolith_pipeline}
+
+
+def is_trade(result):
+    """
+    A placed order (bot), or a call/put decision that clears the confidence
+    threshold (monolith), counts toward the daily cap.
+    """
+    if not isinstance(result, dict):
+        return False
+    if "status" in result:
+        return result["status"] == "success"
+    if str(result.get("action", "")).lower() not in ("call", "put"):
+        return False
+    from dynamic_threshold import determine_threshold
+
+    threshold, _ = determine_threshold()
+    return float(result.get("confidence") or 0) >= threshold
+
+
+class Daemon:
+    def __init__(self, pipeline=bot_pipeline, symbol="SPY", budget=CYCLE_BUDGET, offset=BAR_OFFSET,
+                 max_daily_trades=MAX_DAILY_TRADES):
+        self.pipeline = pipeline
+        self.feed = BarFeed(symbol)
+        self.budget = budget
+        self.offset = offset
+        self.max_daily_trades = max_daily_trades
+        self.lock = threading.Lock()
+        self.scheduler = schedule.Scheduler()
+        self.trade_date = None
+        self.trades_today = 0
+        self.summary_date = None
+        self.skipped = 0
+
+    def warm(self):
+        """Pay the import, auth and connection costs once, before the first bar."""
+        start = time.perf_counter()
+        for name, warm in (
+            ("pipeline", lambda: [importlib.import_module(m) for m in WARM_MODULES]),
+            ("tradier", lambda: get_client().get_quotes(self.feed.symbol)),
+            ("llm cache", lambda: importlib.import_module("llm_cache").get_llm_cache()),
+            # Seeding empty tables from Sheets happens here, not on the first decision.
+            ("trade store seed", lambda: importlib.import_module("trade_store").seed()),
+            ("trade store", lambda: importlib.import_module("trade_store").get_store()),
+            ("sheets", lambda: importlib.import_module("logger").get_sheet()),
+        ):
+            try:
+                warm()
+            except Exception as e:
+                print(f"⚠️ Warm-up of {name} failed: {e}")
+        if is_market_open():
+            try:
+                self.feed.update()
+            except Exception as e:
+                print(f"⚠️ Bar backfill failed: {e}")
+        print(f"🔥 Daemon warm in {time.perf_counter() - start:.2f}s")
+
+    # === Cycles ===
+
+    def trigger(self):
+        """Scheduler job: start a cycle unless the previous one is still running."""
+        if not is_market_open():
+            return
+        if not self.lock.acquire(blocking=False):
+            self.skipped += 1
+            print(f"⏭️ Previous cycle still running, skipping bar ({self.skipped} skipped)")
+            observe("daemon.skipped_cycle", 0.0, error=True)
+            return
+        threading.Thread(target=self._cycle, name="daemon-cycle", daemon=True).start()
+
+    def _cycle(self):
+        try:
+            self.cycle()
+        except Exception as e:
+            print(f"❌ Cycle failed: {e}")
+        finally:
+            self.lock.release()
+
+    def cycle(self, now=None):
+        now = now or datetime.now(MARKET_TZ)
+        bar_close = last_bar_close(now)
+        if self.trade_date != bar_close.date():
+            self.trade_date, self.trades_today = bar_close.date(), 0
+        if self.trades_today >= self.max_daily_trades:
+            return None
+
+        with span("daemon.bar_fetch"):
+            df = self.feed.update(now)
+        data_latency = (datetime.now(MARKET_TZ) - bar_close).total_seconds()
+        if df.empty:
+            print("❌ No bars yet this session.")
+            return None
+        if data_latency > self.budget:
+            print(f"⏱️ Bar data took {data_latency:.1f}s (budget {self.budget:.0f}s), dropping stale cycle")
+            return None
+
+        result = self.pipeline(df)
+        latency = (datetime.now(MARKET_TZ) - bar_close).total_seconds()
+        observe("daemon.bar_to_decision", latency)
+        flag = "⚠️" if latency > self.budget else "⏱️"
+        print(f"{flag} {bar_close:%H:%M} bar -> decision in {latency:.2f}s (data {data_latency:.2f}s)")
+
+        if is_trade(result):
+            self.trades_today += 1
+        return result
+
+    def end_of_day(self):
+        now = datetime.now(MARKET_TZ)
+        if now.weekday() >= 5 or now.time() < EOD_SUMMARY_TIME or self.summary_date == now.date():
+            return
+        self.summary_date = now.date()
+        print("📤 Sending EOD summary...")
+        try:
+            from alerts import send_daily_summary
+
+            send_daily_summary()
+        except Exception as e:
+            print(f"❌ Error sending summary: {e}")
+
+    # === Loop ===
+
+    def run(self):
+        self.warm()
+        self.scheduler.every().minute.at(f":{self.offset:02d}").do(self.trigger)
+        self.scheduler.every(5).minutes.do(self.end_of_day)
+        print(f"🕰️ Daemon running; cycles fire {self.offset}s after each bar close during market hours")
+        while True:
+            self.scheduler.run_pending()
+            idle = self.scheduler.idle_seconds
+            time.sleep(min(max(idle or 1, 0.05), 1))
+
+
+def main(pipeline=None):
+    parser = argparse.ArgumentParser(description="Run the decision pipeline at every 1-minute bar close.")
+    parser.add_argument("--pipeline", choices=sorted(PIPELINES), default="bot")
+    parser.add_argument("--symbol", default="SPY")
+    parser.add_argument("--budget", type=float, default=CYCLE_BUDGET)
+    args, _ = parser.parse_known_args()
+
+    Daemon(pipeline or PIPELINES[args.pipeline], symbol=args.symbol, budget=args.budget).run()
+
+
+if __name__ == "__main__":
+    main()
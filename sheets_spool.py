@@ -0,0 +1,227 @@
+"""Write-behind Google Sheets logger with a local durable spool.
+
+Rows are appended to a local JSONL spool (fsync'd) and the caller returns
+immediately. A background thread flushes pending rows per worksheet with one
+`append_rows` call and one `batch_format` call for the rows it just wrote, then
+advances a persisted byte offset. Rows survive crashes and are retried on the
+next flush or the next run.
+"""
+
+import atexit
+import json
+import os
+import re
+import threading
+
+from tracing import api_call
+
+SPOOL_FILE = os.getenv("SHEETS_SPOOL", "sheets_spool.jsonl")
+FLUSH_INTERVAL = float(os.getenv("SHEETS_FLUSH_INTERVAL", "2.0"))
+BATCH_SIZE = 500
+EXIT_FLUSH_TIMEOUT = 10.0
+
+WIN_COLOR = {"red": 0.8, "green": 1, "blue": 0.8}
+LOSS_COLOR = {"red": 1, "green": 0.8, "blue": 0.8}
+
+
+def _column_letter(n):
+    letters = ""
+    while n:
+        n, rem = divmod(n - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def result_formats(start_row, rows, result_index):
+    """`batch_format` entries coloring win/loss rows, for rows written from `start_row`."""
+    formats = []
+    for offset, row in enumerate(rows):
+        if result_index is None or result_index >= len(row):
+            continue
+        result = str(row[result_index]).lower()
+        if "win" in result:
+            color = WIN_COLOR
+        elif "loss" in result:
+            color = LOSS_COLOR
+        else:
+            continue
+        r = start_row + offset
+        formats.append({
+            "range": f"A{r}:{_column_letter(len(row))}{r}",
+            "format": {"backgroundColor": color},
+        })
+    return formats
+
+
+def _start_row(response):
+    """Parse the first written row out of an append response's `updatedRange`."""
+    updated = (response or {}).get("updates", {}).get("updatedRange", "")
+    match = re.search(r"![A-Z]+(\d+)", updated)
+    return int(match.group(1)) if match else None
+
+
+class SheetsSpool:
+    def __init__(self, path=SPOOL_FILE, interval=FLUSH_INTERVAL, sheet_factory=None):
+        self.path = path
+        self.offset_path = f"{path}.offset"
+        self.interval = interval
+        self.sheet_factory = sheet_factory
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.thread = None
+        self.sheet = None
+        self.worksheets = {}
+
+    # === Producer side ===
+
+    def enqueue(self, tab, row, headers=None, result_column=None):
+        """Durably spool one row for `tab`. Never touches the network."""
+        record = {"tab": tab, "row": row, "headers": headers, "result_column": result_column}
+        line = (json.dumps(record, default=str) + "\n").encode("utf-8")
+        with self.lock:
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        self._ensure_thread()
+        self.wakeup.set()
+
+    # === Flusher ===
+
+    def _ensure_thread(self):
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._run, name="sheets-spool", daemon=True)
+            self.thread.start()
+
+    def _run(self):
+        while True:
+            self.wakeup.wait(self.interval)
+            self.wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠️ Sheets flush failed, will retry: {e}")
+
+    def _read_offset(self):
+        try:
+            with open(self.offset_path, "r") as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def _write_offset(self, offset):
+        tmp = f"{self.offset_path}.tmp"
+        with open(tmp, "w") as f:
+            f.write(str(offset))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.offset_path)
+
+    def _pending(self, offset):
+        """Complete spooled records after `offset` as `(record, end_offset)` pairs."""
+        records = []
+        end = offset
+        if not os.path.exists(self.path):
+            return records
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n") or len(records) >= BATCH_SIZE:
+                    break
+                end += len(line)
+                try:
+                    records.append((json.loads(line), end))
+                except ValueError:
+                    continue
+        return records
+
+    def _worksheet(self, tab, headers):
+        if self.sheet is None:
+            if self.sheet_factory is None:
+                from logger import get_sheet
+
+                self.sheet_factory = get_sheet
+            self.sheet = self.sheet_factory()
+
+        ws = self.worksheets.get(tab)
+        if ws is None:
+            try:
+                ws = self.sheet.worksheet(tab)
+            except Exception:
+                ws = self.sheet.add_worksheet(title=tab, rows="1000", cols="20")
+            if headers:
+                end = _column_letter(len(headers))
+                if ws.row_values(1) != headers:
+                    ws.update(f"A1:{end}1", [headers])
+            self.worksheets[tab] = ws
+        return ws
+
+    def flush(self):
+        """Push every complete spooled row to Sheets. Returns the number of rows written."""
+        with self.flush_lock:
+            written = 0
+            while True:
+                offset = self._read_offset()
+                records = self._pending(offset)
+                if not records:
+                    self._compact(offset)
+                    return written
+
+                # Contiguous runs per tab keep spool order, and the offset advances after each
+                # run so a failure never re-sends rows that already reached Sheets.
+                runs = []
+                for record, end in records:
+                    if runs and runs[-1][0] == record["tab"]:
+                        runs[-1][1].append(record)
+                        runs[-1][2] = end
+                    else:
+                        runs.append([record["tab"], [record], end])
+
+                for tab, tab_records, end in runs:
+                    ws = self._worksheet(tab, tab_records[0].get("headers"))
+                    rows = [r["row"] for r in tab_records]
+                    with api_call("sheets", "append_rows"):
+                        response = ws.append_rows(rows, value_input_option="USER_ENTERED")
+                    self._write_offset(end)
+                    written += len(rows)
+
+                    start = _start_row(response)
+                    formats = result_formats(start, rows, tab_records[0].get("result_column")) if start else []
+                    if formats:
+                        try:
+                            with api_call("sheets", "batch_format"):
+                                ws.batch_format(formats)
+                        except Exception as e:
+                            print(f"⚠️ Formatting failed: {e}")
+
+    def _compact(self, offset):
+        """Truncate the spool once everything in it has been flushed."""
+        with self.lock:
+            try:
+                if offset and os.path.getsize(self.path) == offset:
+                    open(self.path, "wb").close()
+                    self._write_offset(0)
+            except OSError:
+                pass
+
+    def drain(self, timeout=EXIT_FLUSH_TIMEOUT):
+        """Best-effort flush on shutdown so one-shot runs still deliver their rows."""
+        if not os.path.exists(self.path) or os.path.getsize(self.path) <= self._read_offset():
+            return
+        worker = threading.Thread(target=self.flush, daemon=True)
+        worker.start()
+        worker.join(timeout)
+
+
+_spool = None
+
+
+def get_spool():
+    global _spool
+    if _spool is None:
+        _spool = SheetsSpool()
+        atexit.register(_spool.drain)
+    return _spool
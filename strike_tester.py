@@ -1,13 +1,7 @@
 import datetime
-import requests
-from config import TRADIER_TOKEN
-from math import floor, ceil
-
-TRADIER_BASE_URL = "https://sandbox.tradier.com/v1"
-HEADERS = {
-    "Authorization": f"Bearer {TRADIER_TOKEN}",
-    "Accept": "application/json"
-}
+import config  # noqa: F401 - fails fast when credentials are missing
+from tradier_client import get_client
+from strike_validator import get_strike_validator, occ_symbol
 
 def get_next_friday():
     today = datetime.date.today()
@@ -17,40 +11,24 @@ def get_next_friday():
     return (today + datetime.timedelta(days=days_ahead)).strftime("%Y-%m-%d")
 
 def validate_option_symbol(symbol):
-    url = f"{TRADIER_BASE_URL}/markets/options/lookup"
-    params = {"symbol": symbol}
-    response = requests.get(url, headers=HEADERS, params=params)
-    if response.status_code != 200:
-        return False
-    try:
-        data = response.json()
-        return "options" in data and len(data["options"]) > 0
-    except:
-        return False
+    return get_strike_validator().is_valid(symbol)
 
 def build_option_symbol(direction, strike, expiry):
-    strike_formatted = f"{int(strike * 1000):08d}"
-    right = "C" if direction == "call" else "P"
-    return f"SPY{expiry.replace('-', '')}{right}{strike_formatted}"
+    return occ_symbol("SPY", direction, strike, expiry)
 
 def test_strikes():
     expiry = get_next_friday()
     print(f"📅 Testing strikes for expiration: {expiry}")
     
-    try:
-        # Get live SPY price from sandbox (or just hardcode for now)
-        spy_price = 545  # You can manually set or pull from sandbox
-    except:
-        spy_price = 545
+    spy_price = get_client().get_last_price("SPY")
+    print(f"💵 SPY last: {spy_price:.2f}")
 
-    min_strike = floor(spy_price) - 15
-    max_strike = ceil(spy_price) + 15
+    # One chain request validates the whole ladder, every $5 from -15 to +15.
+    ladder = get_strike_validator().ladder("SPY", expiry, price=spy_price, width=15, step=5)
 
     for direction in ["call", "put"]:
         print(f"\n🔍 Testing {direction.upper()}S:")
-        for strike in range(min_strike, max_strike + 1, 5):  # Every $5 increment
-            symbol = build_option_symbol(direction, strike, expiry)
-            valid = validate_option_symbol(symbol)
+        for strike, symbol, valid in ladder[direction]:
             if valid:
                 print(f"✅ VALID: {symbol}")
             else:
@@ -0,0 +1,162 @@
+"""Per-day cache of listed option symbols for pre-trade validation.
+
+One `/markets/options/chains` call lists every contract of an expiration, so a
+whole strike ladder is validated with a single request and the resulting set of
+OCC symbols is reused for the rest of the New York trading day. Checking a
+symbol before an order is then a set lookup. If a chain cannot be fetched, the
+underlying's full symbol list from `/markets/options/lookup` is used instead.
+"""
+
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from math import ceil, floor
+
+from indicator_engine import MARKET_TZ
+from tradier_client import get_client
+
+OCC_RE = re.compile(r"^([A-Z.]{1,6})(\d{6})([CP])(\d{8})$")
+
+
+def occ_symbol(underlying, direction, strike, expiration):
+    """OCC option symbol, e.g. SPY241018C00545000 (expiration as YYYY-MM-DD or a date)."""
+    if isinstance(expiration, str):
+        expiration = date.fromisoformat(expiration)
+    right = "C" if direction.lower() == "call" else "P"
+    return f"{underlying.upper()}{expiration:%y%m%d}{right}{int(round(strike * 1000)):08d}"
+
+
+def parse_occ(symbol):
+    """(underlying, YYYY-MM-DD expiration, "call"/"put", strike) or None if not an OCC symbol."""
+    match = OCC_RE.match(symbol or "")
+    if not match:
+        return None
+    underlying, yymmdd, right, strike = match.groups()
+    expiration = datetime.strptime(yymmdd, "%y%m%d").date().isoformat()
+    return underlying, expiration, "call" if right == "C" else "put", int(strike) / 1000
+
+
+def trading_day():
+    return datetime.now(MARKET_TZ).date()
+
+
+class StrikeValidator:
+    def __init__(self, client=None, max_workers=4):
+        self.client = client
+        self.max_workers = max_workers
+        self.day = None
+        self.symbols = {}
+        self.lookups = {}
+        self.lock = threading.Lock()
+        self.key_locks = {}
+
+    def _client(self):
+        return self.client or get_client()
+
+    def _roll_day(self):
+        today = trading_day()
+        if today != self.day:
+            self.day = today
+            self.symbols.clear()
+            self.lookups.clear()
+
+    def _key_lock(self, key):
+        with self.lock:
+            return self.key_locks.setdefault(key, threading.Lock())
+
+    # === Listed symbols ===
+
+    def listed(self, underlying, expiration):
+        """Frozen set of listed OCC symbols for one expiration, fetched once per trading day."""
+        key = (underlying.upper(), expiration)
+        with self.lock:
+            self._roll_day()
+            cached = self.symbols.get(key)
+        if cached is not None:
+            return cached
+
+        # One fetch per key even when many threads validate at once.
+        with self._key_lock(key):
+            with self.lock:
+                cached = self.symbols.get(key)
+            if cached is not None:
+                return cached
+            options = self._client().get_chain(key[0], expiration)
+            listed = frozenset(o["symbol"] for o in options if o.get("symbol"))
+            with self.lock:
+                self.symbols[key] = listed
+            return listed
+
+    def _lookup(self, underlying):
+        """Fallback: every listed symbol for `underlying` from the lookup endpoint (cached per day)."""
+        with self.lock:
+            self._roll_day()
+            cached = self.lookups.get(underlying)
+        if cached is not None:
+            return cached
+        data = self._client().get_json("/markets/options/lookup", {"underlying": underlying})
+        groups = data.get("symbols") or []
+        if isinstance(groups, dict):
+            groups = [groups]
+        listed = frozenset(s for group in groups for s in (group.get("options") or []))
+        with self.lock:
+            self.lookups[underlying] = listed
+        return listed
+
+    def prefetch(self, underlying, expirations):
+        """Load several expirations concurrently (e.g. at startup)."""
+        expirations = list(expirations)
+        if not expirations:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(expirations))) as pool:
+            futures = {exp: pool.submit(self.listed, underlying, exp) for exp in expirations}
+        return {exp: f.result() for exp, f in futures.items() if f.exception() is None}
+
+    # === Validation ===
+
+    def is_valid(self, symbol):
+        """True if `symbol` is a listed contract today; a set lookup once its expiration is loaded."""
+        parsed = parse_occ(symbol)
+        if parsed is None:
+            return False
+        underlying, expiration = parsed[0], parsed[1]
+        try:
+            return symbol in self.listed(underlying, expiration)
+        except Exception as e:
+            print(f"⚠️ Chain fetch failed for {underlying} {expiration}, using lookup: {e}")
+        try:
+            return symbol in self._lookup(underlying)
+        except Exception as e:
+            print(f"⚠️ Symbol lookup failed: {e}")
+            return False
+
+    def ladder(self, underlying, expiration, price=None, width=15, step=5):
+        """
+        Validate calls and puts from `price - width` to `price + width` every `step`
+        with a single chain request. Returns `{"call": [(strike, symbol, valid)], "put": [...]}`.
+        """
+        if price is None:
+            price = self._client().get_last_price(underlying)
+        listed = self.listed(underlying, expiration)
+        strikes = range(floor(price) - width, ceil(price) + width + 1, step)
+        return {
+            direction: [
+                (strike, symbol, symbol in listed)
+                for strike in strikes
+                for symbol in [occ_symbol(underlying, direction, strike, expiration)]
+            ]
+            for direction in ("call", "put")
+        }
+
+    def clear(self):
+        with self.lock:
+            self.symbols.clear()
+            self.lookups.clear()
+
+
+_validator = StrikeValidator()
+
+
+def get_strike_validator():
+    return _validator
@@ -0,0 +1,270 @@
+"""Lightweight span tracing and Prometheus-style metrics.
+
+`span("stage")` (or the `@traced("stage")` decorator) records per-stage latency
+histograms and error counts, and `api_call(service, operation)` additionally
+counts external calls by status. Every process keeps its metrics in memory and
+periodically writes them to `TRACING_DIR/<program>.json`. Counts carry over
+between runs of the same program, so one-shot cron runs accumulate. The
+dashboard merges those files into the text exposition served at `/metrics`.
+"""
+
+import atexit
+import functools
+import json
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+TRACING_DIR = os.getenv("TRACING_DIR", ".metrics")
+TRACING_FLUSH_INTERVAL = float(os.getenv("TRACING_FLUSH_INTERVAL", "5"))
+PREFIX = "moneyprinter"
+
+# Upper bounds in seconds; wide enough for both quote calls and LLM round-trips.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def program_name():
+    name = os.path.splitext(os.path.basename(sys.argv[0] or ""))[0].lstrip("-")
+    return name or "python"
+
+
+class Metrics:
+    def __init__(self, directory=TRACING_DIR, name=None):
+        self.directory = directory
+        self.name = name or program_name()
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.errors = {}
+        self.api_calls = {}
+        self.counters = {}
+        self.last_flush = time.monotonic()
+        self.dirty = False
+        self._load()
+
+    @property
+    def path(self):
+        return os.path.join(self.directory, f"{self.name}.json")
+
+    # === Recording ===
+
+    def observe(self, stage, seconds, error=False):
+        with self.lock:
+            hist = self.histograms.get(stage)
+            if hist is None:
+                hist = self.histograms[stage] = {"buckets": [0] * len(BUCKETS), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    hist["buckets"][i] += 1
+                    break
+            hist["sum"] += seconds
+            hist["count"] += 1
+            if error:
+                self.errors[stage] = self.errors.get(stage, 0) + 1
+            self.dirty = True
+        self._maybe_flush()
+
+    def count_api_call(self, service, operation, status):
+        key = f"{service}|{operation}|{status}"
+        with self.lock:
+            self.api_calls[key] = self.api_calls.get(key, 0) + 1
+            self.dirty = True
+
+    def add(self, counter, n=1):
+        with self.lock:
+            self.counters[counter] = self.counters.get(counter, 0) + n
+            self.dirty = True
+
+    # === Persistence ===
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "histograms": json.loads(json.dumps(self.histograms)),
+                "errors": dict(self.errors),
+                "api_calls": dict(self.api_calls),
+                "counters": dict(self.counters),
+            }
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.histograms = {k: v for k, v in data.get("histograms", {}).items() if len(v["buckets"]) == len(BUCKETS)}
+        self.errors = data.get("errors", {})
+        self.api_calls = data.get("api_calls", {})
+        self.counters = data.get("counters", {})
+
+    def flush(self):
+        if not self.dirty:
+            return
+        snapshot = self.snapshot()
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(snapshot, f)
+            os.replace(tmp, self.path)
+            self.dirty = False
+        except OSError as e:
+            print(f"⚠️ Metrics flush failed: {e}")
+        self.last_flush = time.monotonic()
+
+    def _maybe_flush(self):
+        if time.monotonic() - self.last_flush >= TRACING_FLUSH_INTERVAL:
+            self.flush()
+
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics():
+    global _metrics
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                _metrics = Metrics()
+                atexit.register(_metrics.flush)
+    return _metrics
+
+
+# === Instrumentation API ===
+
+@contextmanager
+def span(stage):
+    """Time a block as `stage`; exceptions are counted as errors and re-raised."""
+    start = time.perf_counter()
+    error = False
+    try:
+        yield
+    except BaseException:
+        error = True
+        raise
+    finally:
+        get_metrics().observe(stage, time.perf_counter() - start, error)
+
+
+def traced(stage):
+    """Decorator form of `span`."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class _Call:
+    status = "ok"
+
+
+@contextmanager
+def api_call(service, operation):
+    """
+    Time and count one external call. Set `.status` on the yielded object
+    (e.g. the HTTP status code); an exception records status "error".
+    """
+    call = _Call()
+    start = time.perf_counter()
+    error = False
+    try:
+        yield call
+    except BaseException:
+        error = True
+        if call.status == "ok":
+            call.status = "error"
+        raise
+    finally:
+        metrics = get_metrics()
+        metrics.count_api_call(service, operation, call.status)
+        metrics.observe(f"api.{service}.{operation}", time.perf_counter() - start, error)
+
+
+def count(counter, n=1):
+    """Increment a free-form counter (exported as `<prefix>_<counter>_total`)."""
+    get_metrics().add(counter, n)
+
+
+def observe(stage, seconds, error=False):
+    """Record a latency measured elsewhere (e.g. from a bar close)."""
+    get_metrics().observe(stage, seconds, error)
+
+
+# === Exposition ===
+
+def merged_snapshots(directory=TRACING_DIR):
+    """Sum the snapshot files of every program (flushing this process first)."""
+    if _metrics is not None:
+        _metrics.flush()
+    merged = {"histograms": {}, "errors": {}, "api_calls": {}, "counters": {}}
+    try:
+        names = sorted(n for n in os.listdir(directory) if n.endswith(".json"))
+    except OSError:
+        names = []
+    for name in names:
+        try:
+            with open(os.path.join(directory, name), "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for stage, hist in data.get("histograms", {}).items():
+            if len(hist.get("buckets", [])) != len(BUCKETS):
+                continue
+            target = merged["histograms"].setdefault(stage, {"buckets": [0] * len(BUCKETS), "sum": 0.0, "count": 0})
+            target["buckets"] = [a + b for a, b in zip(target["buckets"], hist["buckets"])]
+            target["sum"] += hist["sum"]
+            target["count"] += hist["count"]
+        for key in ("errors", "api_calls", "counters"):
+            for label, n in data.get(key, {}).items():
+                merged[key][label] = merged[key].get(label, 0) + n
+    return merged
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+def render_prometheus(snapshot=None):
+    snapshot = snapshot or merged_snapshots()
+    lines = [
+        f"# HELP {PREFIX}_stage_duration_seconds Latency of instrumented stages and external calls.",
+        f"# TYPE {PREFIX}_stage_duration_seconds histogram",
+    ]
+    for stage, hist in sorted(snapshot["histograms"].items()):
+        cumulative = 0
+        for bound, n in zip(BUCKETS, hist["buckets"]):
+            cumulative += n
+            lines.append(f'{PREFIX}_stage_duration_seconds_bucket{{stage="{_label(stage)}",le="{bound}"}} {cumulative}')
+        lines.append(f'{PREFIX}_stage_duration_seconds_bucket{{stage="{_label(stage)}",le="+Inf"}} {hist["count"]}')
+        lines.append(f'{PREFIX}_stage_duration_seconds_sum{{stage="{_label(stage)}"}} {hist["sum"]:.6f}')
+        lines.append(f'{PREFIX}_stage_duration_seconds_count{{stage="{_label(stage)}"}} {hist["count"]}')
+
+    lines += [
+        f"# HELP {PREFIX}_stage_errors_total Stages that raised an exception.",
+        f"# TYPE {PREFIX}_stage_errors_total counter",
+    ]
+    for stage, n in sorted(snapshot["errors"].items()):
+        lines.append(f'{PREFIX}_stage_errors_total{{stage="{_label(stage)}"}} {n}')
+
+    lines += [
+        f"# HELP {PREFIX}_api_calls_total External API calls by service, operation and status.",
+        f"# TYPE {PREFIX}_api_calls_total counter",
+    ]
+    for key, n in sorted(snapshot["api_calls"].items()):
+        service, operation, status = key.split("|", 2)
+        lines.append(
+            f'{PREFIX}_api_calls_total{{service="{_label(service)}",operation="{_label(operation)}",'
+            f'status="{_label(status)}"}} {n}'
+        )
+
+    for counter, n in sorted(snapshot.get("counters", {}).items()):
+        name = re.sub(r"[^a-zA-Z0-9_]", "_", counter)
+        lines.append(f"# TYPE {PREFIX}_{name}_total counter")
+        lines.append(f"{PREFIX}_{name}_total {n}")
+    return "\n".join(lines) + "\n"
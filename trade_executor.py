@@ -1,25 +1,30 @@
 import os
 import time
 import json
-import requests
+import asyncio
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from logger import log_trade_to_sheets
-from discord_alerts import send_discord_alert
+from alerts import send_discord_alert
+from alert_dispatcher import HIGH
 from gpt_decider import gpt_decision
+from lazy_imports import preload
+from prefilter import gate
+from prompt_builder import ohlcv
+from strategy import calculate_atr
+from bar_store import fetch_bars
+from tradier_client import get_client
+from option_chain_cache import get_chain_cache
+from strike_validator import get_strike_validator
+from position_monitor import monitor_positions
+from trade_store import get_store
+from tracing import span, traced
 
-TRADIER_TOKEN = os.getenv("TRADIER_TOKEN")
-ACCOUNT_ID = os.getenv("TRADIER_ACCOUNT_ID")
-IS_SANDBOX = False  # Live paper trading
-
-HEADERS = {
-    "Authorization": f"Bearer {TRADIER_TOKEN}",
-    "Accept": "application/json"
-}
-
-BASE_URL = "https://sandbox.tradier.com/v1" if IS_SANDBOX else "https://api.tradier.com/v1"
 TRADE_STATE_FILE = "trade_state.json"
 MIN_CONFIDENCE = 60
+# Seconds to wait for the market order to fill before reading the entry quote.
+ORDER_FILL_WAIT = float(os.getenv("ORDER_FILL_WAIT", "5"))
 
 
 def already_traded_today():
@@ -35,59 +40,80 @@ def mark_trade_complete():
         json.dump({"last_trade_date": datetime.now().strftime("%Y-%m-%d")}, f)
 
 
-def fetch_spy_candles():
+def fetch_spy_candles(symbol="SPY"):
+    df = fetch_bars(symbol, minutes=30)
+    if df is not None:
+        return df
+
     end_time = datetime.utcnow()
     start_time = end_time - timedelta(minutes=30)
-    url = f"{BASE_URL}/markets/timesales"
-    params = {
-        "symbol": "SPY",
-        "interval": "1min",
-        "start": start_time.strftime("%Y-%m-%dT%H:%M"),
-        "end": end_time.strftime("%Y-%m-%dT%H:%M"),
-        "session_filter": "open"
-    }
-    r = requests.get(url, headers=HEADERS, params=params)
-    r.raise_for_status()
-    data = r.json().get("series", {}).get("data", [])
+    data = get_client().get_timesales(
+        symbol,
+        start=start_time.strftime("%Y-%m-%dT%H:%M"),
+        end=end_time.strftime("%Y-%m-%dT%H:%M"),
+    )
     df = pd.DataFrame(data)
+    if not df.empty:
+        df.index = pd.to_datetime(df["time"])
     return df
 
 
-def find_option_symbol_from_chain(direction):
-    url_exp = f"{BASE_URL}/markets/options/expirations"
-    params = {"symbol": "SPY"}
-    response = requests.get(url_exp, headers=HEADERS, params=params)
-    response.raise_for_status()
-    expirations = response.json().get("expirations", {}).get("date", [])
-
+def find_option_symbol_from_chain(direction, strike_type="ATM", underlying_price=None, symbol="SPY"):
     direction = direction.upper()
-
-    for expiration in expirations:
+    if underlying_price is None:
+        underlying_price = get_client().get_last_price(symbol)
+
+    best_option = get_chain_cache().select_option(symbol, direction, underlying_price, strike_type)
+    if best_option is None:
+        raise Exception(f"No valid {direction} options found for any expiration.")
+
+    print(f"Selected {direction} option: {best_option['symbol']} "
+          f"(strike: {best_option['strike']}, exp: {best_option['expiration']})")
+    return best_option["symbol"]
+
+
+class ChainPrefetch:
+    """
+    Fetch everything the order needs while the LLM is still deciding: the
+    underlying's last price, the nearest chains (both calls and puts come in the
+    same response) and today's set of listed symbols for validation. Once the
+    direction is known, only that side is selected from the warm caches.
+    """
+
+    def __init__(self, symbol="SPY"):
+        self.symbol = symbol
+        self.started = time.monotonic()
+        self.pool = ThreadPoolExecutor(max_workers=3, thread_name_prefix="prefetch")
+        self.price = self.pool.submit(get_client().get_last_price, symbol)
+        self.chains = self.pool.submit(get_chain_cache().prefetch, symbol)
+        self.listed = self.pool.submit(self._load_listed)
+
+    def _load_listed(self):
+        expirations = get_chain_cache().nearest_expirations(self.symbol)
+        return get_strike_validator().prefetch(self.symbol, expirations[:1])
+
+    def cancel(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def select(self, direction, strike_type="ATM"):
+        """Option symbol for `direction`, falling back to a fresh lookup if the prefetch failed."""
         try:
-            url_chain = f"{BASE_URL}/markets/options/chains"
-            chain_params = {
-                "symbol": "SPY",
-                "expiration": expiration,
-                "greeks": "false"
-            }
-            resp = requests.get(url_chain, headers=HEADERS, params=chain_params)
-            resp.raise_for_status()
-            options = resp.json().get("options", {}).get("option", [])
-
-            filtered = [o for o in options if o["option_type"] == direction and o["strike"] >= 300 and o["last"] > 0]
-            if filtered:
-                best_option = filtered[0]
-                print(f"Selected {direction} option: {best_option['symbol']} (exp: {expiration})")
-                return best_option["symbol"]
+            with span("trade_executor.prefetch_wait"):
+                price = self.price.result()
+                self.chains.result()
         except Exception as e:
-            print(f"Skipping expiration {expiration} due to error: {e}")
-            continue
+            print(f"⚠️ Chain prefetch failed, fetching now: {e}")
+            price = None
+        finally:
+            self.cancel()
 
-    raise Exception(f"No valid {direction} options found for any expiration.")
+        option_symbol = find_option_symbol_from_chain(direction, strike_type, underlying_price=price, symbol=self.symbol)
+        if not get_strike_validator().is_valid(option_symbol):
+            raise Exception(f"{option_symbol} is not a listed contract today.")
+        return option_symbol
 
 
 def place_order(option_symbol, quantity):
-    url = f"{BASE_URL}/accounts/{ACCOUNT_ID}/orders"
     payload = {
         "class": "option",
         "symbol": option_symbol,
@@ -97,7 +123,7 @@ def place_order(option_symbol, quantity):
         "duration": "day"
     }
     try:
-        response = requests.post(url, headers=HEADERS, data=payload)
+        response = get_client().place_order(payload)
         print("Raw response:", response.text)
         response.raise_for_status()
         return response.json()
@@ -107,83 +133,88 @@ def place_order(option_symbol, quantity):
 
 
 def get_option_price(symbol):
-    url = f"{BASE_URL}/markets/quotes"
-    params = {"symbols": symbol}
-    r = requests.get(url, headers=HEADERS, params=params)
-    r.raise_for_status()
-    data = r.json()
-    return data['quotes']['quote']['last']
+    return get_client().get_quotes(symbol)[0]['last']
 
 
 def monitor_trade(symbol, entry_price, stop_pct, target_pct):
-    tp1 = entry_price * (1 + target_pct / 100)
-    sl = entry_price * (1 - stop_pct / 100)
-
-    end_time = datetime.now().replace(hour=11, minute=0, second=0)
-    if datetime.now() > end_time:
-        end_time = datetime.now() + timedelta(minutes=15)
-
-    while datetime.now() < end_time:
-        try:
-            price = get_option_price(symbol)
-            print(f"[{datetime.now()}] Price: {price:.2f}")
-            if price >= tp1:
-                print("Target hit. Exiting.")
-                return price, False, True
-            elif price <= sl:
-                print("Stop loss hit. Exiting.")
-                return price, True, False
-            time.sleep(15)
-        except Exception as e:
-            print(f"Error during monitoring: {e}")
-            time.sleep(15)
-
-    final = get_option_price(symbol)
-    return final, False, False
+    """Block until the position hits its stop, target or the monitoring deadline."""
+    return asyncio.run(monitor_positions([(symbol, entry_price, stop_pct, target_pct)]))[0]
 
 
+@traced("trade_executor.execute_trade")
 def execute_trade():
     if already_traded_today():
         print("Trade already executed today.")
         return
 
-    df = fetch_spy_candles()
-    gpt = gpt_decision(df)
+    preload("openai")
+    with span("trade_executor.fetch_candles"):
+        df = fetch_spy_candles()
+    # Gate before the chain prefetch so quiet bars cost no Tradier or LLM calls.
+    if not gate(df, "SPY", "trade_executor")["escalate"]:
+        return
+    prefetch = ChainPrefetch()
+    try:
+        with span("trade_executor.gpt_decision"):
+            gpt = gpt_decision(df, prefilter=False)
+    except Exception:
+        prefetch.cancel()
+        raise
+
+    if gpt and "decision" not in gpt:
+        # gpt_decider's JSON reply names the direction "action".
+        gpt["decision"] = str(gpt.get("action", "")).lower()
 
     if not gpt or gpt.get("decision") not in ["call", "put"]:
         print("GPT said to skip this trade.")
+        prefetch.cancel()
         return
 
     if gpt["confidence"] < MIN_CONFIDENCE:
         print(f"GPT confidence too low ({gpt['confidence']}%). Skipping trade.")
+        prefetch.cancel()
         return
 
     direction = gpt["decision"].upper()
     stop_pct = gpt.get("stop_loss_pct", 30)
     target_pct = gpt.get("target_pct", 50)
+    # ATR of the decision bars feeds the adaptive threshold's strategy selection.
+    atr = calculate_atr(ohlcv(df))
+    atr = None if pd.isna(atr) else float(atr)
 
-    option_symbol = find_option_symbol_from_chain(direction)
+    with span("trade_executor.chain_lookup"):
+        option_symbol = prefetch.select(direction)
     print(f"Placing order for {option_symbol}")
-    place_order(option_symbol, 2)
+    with span("trade_executor.order_post"):
+        place_order(option_symbol, 2)
 
-    time.sleep(5)
+    time.sleep(ORDER_FILL_WAIT)
     entry = get_option_price(option_symbol)
 
+    # Open in the store at the fill, so the dashboard stream shows the position while it is monitored.
+    trade_id = f"{option_symbol}_{datetime.now().strftime('%Y%m%d')}"
+    get_store().record_open(
+        trade_id, direction, option_symbol, entry, stop_pct, target_pct,
+        reason=gpt['reason'], confidence=gpt['confidence'], atr=atr,
+    )
+
     send_discord_alert(
         title="🤖 GPT Trade Triggered",
-        description=f"**Direction**: {direction}\n"
-                    f"**Option**: {option_symbol}\n"
-                    f"**Confidence**: {gpt['confidence']}%\n"
-                    f"**Reason**: {gpt['reason']}\n"
-                    f"**Entry**: ${entry:.2f}\n"
-                    f"**SL**: {stop_pct}% | **TP**: {target_pct}%"
+        message=f"**Direction**: {direction}\n"
+                f"**Option**: {option_symbol}\n"
+                f"**Confidence**: {gpt['confidence']}%\n"
+                f"**Reason**: {gpt['reason']}\n"
+                f"**Entry**: ${entry:.2f}\n"
+                f"**SL**: {stop_pct}% | **TP**: {target_pct}%",
+        priority=HIGH
     )
 
     exit_price, stop_hit, target_hit = monitor_trade(option_symbol, entry, stop_pct, target_pct)
     pnl = ((exit_price - entry) / entry) * 100
 
+    get_store().record_close(trade_id, round(pnl, 2), exit_price)
     log_trade_to_sheets({
-        "trade_id": f"{option_symbol}_{datetime.now().strftime('%Y%m%d')}",
+        "trade_id": trade_id,
         "direction": direction,
         "entry_price": entry,
         "exit_price": exit_price,
@@ -191,15 +222,17 @@ def execute_trade():
         "stop_triggered": stop_hit,
         "target_hit": target_hit,
         "model_confidence": gpt['confidence'],
-        "signal_reason": gpt['reason']
+        "signal_reason": gpt['reason'],
+        "atr": atr
     })
 
     send_discord_alert(
         title="✅ Trade Closed",
-        description=f"Exit: ${exit_price:.2f}\n"
-                    f"PnL: {round(pnl, 2)}%\n"
-                    f"Target Hit: {target_hit}\n"
-                    f"Stop Triggered: {stop_hit}"
+        message=f"Exit: ${exit_price:.2f}\n"
+                f"PnL: {round(pnl, 2)}%\n"
+                f"Target Hit: {target_hit}\n"
+                f"Stop Triggered: {stop_hit}",
+        priority=HIGH
     )
 
     mark_trade_complete()
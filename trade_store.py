@@ -0,0 +1,406 @@
+"""Embedded SQLite trade store (WAL mode).
+
+Trade history, GPT decisions and pre-filter skips live here, indexed by date, status and
+direction, so the dashboard and threshold logic run small indexed queries
+instead of re-reading `trade_log.csv` or whole Sheets tabs. CSV and Sheets are
+export targets. On first use the store is seeded from `trade_log.csv`.
+
+The Sheets Results and Trades tabs stay the persistent history. The scheduled
+workflows cache `trades.db` between runs. `python trade_store.py seed` runs as
+its own step before the job and fills any table that is still empty from
+Sheets, then from `trade_log.csv`. This keeps the full-sheet download off the
+decision path.
+"""
+
+import csv
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime, timedelta
+
+from rolling_metrics import get_rolling_metrics
+
+TRADE_DB = os.getenv("TRADE_DB", "trades.db")
+TRADE_LOG = "trade_log.csv"
+CSV_COLUMNS = ["Time", "Direction", "Symbol", "EntryPrice", "StopLoss%", "Target%", "Reason", "PnL", "Status", "Tplus1"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    id          TEXT PRIMARY KEY,
+    opened_at   TEXT NOT NULL,
+    date        TEXT NOT NULL,
+    closed_at   TEXT,
+    direction   TEXT NOT NULL,
+    symbol      TEXT,
+    underlying  TEXT DEFAULT 'SPY',
+    entry_price REAL,
+    exit_price  REAL,
+    stop_pct    REAL,
+    target_pct  REAL,
+    confidence  REAL,
+    atr         REAL,
+    reason      TEXT,
+    pnl         REAL DEFAULT 0,
+    status      TEXT NOT NULL DEFAULT 'OPEN',
+    tplus1      TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_trades_date ON trades(date);
+CREATE INDEX IF NOT EXISTS idx_trades_status ON trades(status);
+CREATE INDEX IF NOT EXISTS idx_trades_direction ON trades(direction);
+CREATE INDEX IF NOT EXISTS idx_trades_closed ON trades(status, closed_at);
+
+CREATE TABLE IF NOT EXISTS decisions (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    date        TEXT NOT NULL,
+    time        TEXT NOT NULL,
+    strategy    TEXT,
+    action      TEXT,
+    confidence  REAL,
+    reason      TEXT,
+    strike_type TEXT,
+    result      TEXT,
+    pnl         REAL
+);
+CREATE INDEX IF NOT EXISTS idx_decisions_date ON decisions(date);
+
+CREATE TABLE IF NOT EXISTS skips (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    date        TEXT NOT NULL,
+    time        TEXT NOT NULL,
+    symbol      TEXT,
+    stage       TEXT,
+    action      TEXT,
+    score       REAL,
+    regime      TEXT,
+    atr         REAL,
+    range_pct   REAL,
+    reason      TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_skips_date ON skips(date);
+"""
+
+
+def _now():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _float(value, default=None):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _insert_decisions(conn, records):
+    for row in records:
+        conn.execute(
+            """INSERT INTO decisions (date, time, strategy, action, confidence, reason, strike_type, result, pnl)
+               VALUES (?, '', ?, ?, ?, ?, '', ?, ?)""",
+            (str(row.get("date", "")), row.get("strategy", ""), str(row.get("action", "")).lower(),
+             _float(row.get("confidence"), 0), row.get("reason", ""), row.get("result", ""),
+             _float(row.get("pnl"))),
+        )
+    return len(records)
+
+
+def _insert_trades(conn, records):
+    count = 0
+    for row in records:
+        trade_id = str(row.get("trade_id", ""))
+        # Trade IDs end in the trade date: <option symbol>_YYYYMMDD.
+        symbol, _, stamp = trade_id.rpartition("_")
+        try:
+            closed_at = datetime.strptime(stamp, "%Y%m%d").strftime("%Y-%m-%d %H:%M:%S")
+        except ValueError:
+            continue
+        conn.execute(
+            """INSERT OR IGNORE INTO trades
+               (id, opened_at, date, closed_at, direction, symbol, entry_price, exit_price,
+                confidence, atr, reason, pnl, status)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'CLOSED')""",
+            (trade_id, closed_at, closed_at[:10], closed_at, str(row.get("direction", "")).lower(), symbol,
+             _float(row.get("entry_price")), _float(row.get("exit_price")), _float(row.get("model_confidence")),
+             _float(row.get("atr")), row.get("signal_reason", ""), _float(row.get("percent_gain"), 0.0)),
+        )
+        count += 1
+    return count
+
+
+class TradeStore:
+    def __init__(self, path=TRADE_DB, seed_csv=TRADE_LOG):
+        self.path = path
+        self.local = threading.local()
+        self.write_lock = threading.Lock()
+
+        conn = self._conn()
+        conn.executescript(SCHEMA)
+        if seed_csv and os.path.exists(seed_csv) and not conn.execute("SELECT 1 FROM trades LIMIT 1").fetchone():
+            self.import_csv(seed_csv)
+
+    def _conn(self):
+        # sqlite3 connections are per-thread; WAL lets readers run alongside the writer.
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    def _write(self, sql, params=()):
+        with self.write_lock:
+            return self._conn().execute(sql, params)
+
+    def _query(self, sql, params=()):
+        return [dict(row) for row in self._conn().execute(sql, params)]
+
+    def data_version(self):
+        """Changes whenever another connection commits; cheap to poll for updates."""
+        return self._conn().execute("PRAGMA data_version").fetchone()[0]
+
+    # === Trades ===
+
+    def record_open(self, trade_id, direction, symbol, entry_price, stop_pct, target_pct,
+                    reason="", confidence=None, atr=None, underlying="SPY", opened_at=None, tplus1="Pending"):
+        opened_at = opened_at or _now()
+        self._write(
+            """INSERT OR REPLACE INTO trades
+               (id, opened_at, date, direction, symbol, underlying, entry_price, stop_pct, target_pct,
+                confidence, atr, reason, pnl, status, tplus1)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0, 'OPEN', ?)""",
+            (trade_id, opened_at, opened_at[:10], direction.lower(), symbol, underlying, _float(entry_price),
+             _float(stop_pct), _float(target_pct), _float(confidence), _float(atr), reason, tplus1),
+        )
+
+    def record_close(self, trade_id, pnl, exit_price=None, closed_at=None):
+        # Load (or rebuild) the aggregator before this close lands so it is counted exactly once.
+        metrics = get_rolling_metrics()
+        closed_at = closed_at or _now()
+        cursor = self._write(
+            "UPDATE trades SET status = 'CLOSED', pnl = ?, exit_price = ?, closed_at = ? WHERE id = ? AND status = 'OPEN'",
+            (_float(pnl, 0.0), _float(exit_price), closed_at, trade_id),
+        )
+        if cursor.rowcount:
+            row = self._conn().execute("SELECT confidence, atr FROM trades WHERE id = ?", (trade_id,)).fetchone()
+            metrics.record_close(pnl, row["confidence"], row["atr"], closed_at[:10])
+
+    def record_trade(self, trade_id, direction, symbol, entry_price, exit_price, pnl, stop_pct=None,
+                     target_pct=None, reason="", confidence=None, atr=None, underlying="SPY"):
+        """Insert a trade that was opened and closed within one run."""
+        self.record_open(trade_id, direction, symbol, entry_price, stop_pct, target_pct,
+                         reason=reason, confidence=confidence, atr=atr, underlying=underlying)
+        self.record_close(trade_id, pnl, exit_price)
+
+    def update_open_pnl(self, marks):
+        """Store unrealized PnL for open trades; `marks` is an iterable of (trade_id, pnl)."""
+        with self.write_lock:
+            conn = self._conn()
+            conn.execute("BEGIN")
+            conn.executemany("UPDATE trades SET pnl = ? WHERE id = ? AND status = 'OPEN'",
+                             [(float(pnl), trade_id) for trade_id, pnl in marks])
+            conn.execute("COMMIT")
+
+    def recent_trades(self, limit=10):
+        rows = self._query("SELECT * FROM trades ORDER BY opened_at DESC, rowid DESC LIMIT ?", (limit,))
+        return rows[::-1]
+
+    def stats(self):
+        """(total_pnl, win_rate, avg_gain, open_pnl) with the same definitions as the dashboard."""
+        row = self._conn().execute(
+            """SELECT COALESCE(SUM(pnl), 0),
+                      COALESCE(AVG(CASE WHEN pnl > 0 THEN 100.0 ELSE 0 END), 0),
+                      COALESCE(AVG(pnl), 0),
+                      COALESCE(SUM(CASE WHEN status = 'OPEN' THEN pnl ELSE 0 END), 0)
+               FROM trades"""
+        ).fetchone()
+        return tuple(row)
+
+    def rolling_win_rate(self, limit=20):
+        row = self._conn().execute(
+            """SELECT AVG(CASE WHEN pnl > 0 THEN 100.0 ELSE 0 END) FROM
+               (SELECT pnl FROM trades WHERE status = 'CLOSED' ORDER BY closed_at DESC LIMIT ?)""",
+            (limit,),
+        ).fetchone()
+        return round(row[0] or 0.0, 2)
+
+    def closed_trades(self, days=30, min_trades=5):
+        """Closed trades from the last `days` days (and at least the last `min_trades`), oldest first."""
+        since = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+        return self._query(
+            """SELECT id, pnl, confidence, atr, SUBSTR(closed_at, 1, 10) AS date FROM trades
+               WHERE status = 'CLOSED' AND (closed_at >= ? OR id IN
+                   (SELECT id FROM trades WHERE status = 'CLOSED' ORDER BY closed_at DESC LIMIT ?))
+               ORDER BY closed_at, rowid""",
+            (since, min_trades),
+        )
+
+    def recent_metrics(self, limit=5):
+        """(win_rate, avg_confidence, avg_atr) over the last `limit` closed trades, or None if empty."""
+        row = self._conn().execute(
+            """SELECT COUNT(*), AVG(CASE WHEN pnl > 0 THEN 100.0 ELSE 0 END), AVG(confidence), AVG(atr) FROM
+               (SELECT pnl, confidence, atr FROM trades WHERE status = 'CLOSED' ORDER BY closed_at DESC LIMIT ?)""",
+            (limit,),
+        ).fetchone()
+        if not row[0]:
+            return None
+        return row[1] or 0.0, row[2], row[3]
+
+    # === Decisions ===
+
+    def record_decision(self, action, confidence, reason="", strike_type="", strategy="GPT", result="", pnl=None):
+        now = datetime.now()
+        self._write(
+            """INSERT INTO decisions (date, time, strategy, action, confidence, reason, strike_type, result, pnl)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (now.strftime("%Y-%m-%d"), now.strftime("%H:%M:%S"), strategy, (action or "").lower(),
+             _float(confidence, 0), reason, strike_type, result, _float(pnl)),
+        )
+
+    def recent_decisions(self, limit=5):
+        rows = self._query("SELECT * FROM decisions ORDER BY id DESC LIMIT ?", (limit,))
+        return rows[::-1]
+
+    # === Pre-filter skips ===
+
+    def record_skip(self, symbol, stage, reason, action=None, score=None, regime=None, atr=None, range_pct=None):
+        now = datetime.now()
+        self._write(
+            """INSERT INTO skips (date, time, symbol, stage, action, score, regime, atr, range_pct, reason)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (now.strftime("%Y-%m-%d"), now.strftime("%H:%M:%S"), symbol, stage, action,
+             _float(score), regime, _float(atr), _float(range_pct), reason),
+        )
+
+    def skip_reasons(self, date):
+        """How often each skip reason fired on `date`, most frequent first."""
+        return self._query(
+            "SELECT reason, COUNT(*) AS count FROM skips WHERE date = ? GROUP BY reason ORDER BY count DESC",
+            (date,),
+        )
+
+    def daily_summary(self, date):
+        """(total, wins, avg_pnl) of decisions logged on `date`, or None if there were none."""
+        return self.decision_summary(date, date)
+
+    def decision_summary(self, start, end):
+        """(total, wins, avg_pnl) of decisions logged from `start` to `end` (inclusive), or None."""
+        row = self._conn().execute(
+            """SELECT COUNT(*),
+                      COALESCE(SUM(CASE WHEN LOWER(result) LIKE '%win%' THEN 1 ELSE 0 END), 0),
+                      COALESCE(AVG(COALESCE(pnl, 0)), 0)
+               FROM decisions WHERE date BETWEEN ? AND ?""",
+            (start, end),
+        ).fetchone()
+        if not row[0]:
+            return None
+        return row[0], row[1], row[2]
+
+    # === Import / export ===
+
+    def import_csv(self, path=TRADE_LOG):
+        with open(path, newline="") as f:
+            rows = list(csv.DictReader(f))
+        with self.write_lock:
+            conn = self._conn()
+            conn.execute("BEGIN")
+            for i, row in enumerate(rows):
+                opened_at = row.get("Time") or _now()
+                status = row.get("Status") or "OPEN"
+                conn.execute(
+                    """INSERT OR IGNORE INTO trades
+                       (id, opened_at, date, closed_at, direction, symbol, entry_price, stop_pct, target_pct,
+                        reason, pnl, status, tplus1)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                    (f"csv-{i}", opened_at, opened_at[:10], opened_at if status != "OPEN" else None,
+                     (row.get("Direction") or "").lower(), row.get("Symbol"), _float(row.get("EntryPrice")),
+                     _float(row.get("StopLoss%")), _float(row.get("Target%")), row.get("Reason", ""),
+                     _float(row.get("PnL"), 0.0), status, row.get("Tplus1", "")),
+                )
+            conn.execute("COMMIT")
+
+    def import_sheets(self, spreadsheet):
+        """Fill each empty table from its Sheets tab (Results -> decisions, Trades -> trades).
+
+        Tabs are read independently, so a missing or unreadable tab only skips its own table.
+        Returns `{tab: rows imported}` for the tabs that were read.
+        """
+        imported = {}
+        for tab, table, insert in (("Results", "decisions", _insert_decisions),
+                                   ("Trades", "trades", _insert_trades)):
+            if self._conn().execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone():
+                continue
+            try:
+                records = spreadsheet.worksheet(tab).get_all_records()
+            except Exception as e:
+                print(f"⚠️ Could not read the {tab} tab: {e}")
+                continue
+            with self.write_lock:
+                conn = self._conn()
+                conn.execute("BEGIN")
+                imported[tab] = insert(conn, records)
+                conn.execute("COMMIT")
+        return imported
+
+    def export_csv(self, path=TRADE_LOG):
+        """Write the full trade history in `trade_log.csv` layout (temp file + atomic rename)."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_COLUMNS)
+            for row in self._conn().execute(
+                """SELECT opened_at, direction, symbol, entry_price, stop_pct, target_pct, reason, pnl, status, tplus1
+                   FROM trades ORDER BY opened_at, rowid"""
+            ):
+                writer.writerow(list(row))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = TradeStore()
+    return _store
+
+
+def seed_from_sheets(store):
+    """Load decision and trade history from Sheets into empty tables; failures only warn."""
+    conn = store._conn()
+    if (conn.execute("SELECT 1 FROM decisions LIMIT 1").fetchone()
+            and conn.execute("SELECT 1 FROM trades LIMIT 1").fetchone()):
+        return {}
+    try:
+        from logger import get_sheet
+
+        imported = store.import_sheets(get_sheet())
+    except Exception as e:
+        print(f"⚠️ Could not seed trade store from Sheets: {e}")
+        return {}
+    print(f"📥 Seeded trade store from Sheets: {imported}")
+    return imported
+
+
+def seed():
+    """Fill an empty store from Sheets first, then from `trade_log.csv` if trades are still empty."""
+    store = TradeStore(seed_csv=None)
+    seed_from_sheets(store)
+    if os.path.exists(TRADE_LOG) and not store._conn().execute("SELECT 1 FROM trades LIMIT 1").fetchone():
+        store.import_csv(TRADE_LOG)
+    return store
+
+
+if __name__ == "__main__":
+    # Run before the scheduled jobs (`python trade_store.py seed`), off the decision path.
+    if sys.argv[1:] == ["seed"]:
+        seed()
+    else:
+        print("Usage: python trade_store.py seed")
@@ -0,0 +1,277 @@
+"""Shared Tradier API client.
+
+One pooled `requests.Session` is used for every Tradier call in the process so
+quotes, chains, lookups and orders reuse warm keep-alive connections. Calls are
+budgeted per endpoint group with token buckets and transient failures are
+retried with jittered exponential backoff.
+
+Environment:
+
+```
+TRADIER_TOKEN         - Tradier API token
+TRADIER_ACCOUNT_ID    - Tradier account ID
+TRADIER_ENV           - "sandbox" (default) or "live"
+TRADIER_BASE_URL      - optional explicit base URL override
+```
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from tracing import api_call
+
+TRADIER_TOKEN = os.getenv("TRADIER_TOKEN")
+ACCOUNT_ID = os.getenv("TRADIER_ACCOUNT_ID")
+TRADIER_ENV = os.getenv("TRADIER_ENV", "sandbox").lower()
+
+BASE_URLS = {
+    "sandbox": "https://sandbox.tradier.com/v1",
+    "live": "https://api.tradier.com/v1",
+}
+BASE_URL = os.getenv("TRADIER_BASE_URL") or BASE_URLS.get(TRADIER_ENV, BASE_URLS["sandbox"])
+
+# Requests per minute for each endpoint group (Tradier's published defaults).
+RATE_LIMITS = {
+    "market": 120,
+    "trading": 60,
+    "account": 120,
+}
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.25
+BACKOFF_CAP = 4.0
+TIMEOUT = 10
+
+
+class TokenBucket:
+    """Thread-safe token bucket. `reserve` returns how long the caller must wait."""
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or max(1, rate_per_minute // 6)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def acquire(self):
+        wait = self.reserve()
+        if wait:
+            time.sleep(wait)
+
+
+def endpoint_group(path, method="GET"):
+    if path.startswith("/markets"):
+        return "market"
+    if method.upper() != "GET" and "/orders" in path:
+        return "trading"
+    return "account"
+
+
+def backoff_delay(attempt, retry_after=None):
+    if retry_after:
+        try:
+            return min(float(retry_after), BACKOFF_CAP * 4)
+        except ValueError:
+            pass
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+def operation_name(method, path, account_id=None):
+    """Metric label for a request, with the account ID folded out of the path."""
+    if account_id:
+        path = path.replace(str(account_id), "{account}")
+    return f"{method} {path}"
+
+
+def should_retry(method, status=None, error=None):
+    """POSTs are only retried when the request provably never reached Tradier."""
+    if error is not None:
+        if method == "GET":
+            return isinstance(error, (requests.ConnectionError, requests.Timeout))
+        return isinstance(error, requests.ConnectTimeout)
+    if method == "GET":
+        return status in RETRY_STATUSES
+    return status == 429
+
+
+class TradierClient:
+    def __init__(self, token=TRADIER_TOKEN, account_id=ACCOUNT_ID, base_url=BASE_URL, pool_size=16):
+        self.account_id = account_id
+        self.base_url = base_url
+        self.buckets = {group: TokenBucket(rate) for group, rate in RATE_LIMITS.items()}
+
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/json",
+        })
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def request(self, method, path, params=None, data=None, timeout=TIMEOUT):
+        """Send a request and return the final `requests.Response` (status is not checked)."""
+        method = method.upper()
+        bucket = self.buckets[endpoint_group(path, method)]
+        url = f"{self.base_url}{path}"
+        operation = operation_name(method, path, self.account_id)
+
+        for attempt in range(MAX_RETRIES + 1):
+            bucket.acquire()
+            try:
+                with api_call("tradier", operation) as call:
+                    response = self.session.request(method, url, params=params, data=data, timeout=timeout)
+                    call.status = response.status_code
+            except requests.RequestException as e:
+                if attempt == MAX_RETRIES or not should_retry(method, error=e):
+                    raise
+                time.sleep(backoff_delay(attempt))
+                continue
+
+            if attempt < MAX_RETRIES and should_retry(method, status=response.status_code):
+                time.sleep(backoff_delay(attempt, response.headers.get("Retry-After")))
+                continue
+            return response
+
+    def get_json(self, path, params=None):
+        response = self.request("GET", path, params=params)
+        response.raise_for_status()
+        return response.json()
+
+    def post_json(self, path, data=None):
+        response = self.request("POST", path, data=data)
+        response.raise_for_status()
+        return response.json()
+
+    # === Market data ===
+
+    def get_quotes(self, symbols):
+        """Fetch quotes for one or many symbols in a single call. Returns a list."""
+        if not isinstance(symbols, str):
+            symbols = ",".join(symbols)
+        data = self.get_json("/markets/quotes", {"symbols": symbols})
+        quotes = (data.get("quotes") or {}).get("quote", [])
+        return [quotes] if isinstance(quotes, dict) else quotes
+
+    def get_last_price(self, symbol):
+        return float(self.get_quotes(symbol)[0]["last"])
+
+    def get_expirations(self, symbol):
+        data = self.get_json("/markets/options/expirations", {"symbol": symbol})
+        dates = (data.get("expirations") or {}).get("date", [])
+        return [dates] if isinstance(dates, str) else dates
+
+    def get_chain(self, symbol, expiration, greeks=False):
+        params = {"symbol": symbol, "expiration": expiration, "greeks": str(greeks).lower()}
+        data = self.get_json("/markets/options/chains", params)
+        options = (data.get("options") or {}).get("option", [])
+        return [options] if isinstance(options, dict) else options
+
+    def get_timesales(self, symbol, start, end, interval="1min", session_filter="open"):
+        params = {
+            "symbol": symbol,
+            "interval": interval,
+            "start": start,
+            "end": end,
+            "session_filter": session_filter,
+        }
+        data = self.get_json("/markets/timesales", params)
+        series = (data.get("series") or {}).get("data", [])
+        return [series] if isinstance(series, dict) else series
+
+    # === Account ===
+
+    def get_balances(self):
+        return self.get_json(f"/accounts/{self.account_id}/balances").get("balances", {})
+
+    def place_order(self, payload):
+        """POST an order and return the raw response so callers can inspect errors."""
+        return self.request("POST", f"/accounts/{self.account_id}/orders", data=payload)
+
+
+class AsyncTradierClient:
+    """aiohttp variant sharing the same rate-limit buckets as the sync client."""
+
+    def __init__(self, token=TRADIER_TOKEN, base_url=BASE_URL, buckets=None, pool_size=16):
+        self.token = token
+        self.base_url = base_url
+        self.buckets = buckets or get_client().buckets
+        self.pool_size = pool_size
+        self.session = None
+
+    async def _session(self):
+        if self.session is None or self.session.closed:
+            import aiohttp
+
+            self.session = aiohttp.ClientSession(
+                headers={"Authorization": f"Bearer {self.token}", "Accept": "application/json"},
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                timeout=aiohttp.ClientTimeout(total=TIMEOUT),
+            )
+        return self.session
+
+    async def get_json(self, path, params=None):
+        import aiohttp
+
+        session = await self._session()
+        bucket = self.buckets[endpoint_group(path)]
+        for attempt in range(MAX_RETRIES + 1):
+            wait = bucket.reserve()
+            if wait:
+                await asyncio.sleep(wait)
+            try:
+                with api_call("tradier", operation_name("GET", path)) as call:
+                    async with session.get(f"{self.base_url}{path}", params=params) as response:
+                        call.status = response.status
+                        retry = attempt < MAX_RETRIES and response.status in RETRY_STATUSES
+                        if not retry:
+                            response.raise_for_status()
+                            return await response.json(content_type=None)
+                        retry_after = response.headers.get("Retry-After")
+                await asyncio.sleep(backoff_delay(attempt, retry_after))
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt == MAX_RETRIES:
+                    raise
+                await asyncio.sleep(backoff_delay(attempt))
+
+    async def get_quotes(self, symbols):
+        if not isinstance(symbols, str):
+            symbols = ",".join(symbols)
+        data = await self.get_json("/markets/quotes", {"symbols": symbols})
+        quotes = (data.get("quotes") or {}).get("quote", [])
+        return [quotes] if isinstance(quotes, dict) else quotes
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Return the process-wide pooled client."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = TradierClient()
+    return _client
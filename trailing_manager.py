@@ -1,59 +1,37 @@
-import pandas as pd
-import requests
-from config import TRADIER_TOKEN, ACCOUNT_ID
-
-TRADIER_BASE_URL = "https://sandbox.tradier.com/v1"
-HEADERS = {
-    "Authorization": f"Bearer {TRADIER_TOKEN}",
-    "Accept": "application/json"
-}
+import config  # noqa: F401 - fails fast when credentials are missing
+from tradier_client import get_client
+from position_journal import get_journal
+from trade_store import get_store, TRADE_LOG
 
 def get_spy_price():
-    url = f"{TRADIER_BASE_URL}/markets/quotes"
-    params = {"symbols": "SPY"}
-    response = requests.get(url, headers=HEADERS, params=params)
-    data = response.json()
-    return float(data["quotes"]["quote"]["last"])
+    return get_client().get_last_price("SPY")
 
 def check_trailing_and_update():
     try:
-        df = pd.read_csv("trade_log.csv")
-        open_trades = df[df["Status"] == "OPEN"]
-
-        if open_trades.empty:
+        journal = get_journal()
+        if not journal.open_positions:
             print("📭 No open trades to monitor.")
-            return
-
-        current_price = get_spy_price()
-        print(f"🔍 Current SPY price: {current_price:.2f}")
-
-        for idx, row in open_trades.iterrows():
-            direction = row["Direction"].lower()
-            entry = float(row["EntryPrice"])
-            stop_pct = float(row["StopLoss%"]) / 100
-            target_pct = float(row["Target%"]) / 100
-
-            if direction == "call":
-                gain = (current_price - entry) / entry
-            else:  # put
-                gain = (entry - current_price) / entry
-
-            pnl_percent = round(gain * 100, 2)
-
-            # Check for exit conditions
-            if gain <= -stop_pct:
-                df.at[idx, "Status"] = "CLOSED"
-                df.at[idx, "PnL"] = pnl_percent
-                print(f"🛑 STOP HIT: {direction.upper()} closed at {pnl_percent}%")
-            elif gain >= target_pct:
-                df.at[idx, "Status"] = "CLOSED"
-                df.at[idx, "PnL"] = pnl_percent
-                print(f"🎯 TARGET HIT: {direction.upper()} closed at {pnl_percent}%")
+            return {"status": "success", "closed": 0}
+
+        quotes = get_client().get_quotes(journal.underlyings())
+        prices = {q["symbol"]: float(q["last"]) for q in quotes if q.get("last") is not None}
+        for symbol, price in prices.items():
+            print(f"🔍 Current {symbol} price: {price:.2f}")
+
+        closed = journal.evaluate(prices)
+        get_store().update_open_pnl((pid, p["pnl"]) for pid, p in journal.open_positions.items())
+        for position, pnl_percent, outcome in closed:
+            direction = position["direction"].upper()
+            if outcome == "stop":
+                print(f"🛑 STOP HIT: {direction} closed at {pnl_percent}%")
             else:
-                # Still open, update unrealized PnL
-                df.at[idx, "PnL"] = pnl_percent
+                print(f"🎯 TARGET HIT: {direction} closed at {pnl_percent}%")
 
-        df.to_csv("trade_log.csv", index=False)
+        # Only closes change the exported history; open PnL lives in the store.
+        if closed:
+            get_store().export_csv(TRADE_LOG)
+        return {"status": "success", "closed": len(closed)}
 
     except Exception as e:
         print(f"❌ Trailing stop logic error: {e}")
+        return {"status": "error", "error": str(e)}